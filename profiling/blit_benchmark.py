@@ -0,0 +1,71 @@
+"""
+Copyright © 2026  Bartłomiej Duda
+License: GPL-3.0 License
+"""
+
+# Micro-benchmark of main-thread blit paths (PIL image -> Tk PhotoImage).
+# Needs a display. Usage: python -m profiling.blit_benchmark
+
+import time
+import tkinter as tk
+
+import numpy as np
+from PIL import Image, ImageTk
+
+from src.GUI.tiled_canvas import PPM_HEADER_FORMAT, TiledCanvas
+
+# fmt: off
+
+IMAGE_SIZES: list = [(512, 512), (2048, 2048)]
+REPEAT_COUNT: int = 10
+
+
+def _get_test_image(width: int, height: int, mode: str) -> Image.Image:
+    random_generator = np.random.default_rng(width * height)
+    return Image.fromarray(random_generator.integers(0, 256, (height, width, 4), dtype=np.uint8), "RGBA").convert(mode)
+
+
+def _measure(root: tk.Tk, blit_function, megapixels: float) -> float:
+    blit_function()  # warm-up (e.g. Tk hook initialization)
+    root.update()
+    start_time = time.perf_counter()
+    for _ in range(REPEAT_COUNT):
+        blit_function()
+    root.update()
+    return (time.perf_counter() - start_time) * 1000 / REPEAT_COUNT / megapixels
+
+
+def run_benchmark() -> None:
+    root = tk.Tk()
+    canvas = tk.Canvas(root, width=1280, height=720)
+    canvas.pack()
+    h_scroll = tk.Scrollbar(root, orient="horizontal")
+    v_scroll = tk.Scrollbar(root, orient="vertical")
+    root.update()
+
+    print(f"{'path':<40}{'size':>12}{'ms/MP':>10}")
+    for width, height in IMAGE_SIZES:
+        megapixels: float = width * height / 1_000_000
+        rgba_image = _get_test_image(width, height, "RGBA")
+        rgb_image = _get_test_image(width, height, "RGB")
+        reused_photo_image = ImageTk.PhotoImage("RGB", (width, height))
+        ppm_photo_image = tk.PhotoImage(master=root, width=width, height=height)
+        ppm_header: bytes = PPM_HEADER_FORMAT.format(width, height).encode("ascii")
+        tiled_canvas = TiledCanvas(canvas, h_scroll, v_scroll)
+
+        blit_paths: list = [
+            ("new PhotoImage (RGBA)", lambda: ImageTk.PhotoImage(rgba_image)),
+            ("new PhotoImage (RGB)", lambda: ImageTk.PhotoImage(rgb_image)),
+            ("reused PhotoImage, PIL blit (RGB)", lambda: reused_photo_image.paste(rgb_image)),
+            ("reused PhotoImage, PPM data (RGB)", lambda: ppm_photo_image.configure(data=ppm_header + rgb_image.tobytes(), format="ppm")),
+            ("TiledCanvas frame (RGBA, 1280x720 view)", lambda: tiled_canvas.set_image(rgba_image, "checkerboard")),
+        ]
+        for path_name, blit_function in blit_paths:
+            print(f"{path_name:<40}{f'{width}x{height}':>12}{_measure(root, blit_function, megapixels):>10.2f}")
+        tiled_canvas.clear()
+
+    root.destroy()
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,424 @@
+"""
+Copyright © 2026  Bartłomiej Duda
+License: GPL-3.0 License
+"""
+
+# Decode benchmark for every pixel format, swizzling type, compression type and endianess type.
+# Inputs are synthetic (deterministic), every _image_decode stage and preview post-processing is timed separately.
+# Usage: python -m profiling.decode_benchmark --sizes 256 1024 4096 8192 --output report.json --baseline old_report.json
+
+import argparse
+import json
+import logging
+import os
+import platform
+import struct
+import sys
+import tempfile
+import time
+import zlib
+from importlib import metadata
+from typing import Optional
+
+import lz4.block
+import numpy as np
+from PIL import Image
+from PIL.Image import Resampling, Transpose
+from reversebox.compression.compression_lz4 import LZ4Handler
+from reversebox.image.common import get_bpp_for_image_format
+from reversebox.image.image_formats import ImageFormats
+
+from src.GUI.preview_compositor import CHECKERBOARD_BACKGROUND, composite_on_background
+from src.GUI.zoom_pyramid import ZoomPyramid
+from src.Image.constants import (
+    DEFAULT_PALETTE_FORMAT_NAME,
+    PIXEL_FORMATS_NAMES,
+    SUPPORTED_COMPRESSION_TYPES,
+    SUPPORTED_ENDIANESS_TYPES,
+    SUPPORTED_SWIZZLING_TYPES,
+)
+from src.Image.heatimage import HeatImage
+from src.Image.heatspec import DecodeSpec
+
+# fmt: off
+
+SUITES: list = ["pixel_format", "swizzling", "compression", "endianess"]
+DEFAULT_SIZES: list = [256, 1024]
+DEFAULT_REPEAT_COUNT: int = 3
+DEFAULT_MAX_CASE_SECONDS: float = 5.0  # bigger sizes of slower cases are skipped
+DEFAULT_REGRESSION_THRESHOLD: float = 0.2
+MIN_COMPARED_TIME_MS: float = 1.0  # shorter cases are too noisy to compare
+
+DEFAULT_PIXEL_FORMAT: str = "RGBA8888"
+PREVIEW_ZOOM_VALUE: float = 0.5
+
+# pixel formats matching bpp (or block size) expected by swizzling / compression type
+SWIZZLING_PIXEL_FORMATS: dict = {
+    "ps4": "BC1_DXT1",
+    "ps4_padding": "BC1_DXT1",
+    "ps5": "BC1_DXT1",
+    "nintendo_switch_1_16": "GRAY8",
+    "nintendo_switch_2_16": "RGB565",
+    "ps2_type1": "PAL8",
+    "ps2_type2": "PAL8",
+    "x360_1_1": "GRAY8",
+    "x360_1_2": "RGB565",
+    "x360_4_8": "BC1_DXT1",
+    "x360_4_16": "BC3_DXT5",
+    "wii_u_bc": "BC1_DXT1",
+}
+COMPRESSION_PIXEL_FORMATS: dict = {
+    "rle_emergency": "GRAY8",
+    "rle_neversoft": "RGB565",
+    "rle_tzar": "RGB565",
+    "rle_leapster": "RGB565",
+}
+
+RLE_RUN_LENGTH: int = 64  # synthetic RLE data is made of repeated and raw runs of this length
+
+
+def _get_random_data(data_size: int, seed: int) -> bytes:
+    return np.random.default_rng(seed).integers(0, 256, data_size, dtype=np.uint8).tobytes()
+
+
+def _get_compressible_data(data_size: int, bytes_per_pixel: int, seed: int) -> bytes:
+    # random pixels, every second run of RLE_RUN_LENGTH pixels repeats its first pixel
+    pixels = np.frombuffer(_get_random_data(data_size - data_size % bytes_per_pixel, seed), dtype=np.uint8).reshape(-1, bytes_per_pixel).copy()
+    pixel_indexes = np.arange(len(pixels))
+    is_repeated = (pixel_indexes // RLE_RUN_LENGTH) % 2 == 0
+    pixels[is_repeated] = pixels[(pixel_indexes // RLE_RUN_LENGTH * RLE_RUN_LENGTH)[is_repeated]]
+    return pixels.tobytes() + _get_random_data(data_size % bytes_per_pixel, seed)
+
+
+def _get_image_data_size(pixel_format: str, img_width: int, img_height: int) -> int:
+    try:
+        image_bpp: int = get_bpp_for_image_format(ImageFormats[pixel_format])
+    except Exception:
+        image_bpp = 32
+    return (img_width * img_height * image_bpp + 7) // 8
+
+
+def _get_rle_runs(pixel_data: bytes, bytes_per_pixel: int) -> list:
+    # (is_repeated, pixel count, pixel data) runs covering all pixels
+    rle_runs: list = []
+    pixel_count: int = len(pixel_data) // bytes_per_pixel
+    for run_index, first_pixel in enumerate(range(0, pixel_count, RLE_RUN_LENGTH)):
+        run_length: int = min(RLE_RUN_LENGTH, pixel_count - first_pixel)
+        run_data: bytes = pixel_data[first_pixel * bytes_per_pixel: (first_pixel + run_length) * bytes_per_pixel]
+        if run_index % 2 == 0:
+            rle_runs.append((True, run_length, run_data[:bytes_per_pixel]))
+        else:
+            rle_runs.append((False, run_length, run_data))
+    return rle_runs
+
+
+def _compress_rle_tga(pixel_data: bytes, bytes_per_pixel: int, repeated_flag: int) -> bytes:
+    packets: list = []
+    for is_repeated, run_length, run_data in _get_rle_runs(pixel_data, bytes_per_pixel):
+        packets.append(bytes([(repeated_flag if is_repeated else 0x80 - repeated_flag) | (run_length - 1)]) + run_data)
+    return b"".join(packets)
+
+
+def _compress_rle_executioners(pixel_data: bytes, bytes_per_pixel: int) -> bytes:
+    # repeated packet means "skip pixels" here, so only raw packets are used
+    run_size: int = RLE_RUN_LENGTH * bytes_per_pixel
+    return b"".join(bytes([len(pixel_data[i: i + run_size]) // bytes_per_pixel]) + pixel_data[i: i + run_size]
+                    for i in range(0, len(pixel_data), run_size))
+
+
+def _compress_packbits(pixel_data: bytes) -> bytes:
+    packets: list = []
+    for is_repeated, run_length, run_data in _get_rle_runs(pixel_data, 1):
+        packets.append(bytes([257 - run_length]) + run_data if is_repeated and run_length > 1 else bytes([run_length - 1]) + run_data)
+    return b"".join(packets)
+
+
+def _compress_rle_emergency(pixel_data: bytes) -> bytes:
+    packets: list = []
+    for is_repeated, run_length, run_data in _get_rle_runs(pixel_data, 1):
+        packets.append(bytes([0x80 | (run_length - 1)]) + run_data if is_repeated else bytes([run_length]) + run_data)
+    return b"".join(packets) + b"\x00"
+
+
+def _compress_rle_neversoft(pixel_data: bytes) -> bytes:
+    packets: list = []
+    for is_repeated, run_length, run_data in _get_rle_runs(pixel_data, 2):
+        packets.append(struct.pack("<H", (0x8000 if is_repeated else 0) | run_length) + run_data)
+    return b"".join(packets)
+
+
+def _get_row_packets(row_data: bytes, bytes_per_pixel: int) -> bytes:
+    # (transparent count, color count, colors) packets with up to 255 colors
+    max_packet_size: int = 255 * bytes_per_pixel
+    return b"".join(bytes([0, len(row_data[i: i + max_packet_size]) // bytes_per_pixel]) + row_data[i: i + max_packet_size]
+                    for i in range(0, len(row_data), max_packet_size))
+
+
+def _compress_rle_tzar(pixel_data: bytes, img_width: int, img_height: int, bytes_per_pixel: int) -> bytes:
+    row_size: int = img_width * bytes_per_pixel
+    rows: list = [_get_row_packets(pixel_data[row * row_size: (row + 1) * row_size], bytes_per_pixel) for row in range(img_height)]
+    row_offsets: list = []
+    row_offset: int = img_height * 4
+    for row in rows:
+        row_offsets.append(row_offset)
+        row_offset += len(row)
+    return struct.pack(f"<{img_height}I", *row_offsets) + b"".join(rows)
+
+
+def _compress_rle_leapster(pixel_data: bytes, img_width: int, img_height: int, bytes_per_pixel: int) -> bytes:
+    # one packet per row, rest of the row (wider than 255 pixels) is filled with transparent pixels,
+    # decompressor reads one more row than the image has
+    row_size: int = img_width * bytes_per_pixel
+    row_colors_size: int = min(img_width, 255) * bytes_per_pixel
+    rows: list = [bytes([0, row_colors_size // bytes_per_pixel]) + pixel_data[row * row_size: row * row_size + row_colors_size]
+                  for row in range(img_height)]
+    return b"".join(rows) + b"\x00\x00"
+
+
+def get_compressed_data(compression_id: str, pixel_data: bytes, img_width: int, img_height: int, image_bpp: int) -> bytes:
+    bytes_per_pixel: int = max(image_bpp // 8, 1)
+    if compression_id == "none":
+        return pixel_data
+    elif compression_id == "rle_tga":
+        return _compress_rle_tga(pixel_data, bytes_per_pixel, 0x80)
+    elif compression_id == "rle_tga_reversed":
+        return _compress_rle_tga(pixel_data, bytes_per_pixel, 0x00)
+    elif compression_id == "packbits":
+        return _compress_packbits(pixel_data)
+    elif compression_id == "zlib":
+        return zlib.compress(pixel_data)
+    elif compression_id == "rle_executioners":
+        return _compress_rle_executioners(pixel_data, bytes_per_pixel)
+    elif compression_id == "rle_emergency":
+        return _compress_rle_emergency(pixel_data)
+    elif compression_id == "rle_neversoft":
+        return _compress_rle_neversoft(pixel_data)
+    elif compression_id == "rle_tzar":
+        return _compress_rle_tzar(pixel_data, img_width, img_height, bytes_per_pixel)
+    elif compression_id == "rle_leapster":
+        return _compress_rle_leapster(pixel_data, img_width, img_height, bytes_per_pixel)
+    elif compression_id == "lz4_frame":
+        return LZ4Handler().compress_data(pixel_data)
+    elif compression_id == "lz4_block":
+        return lz4.block.compress(pixel_data, store_size=False)  # ImageHeat reads raw blocks without size header
+    raise Exception(f"No synthetic data for compression type: {compression_id}")
+
+
+def get_benchmark_cases(suites: list) -> list:
+    # (suite, case name, pixel format, endianess id, swizzling id, compression id)
+    benchmark_cases: list = []
+    if "pixel_format" in suites:
+        for pixel_format in PIXEL_FORMATS_NAMES:
+            benchmark_cases.append(("pixel_format", pixel_format, pixel_format, "little", "none", "none"))
+    if "swizzling" in suites:
+        for swizzling_type in SUPPORTED_SWIZZLING_TYPES[1:]:
+            pixel_format: str = SWIZZLING_PIXEL_FORMATS.get(swizzling_type.unique_id, DEFAULT_PIXEL_FORMAT)
+            benchmark_cases.append(("swizzling", swizzling_type.unique_id, pixel_format, "little", swizzling_type.unique_id, "none"))
+    if "compression" in suites:
+        for compression_type in SUPPORTED_COMPRESSION_TYPES[1:]:
+            pixel_format = COMPRESSION_PIXEL_FORMATS.get(compression_type.unique_id, DEFAULT_PIXEL_FORMAT)
+            benchmark_cases.append(("compression", compression_type.unique_id, pixel_format, "little", "none", compression_type.unique_id))
+    if "endianess" in suites:
+        for endianess_type in SUPPORTED_ENDIANESS_TYPES[1:]:
+            benchmark_cases.append(("endianess", endianess_type.unique_id, DEFAULT_PIXEL_FORMAT, endianess_type.unique_id, "none", "none"))
+    return benchmark_cases
+
+
+def _get_display_name(supported_types: list, unique_id: str) -> str:
+    return next(supported_type.display_name for supported_type in supported_types if supported_type.unique_id == unique_id)
+
+
+def _write_input_file(file_path: str, pixel_format: str, compression_id: str, img_size: int) -> int:
+    # returns file size, image data starts at offset 0 (indexed formats read palette from there too)
+    image_data_size: int = _get_image_data_size(pixel_format, img_size, img_size)
+    try:
+        image_bpp: int = get_bpp_for_image_format(ImageFormats[pixel_format])
+    except Exception:
+        image_bpp = 32
+    if compression_id == "none":
+        input_data: bytes = _get_random_data(image_data_size, img_size)
+    else:
+        pixel_data: bytes = _get_compressible_data(image_data_size, max(image_bpp // 8, 1), img_size)
+        input_data = get_compressed_data(compression_id, pixel_data, img_size, img_size, image_bpp)
+    with open(file_path, "wb") as input_file:
+        input_file.write(input_data)
+    return len(input_data)
+
+
+def _postprocess_preview(decoded_image_data: bytes, img_width: int, img_height: int) -> Image.Image:
+    # same steps as preview rendering: zoom level, flips, rotate and blending with background
+    pil_img = Image.frombuffer("RGBA", (img_width, img_height), decoded_image_data[:img_width * img_height * 4], "raw", "RGBA", 0, 1)
+    pil_img = ZoomPyramid(pil_img, decoded_image_data).get_level(PREVIEW_ZOOM_VALUE, Resampling.BILINEAR)
+    pil_img = pil_img.transpose(Transpose.FLIP_TOP_BOTTOM).transpose(Transpose.FLIP_LEFT_RIGHT).transpose(Transpose.ROTATE_90)
+    return composite_on_background(pil_img, CHECKERBOARD_BACKGROUND)
+
+
+def run_benchmark_case(decode_spec: DecodeSpec) -> dict:
+    # decode without caches and pixel stream, so every run does the full work,
+    # decode stages are timed by HeatImage itself
+    heat_image = HeatImage(decode_spec)
+    try:
+        heat_image._image_read()
+        heat_image._image_decode()
+        if heat_image.is_preview_error or not heat_image.decoded_image_data:
+            raise Exception("no decoded image data")
+        stage_times: dict = {stage_name: stage_time * 1000 for stage_name, stage_time in heat_image.render_timings.get_stage_times().items()}
+
+        start_time = time.perf_counter()
+        _postprocess_preview(heat_image.decoded_image_data, int(heat_image.img_width), int(heat_image.img_height))
+        stage_times["preview"] = (time.perf_counter() - start_time) * 1000
+    finally:
+        heat_image.image_close()
+    return stage_times
+
+
+def run_benchmark(suites: list, sizes: list, repeat_count: int, max_case_seconds: float, case_filter: Optional[str] = None) -> dict:
+    results: list = []
+    with tempfile.TemporaryDirectory() as temp_directory:
+        input_file_path: str = os.path.join(temp_directory, "input.bin")
+        for suite, case_name, pixel_format, endianess_id, swizzling_id, compression_id in get_benchmark_cases(suites):
+            if case_filter and case_filter.lower() not in f"{suite}/{case_name}".lower():
+                continue
+            is_too_slow: bool = False
+            for img_size in sorted(sizes):
+                result: dict = {
+                    "case": f"{suite}/{case_name}/{img_size}x{img_size}",
+                    "suite": suite,
+                    "pixel_format": pixel_format,
+                    "endianess": endianess_id,
+                    "swizzling": swizzling_id,
+                    "compression": compression_id,
+                    "width": img_size,
+                    "height": img_size,
+                }
+                results.append(result)
+                if is_too_slow:
+                    result["status"] = "skipped"
+                    print(f"{result['case']:<60}{'skipped':>12}", flush=True)
+                    continue
+
+                file_size: int = _write_input_file(input_file_path, pixel_format, compression_id, img_size)
+                decode_spec = DecodeSpec(
+                    img_file_path=input_file_path,
+                    total_file_size=file_size,
+                    pixel_format=pixel_format,
+                    endianess_type=_get_display_name(SUPPORTED_ENDIANESS_TYPES, endianess_id),
+                    swizzling_type=_get_display_name(SUPPORTED_SWIZZLING_TYPES, swizzling_id),
+                    compression_type=_get_display_name(SUPPORTED_COMPRESSION_TYPES, compression_id),
+                    img_start_offset=0,
+                    img_end_offset=file_size,
+                    img_width=img_size,
+                    img_height=img_size,
+                    palette_format=DEFAULT_PALETTE_FORMAT_NAME,
+                    palette_loadfrom_value=1,
+                    palette_offset=0,
+                    palette_scale_value=1,
+                    palette_endianess=_get_display_name(SUPPORTED_ENDIANESS_TYPES, "little"),
+                    palette_ps2_swizzle_flag=False,
+                )
+
+                # the fastest run is reported, it's the least disturbed by other processes
+                best_stage_times: Optional[dict] = None
+                try:
+                    for _ in range(repeat_count):
+                        stage_times: dict = run_benchmark_case(decode_spec)
+                        if best_stage_times is None or sum(stage_times.values()) < sum(best_stage_times.values()):
+                            best_stage_times = stage_times
+                        if sum(stage_times.values()) > max_case_seconds * 1000:
+                            break
+                except Exception as error:
+                    result["status"] = "error"
+                    result["error"] = str(error)
+                    print(f"{result['case']:<60}{'error':>12}  {error}", flush=True)
+                    continue
+
+                total_time: float = sum(best_stage_times.values())
+                result["status"] = "ok"
+                result["stages_ms"] = {stage_name: round(stage_time, 3) for stage_name, stage_time in best_stage_times.items()}
+                result["total_ms"] = round(total_time, 3)
+                result["megapixels_per_second"] = round(img_size * img_size / 1_000_000 / max(total_time / 1000, 1e-9), 2)
+                is_too_slow = total_time > max_case_seconds * 1000
+                print(f"{result['case']:<60}{total_time:>12.2f} ms", flush=True)
+
+    return {
+        "environment": _get_environment(),
+        "settings": {"suites": suites, "sizes": sorted(sizes), "repeat_count": repeat_count, "max_case_seconds": max_case_seconds},
+        "results": results,
+    }
+
+
+def _get_environment() -> dict:
+    environment: dict = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+    for package_name in ("ReverseBox", "Pillow", "numpy"):
+        try:
+            environment[package_name] = metadata.version(package_name)
+        except metadata.PackageNotFoundError:
+            environment[package_name] = None
+    return environment
+
+
+def compare_with_baseline(report: dict, baseline_report: dict, regression_threshold: float) -> list:
+    # returns regressed case names, cases missing in one of reports are not compared
+    baseline_results: dict = {result["case"]: result for result in baseline_report["results"] if result.get("status") == "ok"}
+    regressed_cases: list = []
+    print(f"\n{'case':<60}{'baseline ms':>14}{'current ms':>14}{'change':>10}")
+    for result in report["results"]:
+        baseline_result: Optional[dict] = baseline_results.get(result["case"])
+        if baseline_result is None or result.get("status") != "ok":
+            continue
+        if max(baseline_result["total_ms"], result["total_ms"]) < MIN_COMPARED_TIME_MS:
+            continue
+        change: float = result["total_ms"] / max(baseline_result["total_ms"], 1e-9) - 1.0
+        result["baseline_total_ms"] = baseline_result["total_ms"]
+        result["change"] = round(change, 4)
+        is_regression: bool = change > regression_threshold
+        if is_regression:
+            regressed_cases.append(result["case"])
+        print(f"{result['case']:<60}{baseline_result['total_ms']:>14.2f}{result['total_ms']:>14.2f}{change:>+10.1%}{'  REGRESSION' if is_regression else ''}")
+    for result in report["results"]:
+        if result.get("status") != "ok" and result["case"] in baseline_results:
+            regressed_cases.append(result["case"])
+            print(f"{result['case']:<60}  {result['status']} (ok in baseline)")
+
+    report["regressed_cases"] = regressed_cases
+    return regressed_cases
+
+
+def main(argv: list) -> int:
+    parser = argparse.ArgumentParser(prog="python -m profiling.decode_benchmark", description="ImageHeat decode benchmark")
+    parser.add_argument("--suite", nargs="+", default=SUITES, choices=SUITES, help="benchmark suites (default: all)")
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES, help=f"image sizes, e.g. 256 1024 4096 8192 (default: {DEFAULT_SIZES})")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT_COUNT, help=f"runs per case, the fastest is reported (default: {DEFAULT_REPEAT_COUNT})")
+    parser.add_argument("--max-case-seconds", type=float, default=DEFAULT_MAX_CASE_SECONDS,
+                        help=f"bigger sizes are skipped for cases slower than this (default: {DEFAULT_MAX_CASE_SECONDS})")
+    parser.add_argument("--filter", default=None, help="run only cases containing this text, e.g. \"RGBA8888\" or \"compression/\"")
+    parser.add_argument("--output", default=None, help="JSON report file (default: report is not saved)")
+    parser.add_argument("--baseline", default=None, help="JSON report to compare with")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                        help=f"relative slowdown reported as regression (default: {DEFAULT_REGRESSION_THRESHOLD})")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)  # decode logs would hide the results
+    report: dict = run_benchmark(args.suite, args.sizes, max(args.repeat, 1), args.max_case_seconds, args.filter)
+
+    regressed_cases: list = []
+    if args.baseline:
+        with open(args.baseline, "rt", encoding="utf-8") as baseline_file:
+            regressed_cases = compare_with_baseline(report, json.load(baseline_file), args.threshold)
+        print(f"\n{len(regressed_cases)} regression(s) against {args.baseline}")
+
+    if args.output:
+        with open(args.output, "wt", encoding="utf-8") as output_file:
+            json.dump(report, output_file, indent=4)
+        print(f"Report saved to {args.output}")
+    return 1 if regressed_cases else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
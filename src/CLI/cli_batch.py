@@ -0,0 +1,168 @@
+"""
+Copyright © 2026  Bartłomiej Duda
+License: GPL-3.0 License
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from typing import Optional
+
+from reversebox.common.logger import get_logger
+
+from src.CLI.cli_main import (
+    add_decode_arguments,
+    check_output_file_path,
+    decode_image_file,
+    get_specs_from_args,
+)
+from src.Image.heatimage import HeatImage
+from src.Image.heatspec import DecodeSpec
+
+logger = get_logger(__name__)
+
+# fmt: off
+
+# manifest columns, every other column is passed as decode option (e.g. "palette_offset" -> "--palette-offset")
+MANIFEST_INPUT_FILE_KEY: str = "file"
+MANIFEST_OUTPUT_FILE_KEY: str = "output"
+MANIFEST_FLAG_KEYS: list = ["ps2_palette_swizzle", "vertical_flip", "horizontal_flip"]
+MANIFEST_TRUE_VALUES: list = ["1", "true", "yes", "y"]
+DEFAULT_OUTPUT_EXTENSION: str = ".png"
+
+
+class ManifestRowParser(argparse.ArgumentParser):
+    # invalid manifest row must fail only this row, not the whole batch
+    def error(self, message: str):
+        raise ValueError(message)
+
+
+def read_manifest(manifest_file_path: str) -> list:
+    # JSON list of objects or CSV file with header row
+    if manifest_file_path.lower().endswith(".json"):
+        with open(manifest_file_path, "rt", encoding="utf-8") as manifest_file:
+            manifest_rows = json.load(manifest_file)
+        if not isinstance(manifest_rows, list):
+            raise Exception("JSON manifest must be a list of objects!")
+        return manifest_rows
+
+    with open(manifest_file_path, "rt", encoding="utf-8", newline="") as manifest_file:
+        return list(csv.DictReader(manifest_file))
+
+
+def get_decode_args_from_row(manifest_row: dict, manifest_directory: str, output_directory: str) -> argparse.Namespace:
+    row_parser = ManifestRowParser(add_help=False)
+    add_decode_arguments(row_parser)
+
+    row_argv: list = []
+    for row_key, row_value in manifest_row.items():
+        if row_key in (MANIFEST_INPUT_FILE_KEY, MANIFEST_OUTPUT_FILE_KEY) or row_value is None or str(row_value).strip() == "":
+            continue
+        if row_key in MANIFEST_FLAG_KEYS:
+            if str(row_value).strip().lower() in MANIFEST_TRUE_VALUES:
+                row_argv.append("--" + row_key.replace("_", "-"))
+            continue
+        if row_key == "palette_file":
+            row_value = os.path.join(manifest_directory, str(row_value))
+        row_argv += ["--" + row_key.replace("_", "-"), str(row_value).strip()]
+
+    decode_args = row_parser.parse_args(row_argv)
+    if not manifest_row.get(MANIFEST_INPUT_FILE_KEY):
+        raise ValueError(f"missing \"{MANIFEST_INPUT_FILE_KEY}\" value")
+    decode_args.input_file_path = os.path.join(manifest_directory, manifest_row[MANIFEST_INPUT_FILE_KEY])
+
+    output_file_name: Optional[str] = manifest_row.get(MANIFEST_OUTPUT_FILE_KEY)
+    if not output_file_name:
+        input_file_name: str = os.path.splitext(os.path.basename(decode_args.input_file_path))[0]
+        output_file_name = f"{input_file_name}_{decode_args.start_offset:08X}_{decode_args.pixel_format}{DEFAULT_OUTPUT_EXTENSION}"
+    decode_args.output_file_path = os.path.join(output_directory, check_output_file_path(output_file_name))
+    return decode_args
+
+
+# every worker process keeps the input file it's working on mapped,
+# rows are sorted by file, so one mapping serves many rows
+_worker_heat_image: Optional[HeatImage] = None
+
+
+def _get_worker_heat_image(decode_spec: DecodeSpec) -> HeatImage:
+    global _worker_heat_image
+    if _worker_heat_image is not None and _worker_heat_image.decode_spec.img_file_path != decode_spec.img_file_path:
+        _worker_heat_image.image_close()
+        _worker_heat_image = None
+    if _worker_heat_image is None:
+        _worker_heat_image = HeatImage(decode_spec)
+    return _worker_heat_image
+
+
+def convert_manifest_row(row_number: int, decode_args: argparse.Namespace) -> tuple:
+    # returns (row number, error message or None, processed input bytes)
+    try:
+        decode_spec, view_spec = get_specs_from_args(decode_args, decode_args.input_file_path)
+        heat_image: HeatImage = _get_worker_heat_image(decode_spec)
+        os.makedirs(os.path.dirname(decode_args.output_file_path) or ".", exist_ok=True)
+        is_decoded: bool = decode_image_file(heat_image, decode_spec, view_spec, decode_args.output_file_path)
+        heat_image.pixel_stream.clear()  # batch rows are separate textures, decoded pixels are not reused
+        if not is_decoded:
+            return row_number, "couldn't decode image data", 0
+        processed_size: int = max(min(decode_spec.img_end_offset, decode_spec.total_file_size) - decode_spec.img_start_offset, 0)
+        return row_number, None, processed_size
+    except Exception as error:
+        return row_number, str(error), 0
+
+
+def run_batch(manifest_file_path: str, output_directory: Optional[str] = None, number_of_workers: Optional[int] = None) -> int:
+    start_time = time.time()
+    manifest_directory: str = os.path.dirname(os.path.abspath(manifest_file_path))
+    output_directory = output_directory if output_directory else manifest_directory
+
+    errors: dict = {}
+    batch_jobs: list = []
+    output_row_numbers: dict = {}  # rows must not overwrite each other's output
+    for row_number, manifest_row in enumerate(read_manifest(manifest_file_path), start=1):
+        try:
+            decode_args: argparse.Namespace = get_decode_args_from_row(manifest_row, manifest_directory, output_directory)
+            output_file_key: str = os.path.normcase(os.path.abspath(decode_args.output_file_path))
+            if output_file_key in output_row_numbers:
+                raise ValueError(f"output file {decode_args.output_file_path} is already used by row {output_row_numbers[output_file_key]}")
+            output_row_numbers[output_file_key] = row_number
+            batch_jobs.append((row_number, decode_args))
+        except Exception as error:
+            errors[row_number] = str(error)
+    batch_jobs.sort(key=lambda batch_job: (batch_job[1].input_file_path, batch_job[1].start_offset))
+
+    number_of_workers = number_of_workers if number_of_workers else os.cpu_count() or 1
+    logger.info(f"[BATCH] Converting {len(batch_jobs)} textures with {number_of_workers} worker(s)...")
+    if number_of_workers == 1:
+        results = [convert_manifest_row(row_number, decode_args) for row_number, decode_args in batch_jobs]
+    else:
+        # crashed worker (or any other failure) fails only its own rows
+        results = []
+        with ProcessPoolExecutor(max_workers=number_of_workers) as executor:
+            batch_futures: dict[Future, int] = {
+                executor.submit(convert_manifest_row, row_number, decode_args): row_number for row_number, decode_args in batch_jobs
+            }
+            for batch_future in as_completed(batch_futures):
+                try:
+                    results.append(batch_future.result())
+                except Exception as error:
+                    results.append((batch_futures[batch_future], f"worker failed: {error!r}", 0))
+
+    processed_size: int = 0
+    number_of_converted: int = 0
+    for row_number, error_message, row_processed_size in results:
+        processed_size += row_processed_size
+        if error_message is not None:
+            errors[row_number] = error_message
+        else:
+            number_of_converted += 1
+
+    for row_number in sorted(errors):
+        logger.error(f"[BATCH] Row {row_number} failed! Error: {errors[row_number]}")
+
+    execution_time: float = max(time.time() - start_time, 1e-9)
+    print(f"Converted {number_of_converted}/{number_of_converted + len(errors)} textures in {execution_time:.2f} s"
+          f" ({number_of_converted / execution_time:.1f} textures/s, {processed_size / (1024 * 1024) / execution_time:.2f} MB/s)")
+    return 0 if not errors else 1
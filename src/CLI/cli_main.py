@@ -0,0 +1,260 @@
+"""
+Copyright © 2026  Bartłomiej Duda
+License: GPL-3.0 License
+"""
+
+import argparse
+import os
+import time
+from typing import Optional
+
+from reversebox.common.logger import get_logger
+from reversebox.image.common import get_bpp_for_image_format
+from reversebox.image.image_formats import ImageFormats
+
+from src.Image.constants import (
+    DEFAULT_PALETTE_FORMAT_NAME,
+    DEFAULT_PIXEL_FORMAT_NAME,
+    PALETTE_FORMATS_NAMES,
+    PIXEL_FORMATS_NAMES,
+    SUPPORTED_COMPRESSION_TYPES,
+    SUPPORTED_ENDIANESS_TYPES,
+    SUPPORTED_PALETTE_SCALE_TYPES,
+    SUPPORTED_ROTATE_TYPES,
+    SUPPORTED_SWIZZLING_TYPES,
+)
+from src.Image.heatexport import (
+    get_export_file_data,
+    get_export_format,
+    get_export_image,
+)
+from src.Image.heatimage import UNCOMPRESSED_IMAGE_FORMATS, HeatImage
+from src.Image.heatmemory import HeatMemoryBudget
+from src.Image.heatprofile import (
+    PROFILE_DIRECTORY_NAME,
+    HeatProfiler,
+    get_profile_directory,
+)
+from src.Image.heatspec import DecodeSpec, ViewSpec
+from src.Image.heattrace import trace_render_job
+
+logger = get_logger(__name__)
+
+# fmt: off
+
+# GUI is not imported here (tkinter, tkinterdnd2, tkhtmlview), so CLI works on headless machines
+
+
+def _get_display_name(supported_types: list, unique_id: str) -> str:
+    # CLI uses unique IDs (e.g. "ps4"), specs use display names (e.g. "PS4 (Morton)")
+    for supported_type in supported_types:
+        if supported_type.unique_id == unique_id:
+            return supported_type.display_name
+
+    raise Exception(f"Couldn't find display name for ID: {unique_id}")
+
+
+def _get_unique_id(supported_types: list, display_name: str) -> str:
+    for supported_type in supported_types:
+        if supported_type.display_name == display_name:
+            return supported_type.unique_id
+
+    raise Exception(f"Couldn't find ID for display name: {display_name}")
+
+
+def _convert_offset(offset_str: str) -> int:
+    # decimal or hex with "0x" prefix
+    return int(offset_str, 0)
+
+
+def check_output_file_path(output_file_path: str) -> str:
+    # unknown extension is reported before decode, not as Pillow error after it
+    if get_export_format(output_file_path) is None:
+        raise argparse.ArgumentTypeError(f"not supported output file extension \"{os.path.splitext(output_file_path)[1]}\""
+                                         f" (supported are image formats that Pillow can write, e.g. .png, .bmp, .dds, .tga)")
+    return output_file_path
+
+
+def _get_unique_ids(supported_types: list) -> list:
+    return [supported_type.unique_id for supported_type in supported_types]
+
+
+def add_decode_arguments(parser: argparse.ArgumentParser) -> None:
+    # image parameters
+    parser.add_argument("--format", dest="pixel_format", default=DEFAULT_PIXEL_FORMAT_NAME, choices=PIXEL_FORMATS_NAMES, metavar="PIXEL_FORMAT",
+                        help=f"pixel format (default: {DEFAULT_PIXEL_FORMAT_NAME})")
+    parser.add_argument("--width", type=int, required=True, help="image width")
+    parser.add_argument("--height", type=int, required=True, help="image height")
+    parser.add_argument("--offset", dest="start_offset", type=_convert_offset, default=0, help="image start offset (default: 0)")
+    parser.add_argument("--end-offset", type=_convert_offset, default=None, help="image end offset (default: end of image data for plain per-pixel formats, end of file for others)")
+    parser.add_argument("--endianess", default="little", choices=_get_unique_ids(SUPPORTED_ENDIANESS_TYPES))
+    parser.add_argument("--swizzle", default="none", choices=_get_unique_ids(SUPPORTED_SWIZZLING_TYPES), metavar="SWIZZLING_TYPE",
+                        help="swizzling type (default: none)")
+    parser.add_argument("--compression", default="none", choices=_get_unique_ids(SUPPORTED_COMPRESSION_TYPES), metavar="COMPRESSION_TYPE",
+                        help="compression type (default: none)")
+
+    # palette parameters
+    parser.add_argument("--palette-format", default=DEFAULT_PALETTE_FORMAT_NAME, choices=PALETTE_FORMATS_NAMES)
+    parser.add_argument("--palette-file", default=None, help="palette file (default: palette is read from input file)")
+    parser.add_argument("--palette-offset", type=_convert_offset, default=0)
+    parser.add_argument("--palette-endianess", default="little", choices=["little", "big"])
+    parser.add_argument("--palette-scale", type=int, default=1,
+                        choices=[palette_scale_type.scale_value for palette_scale_type in SUPPORTED_PALETTE_SCALE_TYPES])
+    parser.add_argument("--ps2-palette-swizzle", action="store_true")
+
+    # post-processing
+    parser.add_argument("--vertical-flip", action="store_true")
+    parser.add_argument("--horizontal-flip", action="store_true")
+    parser.add_argument("--rotate", default="none", choices=_get_unique_ids(SUPPORTED_ROTATE_TYPES))
+
+
+def get_argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src.main", description="ImageHeat command-line mode (without GUI)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    decode_parser = subparsers.add_parser("decode", help="decode raw image data and save it as PNG, BMP or DDS file")
+    add_decode_arguments(decode_parser)
+    decode_parser.add_argument("input_file_path", help="file with encoded image data")
+    decode_parser.add_argument("output_file_path", type=check_output_file_path, help="output image file (format is taken from file extension)")
+    decode_parser.add_argument("--memory-budget", type=int, default=None, metavar="MB",
+                               help="refuse decode that would need more memory than this (default: no limit)")
+    decode_parser.add_argument("--profile", action="store_true",
+                               help=f"profile decode with cProfile and tracemalloc, results are saved in \"{PROFILE_DIRECTORY_NAME}\" directory next to config file")
+
+    batch_parser = subparsers.add_parser("batch", help="decode many images listed in a manifest file (CSV or JSON)")
+    batch_parser.add_argument("manifest_file_path", help="CSV (with header) or JSON manifest, columns: file, output and decode options"
+                                                         " (e.g. format, width, height, offset, swizzle, palette_offset)")
+    batch_parser.add_argument("--output-dir", default=None, help="directory for output files (default: manifest directory)")
+    batch_parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: number of CPUs)")
+    return parser
+
+
+def _get_default_end_offset(args: argparse.Namespace, total_file_size: int) -> int:
+    # per-pixel decoders decode the whole range, so for plain per-pixel data only the image itself is read,
+    # other data (swizzled, compressed, block formats) is read up to the end of file
+    image_format: ImageFormats = ImageFormats[args.pixel_format]
+    if image_format in UNCOMPRESSED_IMAGE_FORMATS and args.swizzle == "none" and args.compression == "none":
+        image_size: int = (args.width * args.height * get_bpp_for_image_format(image_format) + 7) // 8
+        return min(args.start_offset + image_size, total_file_size)
+    return total_file_size
+
+
+def get_specs_from_args(args: argparse.Namespace, input_file_path: str) -> tuple:
+    # returns (DecodeSpec, ViewSpec)
+    total_file_size: int = os.path.getsize(input_file_path)
+    decode_spec = DecodeSpec(
+        # image parameters
+        img_file_path=input_file_path,
+        total_file_size=total_file_size,
+        pixel_format=args.pixel_format,
+        endianess_type=_get_display_name(SUPPORTED_ENDIANESS_TYPES, args.endianess),
+        swizzling_type=_get_display_name(SUPPORTED_SWIZZLING_TYPES, args.swizzle),
+        compression_type=_get_display_name(SUPPORTED_COMPRESSION_TYPES, args.compression),
+        img_start_offset=args.start_offset,
+        img_end_offset=args.end_offset if args.end_offset is not None else _get_default_end_offset(args, total_file_size),
+        img_width=args.width,
+        img_height=args.height,
+
+        # palette parameters
+        palette_format=args.palette_format,
+        palette_loadfrom_value=2 if args.palette_file else 1,
+        palette_file_path=args.palette_file,
+        palette_offset=args.palette_offset,
+        palette_scale_value=args.palette_scale,
+        palette_endianess=_get_display_name(SUPPORTED_ENDIANESS_TYPES, args.palette_endianess),
+        palette_ps2_swizzle_flag=args.ps2_palette_swizzle,
+    )
+    view_spec = ViewSpec(
+        vertical_flip_flag=args.vertical_flip,
+        horizontal_flip_flag=args.horizontal_flip,
+        rotate_name=_get_display_name(SUPPORTED_ROTATE_TYPES, args.rotate),
+    )
+    return decode_spec, view_spec
+
+
+def get_argv_from_specs(decode_spec: DecodeSpec, view_spec: ViewSpec, output_file_path: str) -> list:
+    # reverse of get_specs_from_args, so parameters chosen in GUI can be replayed in command-line mode
+    argv: list = [
+        "decode",
+        "--format", decode_spec.pixel_format,
+        "--width", str(decode_spec.img_width),
+        "--height", str(decode_spec.img_height),
+        "--offset", hex(decode_spec.img_start_offset),
+        "--end-offset", hex(decode_spec.img_end_offset),
+        "--endianess", _get_unique_id(SUPPORTED_ENDIANESS_TYPES, decode_spec.endianess_type),
+        "--swizzle", _get_unique_id(SUPPORTED_SWIZZLING_TYPES, decode_spec.swizzling_type),
+        "--compression", _get_unique_id(SUPPORTED_COMPRESSION_TYPES, decode_spec.compression_type),
+    ]
+    if decode_spec.palette_format:
+        argv += ["--palette-format", decode_spec.palette_format, "--palette-offset", hex(decode_spec.palette_offset or 0),
+                 "--palette-scale", str(decode_spec.palette_scale_value or 1)]
+        if decode_spec.palette_loadfrom_value == 2 and decode_spec.palette_file_path:
+            argv += ["--palette-file", decode_spec.palette_file_path]
+        if decode_spec.palette_endianess:
+            argv += ["--palette-endianess", _get_unique_id(SUPPORTED_ENDIANESS_TYPES, decode_spec.palette_endianess)]
+        if decode_spec.palette_ps2_swizzle_flag:
+            argv.append("--ps2-palette-swizzle")
+    if view_spec.vertical_flip_flag:
+        argv.append("--vertical-flip")
+    if view_spec.horizontal_flip_flag:
+        argv.append("--horizontal-flip")
+    argv += ["--rotate", _get_unique_id(SUPPORTED_ROTATE_TYPES, view_spec.rotate_name), decode_spec.img_file_path, output_file_path]
+    return argv
+
+
+def decode_image_file(heat_image: HeatImage, decode_spec: DecodeSpec, view_spec: ViewSpec, output_file_path: str) -> bool:
+    heat_image.decode_spec = decode_spec
+    heat_image.image_reload()
+    trace_render_job("decode", heat_image.render_timings, decode_spec)
+    if heat_image.is_preview_error or not heat_image.decoded_image_data:
+        logger.error(f"Couldn't decode image data from {decode_spec.img_file_path}!")
+        return False
+
+    export_pil_img = get_export_image(heat_image.decoded_image_data, heat_image.img_width, heat_image.img_height, view_spec)
+    out_data: bytes = get_export_file_data(export_pil_img, output_file_path)
+    if not out_data:
+        logger.error("Empty data to export!")
+        return False
+
+    with open(output_file_path, "wb") as out_file:
+        out_file.write(out_data)
+    return True
+
+
+def run_cli(argv: list, main_directory: str = ".") -> int:
+    # main directory is where config file is stored (profiles are saved next to it)
+    args = get_argument_parser().parse_args(argv)
+    start_time = time.time()
+
+    if args.command == "decode":
+        try:
+            decode_spec, view_spec = get_specs_from_args(args, args.input_file_path)
+            heat_profiler: Optional[HeatProfiler] = HeatProfiler(get_profile_directory(main_directory)) if args.profile else None
+            if heat_profiler is not None:
+                heat_profiler.start()
+            memory_budget: Optional[HeatMemoryBudget] = HeatMemoryBudget(args.memory_budget * 1024 * 1024) if args.memory_budget else None
+            heat_image: HeatImage = HeatImage(decode_spec, memory_budget=memory_budget)
+            if memory_budget is not None:
+                memory_budget.register("image", heat_image.get_memory_sizes, heat_image.release_intermediates)
+            try:
+                is_decoded: bool = decode_image_file(heat_image, decode_spec, view_spec, args.output_file_path)
+            finally:
+                heat_image.image_close()
+                if heat_profiler is not None:
+                    heat_profiler.stop(decode_spec, view_spec, argv)  # failed decode is profiled too
+        except Exception as error:
+            logger.error(f"Failed to decode {args.input_file_path}! Error: {error}")
+            return 1
+        if not is_decoded:
+            return 1
+        logger.info(f"Image has been exported successfully to {args.output_file_path}. Time: {round(time.time() - start_time, 2)} seconds.")
+    elif args.command == "batch":
+        from src.CLI.cli_batch import run_batch  # cli_batch reuses decode logic from this module
+
+        try:
+            return run_batch(args.manifest_file_path, args.output_dir, args.workers)
+        except Exception as error:
+            logger.error(f"Failed to run batch from {args.manifest_file_path}! Error: {error}")
+            return 1
+
+    return 0
@@ -16,38 +16,44 @@ from idlelib.tooltip import Hovertip
 from tkinter import filedialog, messagebox, ttk
 from typing import List, Optional
 
-from PIL import Image, ImageDraw, ImageTk
+from PIL import Image, ImageTk
 from PIL.Image import Transpose
 from reversebox.common.common import (
     convert_bytes_to_hex_string,
     convert_from_bytes_to_mb_string,
-    get_file_extension_uppercase,
 )
 from reversebox.common.logger import get_logger
 from reversebox.image.common import (
     convert_bpp_to_bytes_per_pixel,
     convert_bpp_to_bytes_per_pixel_float,
-    get_block_data_size,
     get_bpp_for_image_format,
     is_compressed_image_format,
 )
 from reversebox.image.image_formats import ImageFormats
-from reversebox.image.pillow_wrapper import PillowWrapper
 from tkhtmlview import HTMLLabel
 from tkinterdnd2 import DND_FILES
 
+from src.CLI.cli_main import get_argv_from_specs
 from src.GUI.about_window import AboutWindow
 from src.GUI.gui_params import GuiParams
 from src.GUI.gui_root import ImageHeatRoot
+from src.GUI.render_prefetcher import RenderPrefetcher, get_page_size
+from src.GUI.render_scheduler import RenderScheduler
+from src.GUI.tiled_canvas import TiledCanvas
+from src.GUI.zoom_pyramid import ZoomPyramid, is_viewport_zoom
 from src.Image.constants import (
     COMPRESSION_TYPES_NAMES,
     DEFAULT_COMPRESSION_NAME,
+    DEFAULT_DECODE_CACHE_SIZE_MB,
     DEFAULT_ENDIANESS_NAME,
+    DEFAULT_MEMORY_BUDGET_MB,
     DEFAULT_PALETTE_FORMAT_NAME,
     DEFAULT_PALETTE_SCALE_NAME,
     DEFAULT_PIXEL_FORMAT_NAME,
     DEFAULT_ROTATE_NAME,
+    DEFAULT_STAGE_CACHE_SIZE_MB,
     DEFAULT_SWIZZLING_NAME,
+    DEFAULT_UNSWIZZLE_MAP_CACHE_SIZE_MB,
     DEFAULT_ZOOM_NAME,
     DEFAULT_ZOOM_RESAMPLING_NAME,
     ENDIANESS_TYPES_NAMES,
@@ -69,7 +75,23 @@ from src.Image.constants import (
     get_rotate_id,
     get_zoom_value,
 )
+from src.Image.heatcache import HeatCache, HeatStageCaches
+from src.Image.heatdecoder import HeatDecoder
+from src.Image.heatexport import get_export_file_data, get_export_image
 from src.Image.heatimage import HeatImage
+from src.Image.heatmemory import MEMORY_CACHES, MEMORY_PREVIEW, HeatMemoryBudget
+from src.Image.heatprofile import HeatProfiler, get_profile_directory
+from src.Image.heatspec import DecodeSpec, PreviewSnapshot, ViewSpec
+from src.Image.heattiming import (
+    STAGE_CHANNEL,
+    STAGE_RESIZE,
+    STAGE_TRANSPOSE,
+    RenderTimings,
+    RenderTimingsHistory,
+    get_image_data_length,
+)
+from src.Image.heattrace import trace_render_job
+from src.Image.heatunswizzle import HeatUnswizzler
 
 # default app settings
 WINDOW_HEIGHT = 600
@@ -103,8 +125,10 @@ class ImageHeatGUI():
         self.preview_instance = None
         self.ph_img = None
         self.preview_final_pil_image = None
-        self.checkerboard_cache = None  # checkerboard pattern cache
-        self.bg_ph_img = None  # reference to background image
+        self.preview_snapshot: Optional[PreviewSnapshot] = None  # data of the image shown in preview, for mouse handler
+        self.tiled_canvas: Optional[TiledCanvas] = None
+        self.zoom_pyramid: Optional[ZoomPyramid] = None
+        self.preview_canvas_memory_size: int = 0  # tiles and preview copy, measured on main thread only
         self.validate_spinbox_command = (master.register(lambda x: self.validate_spinbox(x, False)), '%P')
         self.validate_spinbox_command_digit = (master.register(self.validate_spinbox), '%P')
         self.pixel_x: int = 1
@@ -113,6 +137,7 @@ class ImageHeatGUI():
         self.pixel_value_str: str = ""
         self.pixel_value_rgba: bytearray = bytearray(10)
         self._debounce_timer = None
+        self.render_scheduler = RenderScheduler()
 
         # drag and drop logic
         self.master.drop_target_register(DND_FILES)
@@ -137,6 +162,11 @@ class ImageHeatGUI():
         self.user_config.set("config", ConfigKeys.OPEN_PALETTE_DIRECTORY_PATH, "")
         self.user_config.set("config", ConfigKeys.CURRENT_PROGRAM_LANGUAGE, "EN")
         self.user_config.set("config", ConfigKeys.CURRENT_CANVAS_COLOR, "#595959")
+        self.user_config.set("config", ConfigKeys.DECODE_CACHE_SIZE_MB, str(DEFAULT_DECODE_CACHE_SIZE_MB))
+        self.user_config.set("config", ConfigKeys.STAGE_CACHE_SIZE_MB, str(DEFAULT_STAGE_CACHE_SIZE_MB))
+        self.user_config.set("config", ConfigKeys.UNSWIZZLE_MAP_CACHE_SIZE_MB, str(DEFAULT_UNSWIZZLE_MAP_CACHE_SIZE_MB))
+        self.user_config.set("config", ConfigKeys.PERFORMANCE_HUD_FLAG, "False")
+        self.user_config.set("config", ConfigKeys.MEMORY_BUDGET_MB, str(DEFAULT_MEMORY_BUDGET_MB))
         if not os.path.exists(self.user_config_file_path):
             with open(self.user_config_file_path, "w") as configfile:
                 self.user_config.write(configfile)
@@ -153,6 +183,11 @@ class ImageHeatGUI():
                 value=self.user_config.get("config", ConfigKeys.CURRENT_PROGRAM_LANGUAGE))
             self.current_background_color = tk.StringVar(
                 value=self.user_config.get("config", ConfigKeys.CURRENT_CANVAS_COLOR))
+            self.decode_cache_size_mb = self.user_config.getint("config", ConfigKeys.DECODE_CACHE_SIZE_MB)
+            self.stage_cache_size_mb = self.user_config.getint("config", ConfigKeys.STAGE_CACHE_SIZE_MB)
+            self.unswizzle_map_cache_size_mb = self.user_config.getint("config", ConfigKeys.UNSWIZZLE_MAP_CACHE_SIZE_MB)
+            self.performance_hud_flag = tk.BooleanVar(value=self.user_config.getboolean("config", ConfigKeys.PERFORMANCE_HUD_FLAG))
+            self.memory_budget_mb = self.user_config.getint("config", ConfigKeys.MEMORY_BUDGET_MB)
         except Exception as error:
             logger.error(f"Error while loading user config: {error}")
             self.current_save_as_directory_path = ""
@@ -161,6 +196,29 @@ class ImageHeatGUI():
             self.current_open_palette_directory_path = ""
             self.current_program_language = tk.StringVar(value="EN")
             self.current_background_color = tk.StringVar(value="#595959")
+            self.decode_cache_size_mb = DEFAULT_DECODE_CACHE_SIZE_MB
+            self.stage_cache_size_mb = DEFAULT_STAGE_CACHE_SIZE_MB
+            self.unswizzle_map_cache_size_mb = DEFAULT_UNSWIZZLE_MAP_CACHE_SIZE_MB
+            self.performance_hud_flag = tk.BooleanVar(value=False)
+            self.memory_budget_mb = DEFAULT_MEMORY_BUDGET_MB
+
+        # decoded images are cached, so going back to previous parameters doesn't require decoding again
+        self.decode_cache = HeatCache("decode_cache", self.decode_cache_size_mb * 1024 * 1024)
+        self.stage_caches = HeatStageCaches(self.stage_cache_size_mb * 1024 * 1024)
+        self.unswizzler = HeatUnswizzler(HeatCache("unswizzle_map_cache", self.unswizzle_map_cache_size_mb * 1024 * 1024))
+
+        # all big buffers (images, caches, preview) are accounted in one memory budget,
+        # owners are registered when preview canvas is created
+        self.memory_budget = HeatMemoryBudget(self.memory_budget_mb * 1024 * 1024)
+
+        # likely next images (next/previous page or pixel format) are decoded to cache in the background
+        self.render_prefetcher = RenderPrefetcher(self.decode_cache, self.stage_caches, self.unswizzler, self.memory_budget)
+
+        # stage timings of the last render jobs, shown in performance HUD
+        self.render_timings_history = RenderTimingsHistory()
+
+        # armed by "Profile next reload", taken by the next render job
+        self.heat_profiler: Optional[HeatProfiler] = None
 
         ########################
         # MAIN FRAME           #
@@ -370,17 +428,7 @@ class ImageHeatGUI():
             curr_start_offset: int = 0
             curr_width: int = 1
             curr_height: int = 1
-            block_width: int = 1
-            block_height: int = 1
             current_pixel_format: str = self.pixel_format_combobox.get()
-            image_format: ImageFormats = ImageFormats[current_pixel_format]
-            bpp: int = get_bpp_for_image_format(image_format)
-            bytes_per_pixel: int = convert_bpp_to_bytes_per_pixel(bpp)
-
-            if is_compressed_image_format(image_format):
-                bytes_per_pixel = get_block_data_size(image_format)
-                block_width = 4
-                block_height = 4
 
             try:
                 curr_start_offset = int(self.current_start_offset.get())
@@ -388,7 +436,7 @@ class ImageHeatGUI():
                 curr_height = int(self.current_height.get())
             except Exception:
                 pass
-            page_size: int = (curr_width // block_width) * (curr_height // block_height) * bytes_per_pixel
+            page_size: int = get_page_size(current_pixel_format, curr_width, curr_height)
             new_start_offset: int = curr_start_offset - page_size
             if new_start_offset >= 0:
                 self.current_start_offset.set(str(new_start_offset))
@@ -403,17 +451,7 @@ class ImageHeatGUI():
             curr_end_offset: int = 0
             curr_width: int = 1
             curr_height: int = 1
-            block_width: int = 1
-            block_height: int = 1
             current_pixel_format: str = self.pixel_format_combobox.get()
-            image_format: ImageFormats = ImageFormats[current_pixel_format]
-            bpp: int = get_bpp_for_image_format(image_format)
-            bytes_per_pixel: int = convert_bpp_to_bytes_per_pixel(bpp)
-
-            if is_compressed_image_format(image_format):
-                bytes_per_pixel = get_block_data_size(image_format)
-                block_width = 4
-                block_height = 4
 
             try:
                 curr_start_offset = int(self.current_start_offset.get())
@@ -422,7 +460,7 @@ class ImageHeatGUI():
                 curr_height = int(self.current_height.get())
             except Exception:
                 pass
-            page_size: int = (curr_width // block_width) * (curr_height // block_height) * bytes_per_pixel
+            page_size: int = get_page_size(current_pixel_format, curr_width, curr_height)
             new_start_offset: int = curr_start_offset + page_size
             new_end_offset: int = curr_end_offset + page_size
             if new_start_offset <= self.gui_params.total_file_size:
@@ -810,6 +848,9 @@ class ImageHeatGUI():
             self.get_translation_text(TranslationKeys.TRANSLATION_TEXT_INFO_PIXEL_VALUE), ""), wrap=None)
         self.infobox_pixel_value_hex_label.place(x=5, y=105, width=175, height=18)
 
+        # performance HUD is placed only when enabled
+        self.infobox_performance_hud_label = tk.Label(self.info_labelframe, text="", font=("Courier", 7), justify="left", anchor="nw")
+
         ##########################
         # CONTROLS BOX #
         ##########################
@@ -821,6 +862,7 @@ class ImageHeatGUI():
         self.controls_all_info_label = HTMLLabel(self.controls_labelframe, html=self._get_html_for_controls_label(),
                                                  wrap=None)
         self.controls_all_info_label.place(x=5, y=5, width=185, height=190)
+        self.set_performance_hud_visibility()
 
         ##########################
         # POST-PROCESSING BOX #
@@ -980,8 +1022,9 @@ class ImageHeatGUI():
                                      command=self.preview_instance.xview)
         self.h_scroll.grid(row=1, column=0, sticky="ew")
 
-        # bind scrollbars to canvas
-        self.preview_instance.configure(yscrollcommand=self.v_scroll.set, xscrollcommand=self.h_scroll.set)
+        # bind scrollbars to canvas (image is drawn as tiles, only the visible ones are created)
+        self.tiled_canvas = TiledCanvas(self.preview_instance, self.h_scroll, self.v_scroll)
+        self.register_memory_owners()
 
         # bind mouse wheel to scroll
         self.preview_instance.bind('<Motion>', self._mouse_motion_handler)
@@ -1063,6 +1106,10 @@ class ImageHeatGUI():
             label=self.get_translation_text(TranslationKeys.TRANSLATION_TEXT_OPTIONSMENU_BACKGROUND_CHECKERBOARD),
             variable=self.current_background_color, value="checkerboard", command=lambda: self.reload_image_callback(None)
         )
+        self.optionsmenu.add_checkbutton(label=self.get_translation_text(TranslationKeys.TRANSLATION_TEXT_OPTIONSMENU_PERFORMANCE_HUD),
+                                         variable=self.performance_hud_flag, command=lambda: self.toggle_performance_hud())
+        self.optionsmenu.add_command(label=self.get_translation_text(TranslationKeys.TRANSLATION_TEXT_OPTIONSMENU_PROFILE_NEXT_RELOAD),
+                                     command=lambda: self.profile_next_reload())
 
         self.menubar.add_cascade(label=self.get_translation_text(TranslationKeys.TRANSLATION_TEXT_OPTIONSMENU_OPTIONS),
                                  menu=self.optionsmenu)
@@ -1205,6 +1252,8 @@ class ImageHeatGUI():
 
         self.optionsmenu.entryconfigure(0, label=self.get_translation_text(TranslationKeys.TRANSLATION_TEXT_OPTIONSMENU_LANGUAGE))
         self.optionsmenu.entryconfigure(1, label=self.get_translation_text(TranslationKeys.TRANSLATION_TEXT_OPTIONSMENU_BACKGROUND_COLOR))
+        self.optionsmenu.entryconfigure(2, label=self.get_translation_text(TranslationKeys.TRANSLATION_TEXT_OPTIONSMENU_PERFORMANCE_HUD))
+        self.optionsmenu.entryconfigure(3, label=self.get_translation_text(TranslationKeys.TRANSLATION_TEXT_OPTIONSMENU_PROFILE_NEXT_RELOAD))
         self.languagemenu.entryconfigure(0, label=self.get_translation_text(TranslationKeys.TRANSLATION_TEXT_OPTIONSMENU_LANGUAGE_EN))
         self.languagemenu.entryconfigure(1, label=self.get_translation_text(TranslationKeys.TRANSLATION_TEXT_OPTIONSMENU_LANGUAGE_PL))
         self.languagemenu.entryconfigure(2, label=self.get_translation_text(TranslationKeys.TRANSLATION_TEXT_OPTIONSMENU_LANGUAGE_UA))
@@ -1457,8 +1506,6 @@ class ImageHeatGUI():
 
         # heat image logic
         if self.opened_image:
-            self.opened_image.gui_params = self.gui_params
-            self.opened_image.image_reload()
             self.init_image_preview_logic()
         else:
             logger.info("Image is not opened yet...")
@@ -1507,9 +1554,11 @@ class ImageHeatGUI():
         self.get_gui_params_from_gui_elements()
 
         # heat image logic
-        self.opened_image = HeatImage(self.gui_params)
-        self.opened_image.image_reload()
-        self.init_image_preview_logic()
+        previous_image: Optional[HeatImage] = self.opened_image
+        self.preview_snapshot = None  # previous file can't be closed while its data is referenced
+        self.opened_image = HeatImage(self.gui_params.get_decode_spec(), self.decode_cache, self.stage_caches, self.unswizzler,
+                                      self.memory_budget)
+        self.init_image_preview_logic(previous_image)
 
         # menu bar logic
         self.filemenu.entryconfig(1, state="normal")
@@ -1555,7 +1604,9 @@ class ImageHeatGUI():
 
     # File > Save As
     def export_image_file(self) -> bool:
-        if self.opened_image:
+        # shown image is exported, render worker may be reloading opened image at the same time
+        preview_snapshot: Optional[PreviewSnapshot] = self.preview_snapshot
+        if self.opened_image and preview_snapshot is not None:
             out_file = None
             try:
                 out_file = filedialog.asksaveasfile(
@@ -1587,42 +1638,11 @@ class ImageHeatGUI():
 
             try:
                 # generate full size image from raw data
-                orig_width = int(self.gui_params.img_width)
-                orig_height = int(self.gui_params.img_height)
-                raw_data = self.opened_image.decoded_image_data
-
-                # create a new PIL image from raw data not scaling it
-                # pack converted RGBA data
-                export_pil_img = Image.frombuffer(
-                        "RGBA",
-                        (orig_width, orig_height),
-                        raw_data,
-                        "raw",
-                        "RGBA",
-                        0,
-                        1,
-                )
-
-                # apply post-processing transformations
-                if self.gui_params.vertical_flip_flag:
-                    export_pil_img = export_pil_img.transpose(Transpose.FLIP_TOP_BOTTOM)
-                if self.gui_params.horizontal_flip_flag:
-                    export_pil_img = export_pil_img.transpose(Transpose.FLIP_LEFT_RIGHT)
-
-                rotate_id = get_rotate_id(self.gui_params.rotate_name)
-                if rotate_id == "rotate_90_left":
-                    export_pil_img = export_pil_img.transpose(Transpose.ROTATE_90)
-                elif rotate_id == "rotate_90_right":
-                    export_pil_img = export_pil_img.transpose(Transpose.ROTATE_270)
-                elif rotate_id == "rotate_180":
-                    export_pil_img = export_pil_img.transpose(Transpose.ROTATE_180)
+                export_pil_img = get_export_image(preview_snapshot.decoded_image_data, preview_snapshot.img_width, preview_snapshot.img_height,
+                                                  preview_snapshot.view_spec)
 
                 # exporting
-                file_extension: str = get_file_extension_uppercase(out_file.name)
-                pillow_wrapper = PillowWrapper()
-
-                out_data = pillow_wrapper.get_pil_image_file_data_for_export2(
-                    export_pil_img, pillow_format=file_extension)
+                out_data = get_export_file_data(export_pil_img, out_file.name)
 
                 if not out_data:
                     logger.error("Empty data to export!")
@@ -1643,6 +1663,8 @@ class ImageHeatGUI():
                     out_file.close()
                 return False
 
+        elif self.opened_image:
+            logger.info("Image is not decoded yet, nothing to export...")
         else:
             logger.info("Image is not opened yet...")
 
@@ -1650,7 +1672,9 @@ class ImageHeatGUI():
 
     # File > Save Raw Data
     def export_raw_file(self) -> bool:
-        if self.opened_image:
+        # shown image is exported, render worker may be reloading opened image at the same time
+        preview_snapshot: Optional[PreviewSnapshot] = self.preview_snapshot
+        if self.opened_image and preview_snapshot is not None:
             out_file = None
             try:
                 out_file = filedialog.asksaveasfile(
@@ -1677,18 +1701,118 @@ class ImageHeatGUI():
             if out_file is None:
                 return False  # user closed file dialog on purpose
 
-            out_data: bytes = self.opened_image.encoded_image_data
+            out_data: bytes = preview_snapshot.encoded_image_data
 
             out_file.write(out_data)
             out_file.close()
             messagebox.showinfo("Info", self.get_translation_text(
                 TranslationKeys.TRANSLATION_TEXT_POPUPS_RAW_DATA_SAVED_SUCCESSFULLY))
             logger.info(f"Raw data has been exported successfully to {out_file.name}")
+        elif self.opened_image:
+            logger.info("Image is not decoded yet, nothing to export...")
         else:
             logger.info("Image is not opened yet...")
 
         return True
 
+    def toggle_performance_hud(self) -> None:
+        self.set_performance_hud_visibility()
+        try:
+            self.user_config.set("config", ConfigKeys.PERFORMANCE_HUD_FLAG, str(self.performance_hud_flag.get()))
+            with open(self.user_config_file_path, "w") as configfile:
+                self.user_config.write(configfile)
+        except Exception:
+            pass
+
+    def set_performance_hud_visibility(self) -> None:
+        # HUD extends the info box down, in place of the controls box
+        if self.performance_hud_flag.get():
+            self.controls_labelframe.place_forget()
+            self.info_labelframe.place(x=-200, y=5, width=195, height=360, relx=1)
+            self.infobox_performance_hud_label.place(x=5, y=125, width=185, height=210)
+            self.update_performance_hud()
+        else:
+            self.infobox_performance_hud_label.place_forget()
+            self.info_labelframe.place(x=-200, y=5, width=195, height=145, relx=1)
+            self.controls_labelframe.place(x=-200, y=150, width=195, height=215, relx=1)
+
+    def update_performance_hud(self) -> None:
+        if self.performance_hud_flag.get():
+            self.infobox_performance_hud_label.config(text=self.render_timings_history.get_hud_text() + "\n\n" + self.memory_budget.get_hud_text())
+
+    def register_memory_owners(self) -> bool:
+        # buffers are released in this order when memory budget is exceeded: caches, zoom levels, image intermediates
+        self.memory_budget.register("caches", self.get_caches_memory_sizes, self.clear_caches)
+        self.memory_budget.register("preview", self.get_preview_memory_sizes, self.release_preview_memory)
+        self.memory_budget.register("image", lambda: self.opened_image.get_memory_sizes() if self.opened_image else {},
+                                    lambda: self.opened_image.release_intermediates() if self.opened_image else False)
+        self.memory_budget.register("prefetch", self.render_prefetcher.get_memory_sizes)
+        return True
+
+    def get_caches_memory_sizes(self) -> dict:
+        return {MEMORY_CACHES: self.decode_cache.get_size_bytes() + self.unswizzler.map_cache.get_size_bytes() + self.stage_caches.get_size_bytes()
+                + HeatDecoder.lut_cache.get_size_bytes() + HeatDecoder.palette_lut_cache.get_size_bytes()}
+
+    def clear_caches(self) -> bool:
+        self.decode_cache.clear()
+        self.stage_caches.clear()
+        self.unswizzler.map_cache.clear()
+        HeatDecoder.lut_cache.clear()
+        HeatDecoder.palette_lut_cache.clear()
+        return True
+
+    def get_preview_memory_sizes(self) -> dict:
+        # memory budget is checked by render and prefetch workers, Tk state (tiles, shown image) is measured only on main thread,
+        # workers get the last measured size
+        if threading.current_thread() is threading.main_thread():
+            self._update_preview_canvas_memory_size()
+        preview_size: int = self.preview_canvas_memory_size
+        zoom_pyramid: Optional[ZoomPyramid] = self.zoom_pyramid
+        if zoom_pyramid is not None:
+            preview_size += zoom_pyramid.get_memory_size()
+        return {MEMORY_PREVIEW: preview_size}
+
+    def _update_preview_canvas_memory_size(self) -> bool:
+        canvas_memory_size: int = self.tiled_canvas.get_memory_size() if self.tiled_canvas is not None else 0
+        preview_image = self.preview_final_pil_image
+        zoom_pyramid: Optional[ZoomPyramid] = self.zoom_pyramid
+        if preview_image is not None and zoom_pyramid is not None and not zoom_pyramid.is_own_image(preview_image):
+            canvas_memory_size += get_image_data_length(preview_image)  # flipped, rotated or single channel copy
+        self.preview_canvas_memory_size = canvas_memory_size
+        return True
+
+    def release_preview_memory(self) -> bool:
+        # zoom levels are built again when needed (zoom pyramid is used by render worker, its cache is locked),
+        # spare tiles are Tk objects, so they are released on main thread
+        zoom_pyramid: Optional[ZoomPyramid] = self.zoom_pyramid
+        if zoom_pyramid is not None:
+            zoom_pyramid.levels.clear()
+        if threading.current_thread() is threading.main_thread():
+            self._release_canvas_memory()
+        else:
+            self.master.after(0, self._release_canvas_memory)
+        return True
+
+    def _release_canvas_memory(self) -> bool:
+        if self.tiled_canvas is not None:
+            self.tiled_canvas.release_spare_tiles()
+        self._update_preview_canvas_memory_size()
+        return True
+
+    def profile_next_reload(self) -> bool:
+        self.heat_profiler = HeatProfiler(get_profile_directory(self.MAIN_DIRECTORY))
+        if self.opened_image:
+            logger.info("Profiling image reload...")
+            self.reload_image_callback(None)
+        else:
+            logger.info("Next image reload will be profiled")
+        return True
+
+    def _stop_heat_profiler(self, heat_profiler: HeatProfiler, decode_spec: DecodeSpec, view_spec: ViewSpec) -> bool:
+        replay_file_path: str = os.path.splitext(decode_spec.img_file_path)[0] + "_profile.png"
+        heat_profiler.stop(decode_spec, view_spec, get_argv_from_specs(decode_spec, view_spec, replay_file_path))
+        return True
+
     def show_about_window(self):
         if not any(isinstance(x, tk.Toplevel) for x in self.master.winfo_children()):
             AboutWindow(self)
@@ -1704,54 +1828,27 @@ class ImageHeatGUI():
     def close_toplevel_window(wind):
         wind.destroy()
 
-    def init_image_preview_logic(self) -> bool:
-        if self.opened_image.is_preview_error:
-            self.execute_error_preview_logic()
-        else:
-            self.execute_image_preview_logic()
-        return True
-
-    def _get_checkerboard_pattern(self, width: int, height: int) -> Image.Image:
-        """
-        Generates or retrieves a cached checkerboard pattern PIL Image.
-        """
-
-        if self.checkerboard_cache and self.checkerboard_cache.width >= width and \
-                self.checkerboard_cache.height >= height:
-            return self.checkerboard_cache.crop((0, 0, width, height))
-
-        # if not cached or too small, create a new one
-        new_w = max(width, 2048)
-        new_h = max(height, 2048)
-
-        square_size = 10  # cell size
-        color1 = "#8f8f8f"
-        color2 = "#bababa"
-
-        # create single 2x2 tile
-        tile = Image.new("RGB", (square_size * 2, square_size * 2), color1)
-        draw = ImageDraw.Draw(tile)
-        draw.rectangle((square_size, 0, square_size * 2 - 1, square_size - 1), fill=color2)
-        draw.rectangle((0, square_size, square_size - 1, square_size * 2 - 1), fill=color2)
-
-        # create a row by repeating the tile
-        row = Image.new("RGB", (new_w, square_size * 2))
-        for x in range(0, new_w, square_size * 2):
-            row.paste(tile, (x, 0))
-
-        # create final image by stacking rows
-        final_bg = Image.new("RGB", (new_w, new_h))
-        for y in range(0, new_h, square_size * 2):
-            final_bg.paste(row, (0, y))
+    def init_image_preview_logic(self, image_to_close: Optional[HeatImage] = None) -> bool:
+        logger.info("[PREVIEW] Init image preview...")
+        start_time = time.time()
+        self.master.config(cursor="watch")
 
-        self.checkerboard_cache = final_bg
-        return final_bg.crop((0, 0, width, height))
+        # worker gets immutable snapshot of params, so GUI changes can't affect the job in progress
+        decode_spec: DecodeSpec = self.gui_params.get_decode_spec()
+        view_spec: ViewSpec = self.gui_params.get_view_spec()
+        self.render_prefetcher.cancel()
+        heat_profiler, self.heat_profiler = self.heat_profiler, None
+        # previous image is closed by the worker, also when this job is superseded before start
+        self.render_scheduler.submit(self._threaded_image_processing, self.opened_image, decode_spec, view_spec, image_to_close, start_time,
+                                     heat_profiler, drop_function=image_to_close.image_close if image_to_close else None)
+        return True
 
     def execute_error_preview_logic(self) -> bool:
         pil_img = Image.open(self.preview_image_path)
         pil_img = pil_img.resize((500, 367))
 
-        self.preview_instance.delete("all")
+        self.tiled_canvas.clear()
+        self._update_preview_canvas_memory_size()
         # canvas image must be kept as instance variable to prevent garbage collection
 
         self.ph_img = ImageTk.PhotoImage(pil_img)
@@ -1773,64 +1870,90 @@ class ImageHeatGUI():
 
         return True
 
-    def execute_image_preview_logic(self) -> bool:
-        logger.info("[PREVIEW] Init image preview...")
-        start_time = time.time()
-
-        self.master.config(cursor="watch")
+    def _threaded_image_processing(self, generation: int, heat_image: HeatImage, decode_spec: DecodeSpec, view_spec: ViewSpec,
+                                   image_to_close: Optional[HeatImage], start_time: float, heat_profiler: Optional[HeatProfiler] = None):
+        is_profiler_passed: bool = False
+        try:
+            logger.info(f"[PREVIEW] Render job #{generation} started...")
+            if image_to_close:
+                image_to_close.image_close()
+
+            # decode logic
+            heat_image.decode_spec = decode_spec
+            if heat_profiler is not None:
+                # caches are skipped, so the whole decode is captured
+                heat_profiler.start()
+                heat_image.image_reload(is_cache_used=False)
+                render_timings: RenderTimings = heat_image.render_timings
+            elif heat_image.is_decode_required():
+                heat_image.image_reload()
+                render_timings = heat_image.render_timings
+            else:
+                logger.info("Only view parameters changed, skipping image decode...")
+                render_timings = RenderTimings()
 
-        threading.Thread(
-            target=self._threaded_image_processing,
-            args=(start_time,),
-            daemon=True
-        ).start()
-        return True
+            if not self.render_scheduler.is_job_current(generation):
+                logger.info(f"[PREVIEW] Render job #{generation} superseded, dropping result")
+                return
 
-    def _threaded_image_processing(self, start_time):
-        try:
-            logger.info("[PREVIEW] Background thread started...")
+            if heat_image.is_preview_error:
+                self.master.after(0, self._show_error_preview_on_main_thread, generation, heat_image.memory_error_message)
+                return
 
-            preview_img_width = int(self.gui_params.img_width)
-            preview_img_height = int(self.gui_params.img_height)
+            # post-processing logic
+            # decode may align image dimensions (e.g. PS4 padding)
+            decoded_img_width: int = int(heat_image.img_width)
+            decoded_img_height: int = int(heat_image.img_height)
+            preview_img_width = decoded_img_width
+            preview_img_height = decoded_img_height
 
             if preview_img_width <= 0 or preview_img_height <= 0:
                 self.master.after(0, lambda: self.master.config(cursor=""))
                 return
 
-            preview_data_size = preview_img_width * preview_img_height * 4
-
-            if preview_data_size > len(self.opened_image.decoded_image_data):
-                preview_data = self.opened_image.decoded_image_data
-            else:
-                preview_data = self.opened_image.decoded_image_data[:preview_data_size]
-
-            pil_img = Image.frombuffer(
-                "RGBA",
-                (preview_img_width, preview_img_height),
-                preview_data,
-                "raw",
-                "RGBA",
-                0,
-                1,
-            )
+            # zoom pyramid is built once per decoded image
+            resize_start_time = time.perf_counter()
+            zoom_pyramid: Optional[ZoomPyramid] = self.zoom_pyramid
+            if zoom_pyramid is None or not zoom_pyramid.is_built_for(heat_image.decoded_image_data, preview_img_width, preview_img_height):
+                preview_data_size = preview_img_width * preview_img_height * 4
 
-            self.preview_zoom_value = get_zoom_value(self.gui_params.zoom_name)
-
-            if self.preview_zoom_value != 1.0:
-                target_width = int(self.preview_zoom_value * preview_img_width)
-                target_height = int(self.preview_zoom_value * preview_img_height)
+                if preview_data_size > len(heat_image.decoded_image_data):
+                    preview_data = heat_image.decoded_image_data
+                else:
+                    preview_data = heat_image.decoded_image_data[:preview_data_size]
+
+                pil_img = Image.frombuffer(
+                    "RGBA",
+                    (preview_img_width, preview_img_height),
+                    preview_data,
+                    "raw",
+                    "RGBA",
+                    0,
+                    1,
+                )
+                zoom_pyramid = ZoomPyramid(pil_img, heat_image.decoded_image_data)
+                self.zoom_pyramid = zoom_pyramid
 
-                pil_img = pil_img.resize((target_width, target_height),
-                                         get_resampling_type(self.gui_params.zoom_resampling_name))
-                preview_img_width, preview_img_height = target_width, target_height
+            preview_zoom_value = get_zoom_value(view_spec.zoom_name)
+            resampling_type = get_resampling_type(view_spec.zoom_resampling_name)
 
+            display_scale: float = 1
+            if is_viewport_zoom(preview_zoom_value):
+                # upscaled only for visible tiles
+                display_scale = preview_zoom_value
+                pil_img = zoom_pyramid.base_image
+            else:
+                pil_img = zoom_pyramid.get_level(preview_zoom_value, resampling_type)
+            preview_img_width, preview_img_height = int(pil_img.width * display_scale), int(pil_img.height * display_scale)
+            render_timings.add_stage(STAGE_RESIZE, resize_start_time, get_image_data_length(zoom_pyramid.base_image), get_image_data_length(pil_img))
 
-            if self.gui_params.vertical_flip_flag:
+            transpose_start_time = time.perf_counter()
+            if view_spec.vertical_flip_flag:
                 pil_img = pil_img.transpose(Transpose.FLIP_TOP_BOTTOM)
-            if self.gui_params.horizontal_flip_flag:
+            if view_spec.horizontal_flip_flag:
                 pil_img = pil_img.transpose(Transpose.FLIP_LEFT_RIGHT)
 
-            rotate_id = get_rotate_id(self.gui_params.rotate_name)
+            rotate_id = get_rotate_id(view_spec.rotate_name)
             if rotate_id == "rotate_90_left":
                 preview_img_width, preview_img_height = preview_img_height, preview_img_width
                 pil_img = pil_img.transpose(Transpose.ROTATE_90)
@@ -1839,19 +1962,20 @@ class ImageHeatGUI():
                 pil_img = pil_img.transpose(Transpose.ROTATE_270)
             elif rotate_id == "rotate_180":
                 pil_img = pil_img.transpose(Transpose.ROTATE_180)
+            if view_spec.vertical_flip_flag or view_spec.horizontal_flip_flag or rotate_id != "none":
+                render_timings.add_stage(STAGE_TRANSPOSE, transpose_start_time, get_image_data_length(pil_img), get_image_data_length(pil_img))
 
-            channel_mode = getattr(self.gui_params, 'view_channel_mode', 'RGBA')
+            channel_mode = view_spec.view_channel_mode
 
             final_pil_image = None
 
             if channel_mode == "RGBA":
-                # default logic for normal viewing
-                mask = pil_img.copy()
-                mask.putalpha(1)
-                mask.paste(pil_img, (0, 0), pil_img)
-                final_pil_image = mask.copy()
+                # default logic for normal viewing,
+                # RGBA is blended with background in one pass, only for tiles that are drawn
+                final_pil_image = pil_img
             else:
                 # logic for single channel viewing
+                channel_start_time = time.perf_counter()
                 try:
                     # check if channel exists in image
                     bands = pil_img.getbands()
@@ -1876,70 +2000,101 @@ class ImageHeatGUI():
                     logger.error(f"Error extracting channel {channel_mode}: {e}")
                     # Fallback to normal image
                     final_pil_image = pil_img.convert("RGB")
+                render_timings.add_stage(STAGE_CHANNEL, channel_start_time, get_image_data_length(pil_img), get_image_data_length(final_pil_image))
+
+            if not self.render_scheduler.is_job_current(generation):
+                logger.info(f"[PREVIEW] Render job #{generation} superseded, dropping result")
+                return
 
-            self.master.after(0, self._update_canvas_on_main_thread, final_pil_image, preview_img_width,
-                              preview_img_height, start_time)
+            if heat_profiler is not None:
+                heat_profiler.pause()  # drawing is profiled on main thread
+                is_profiler_passed = True
+            preview_snapshot: PreviewSnapshot = PreviewSnapshot(decode_spec, view_spec, heat_image.encoded_image_data, heat_image.decoded_image_data,
+                                                                decoded_img_width, decoded_img_height)
+            self.master.after(0, self._update_canvas_on_main_thread, generation, decode_spec, view_spec, preview_snapshot,
+                              preview_zoom_value, final_pil_image, preview_img_width, preview_img_height, display_scale, render_timings, start_time,
+                              heat_profiler)
 
         except Exception as error:
             logger.error(f"Error in background thread: {error}")
-            self.master.after(0, lambda: self.master.config(cursor=""))
+            if self.render_scheduler.is_job_current(generation):
+                self.master.after(0, lambda: self.master.config(cursor=""))
+        finally:
+            if heat_profiler is not None and not is_profiler_passed:
+                self._stop_heat_profiler(heat_profiler, decode_spec, view_spec)  # failed or superseded job is profiled too
 
-    def _update_canvas_on_main_thread(self, pil_img, width, height, start_time):
+    def _show_error_preview_on_main_thread(self, generation: int, memory_error_message: Optional[str] = None):
+        if not self.render_scheduler.is_job_current(generation):
+            return
+        self.preview_snapshot = None
         try:
-            self.ph_img = ImageTk.PhotoImage(pil_img)
-            self.preview_final_pil_image = pil_img
+            self.execute_error_preview_logic()
+            self.update_performance_hud()
+        except Exception as e:
+            logger.error(f"Error updating canvas: {e}")
+        finally:
+            self.master.config(cursor="")
+        if memory_error_message:
+            messagebox.showwarning("Warning", self.get_translation_text(TranslationKeys.TRANSLATION_TEXT_POPUPS_MEMORY_BUDGET_EXCEEDED)
+                                   + "\n\n" + memory_error_message)
+
+    def _update_canvas_on_main_thread(self, generation, decode_spec, view_spec, preview_snapshot, preview_zoom_value, pil_img, width, height,
+                                      display_scale, render_timings, start_time, heat_profiler=None):
+        if heat_profiler is not None:
+            heat_profiler.resume()
+        # only the newest frame is drawn
+        if not self.render_scheduler.is_job_current(generation):
+            if heat_profiler is not None:
+                self._stop_heat_profiler(heat_profiler, decode_spec, view_spec)
+            return
+        try:
+            # decode may align image dimensions (e.g. PS4 padding)
+            self.gui_params.img_width, self.gui_params.img_height = preview_snapshot.img_width, preview_snapshot.img_height
+            self.preview_zoom_value = preview_zoom_value
 
-            # clearing the canvas instead of destroying
-            self.preview_instance.delete("all")
+            self.preview_final_pil_image = pil_img
+            self.preview_snapshot = preview_snapshot
 
             # updating background color
             user_chosen_bg = self.current_background_color.get()
 
-            # drawing background
-            if user_chosen_bg == "checkerboard":
-                # logic for checkerboard background
-                bg_pil = self._get_checkerboard_pattern(width, height)
-                self.bg_ph_img = ImageTk.PhotoImage(bg_pil)
-                self.preview_instance.create_image(
-                    0, 0,
-                    anchor="nw",
-                    image=self.bg_ph_img
-                )
-            else:
-                # drawing rectangle as background
-                self.preview_instance.create_rectangle(
-                    0, 0, width, height,
-                    fill=user_chosen_bg,
-                    outline=""
-                )
-
-            # creating image at top-left corner (nw) at point 0,0
-            self.preview_instance.create_image(
-                0,
-                0,
-                anchor="nw",
-                image=self.ph_img,
-            )
-
-            # setting scroll region to image size
-            self.preview_instance.configure(scrollregion=(0, 0, width, height))
+            # only tiles visible in the viewport are converted to PhotoImage,
+            # the rest is created on demand while scrolling
+            self.ph_img = None
+            self.tiled_canvas.set_image(pil_img, user_chosen_bg, display_scale, get_resampling_type(view_spec.zoom_resampling_name), render_timings)
+            self._update_preview_canvas_memory_size()
+            self.render_prefetcher.submit(decode_spec)
 
             execution_time = time.time() - start_time
-            logger.info(f"[PREVIEW] Image preview for pixel_format={self.gui_params.pixel_format}"
-                        f" finished successfully. Time: {round(execution_time, 2)} seconds.")
+            render_timings.job_time = execution_time
+            self.render_timings_history.add(render_timings)
+            self.update_performance_hud()
+            trace_render_job("render", render_timings, decode_spec)
+            logger.info(f"[PREVIEW] Image preview for pixel_format={decode_spec.pixel_format}"
+                        f" finished successfully. Time: {round(execution_time, 2)} seconds. Stages: {render_timings.get_summary_str()}")
+            logger.info(f"[MEMORY] {self.memory_budget.get_stats_str()}")
 
         except Exception as e:
             logger.error(f"Error updating canvas: {e}")
         finally:
             self.master.config(cursor="")
+            if heat_profiler is not None:
+                self._stop_heat_profiler(heat_profiler, decode_spec, view_spec)
 
     def _mouse_motion_handler(self, event):
-        if self.opened_image is None or not self.gui_params.pixel_format:
+        # everything is read from the snapshot of the shown image, render worker may be changing opened image
+        preview_snapshot: Optional[PreviewSnapshot] = self.preview_snapshot
+        if preview_snapshot is None or preview_snapshot.decode_spec.pixel_format not in PIXEL_FORMATS_NAMES:
             return
+        decode_spec: DecodeSpec = preview_snapshot.decode_spec
+        view_spec: ViewSpec = preview_snapshot.view_spec
+        img_width: int = preview_snapshot.img_width
+        img_height: int = preview_snapshot.img_height
+
         # getting params
-        image_format: ImageFormats = ImageFormats[self.gui_params.pixel_format]
-        compression_id: str = get_compression_id(self.gui_params.compression_type)
-        m_rotate_id = get_rotate_id(self.gui_params.rotate_name)
+        image_format: ImageFormats = ImageFormats[decode_spec.pixel_format]
+        compression_id: str = get_compression_id(decode_spec.compression_type)
+        m_rotate_id = get_rotate_id(view_spec.rotate_name)
         bpp: int = get_bpp_for_image_format(image_format)
         bytes_per_pixel: float = convert_bpp_to_bytes_per_pixel_float(bpp)
 
@@ -1950,41 +2105,41 @@ class ImageHeatGUI():
         x = int(math.ceil((canvas_x + 1) / self.preview_zoom_value))
         y = int(math.ceil((canvas_y + 1) / self.preview_zoom_value))
 
-        if self.gui_params.vertical_flip_flag:
-            y = self.gui_params.img_height - y + 1
-        if self.gui_params.horizontal_flip_flag:
-            x = self.gui_params.img_width - x + 1
+        if view_spec.vertical_flip_flag:
+            y = img_height - y + 1
+        if view_spec.horizontal_flip_flag:
+            x = img_width - x + 1
 
         if m_rotate_id == "none":
             pass
         elif m_rotate_id == "rotate_90_left":
             temp_x = x
-            x = self.gui_params.img_width - y + 1
+            x = img_width - y + 1
             y = temp_x
         elif m_rotate_id == "rotate_90_right":
             temp_x = x
             x = y
-            y = self.gui_params.img_height - temp_x + 1
+            y = img_height - temp_x + 1
         elif m_rotate_id == "rotate_180":
-            x = self.gui_params.img_width - x + 1
-            y = self.gui_params.img_height - y + 1
+            x = img_width - x + 1
+            y = img_height - y + 1
         else:
             logger.warning(f"Not supported rotate type selected! Rotate_id: {m_rotate_id}")
 
         self.pixel_x = x
         self.pixel_y = y
 
-        if (self.pixel_x > self.gui_params.img_width
-                or self.pixel_y > self.gui_params.img_height
+        if (self.pixel_x > img_width
+                or self.pixel_y > img_height
                 or self.pixel_x < 0
                 or self.pixel_y < 0):
             return  # mouse cursor is in canvas, but it's not in image data
 
         # pixel offset logic
-        self.pixel_offset = int((self.pixel_y - 1) * self.gui_params.img_width * bytes_per_pixel + self.pixel_x * bytes_per_pixel - bytes_per_pixel)
-        pixel_offset_rgba: int = int((self.pixel_y - 1) * self.gui_params.img_width * 4 + self.pixel_x * 4 - 4)
+        self.pixel_offset = int((self.pixel_y - 1) * img_width * bytes_per_pixel + self.pixel_x * bytes_per_pixel - bytes_per_pixel)
+        pixel_offset_rgba: int = int((self.pixel_y - 1) * img_width * 4 + self.pixel_x * 4 - 4)
 
-        if self.pixel_offset + bytes_per_pixel <= (self.gui_params.img_end_offset - self.gui_params.img_start_offset):
+        if self.pixel_offset + bytes_per_pixel <= (decode_spec.img_end_offset - decode_spec.img_start_offset):
 
             self.infobox_pixel_x_label.set_html(self._get_html_for_infobox_label(
                 self.get_translation_text(TranslationKeys.TRANSLATION_TEXT_INFO_PIXEL_X), str(self.pixel_x)))
@@ -1992,10 +2147,9 @@ class ImageHeatGUI():
                 self.get_translation_text(TranslationKeys.TRANSLATION_TEXT_INFO_PIXEL_Y), str(self.pixel_y)))
 
             if not is_compressed_image_format(image_format) and compression_id == "none":
-                pixel_value: bytearray = self.opened_image.encoded_image_data[
-                    self.pixel_offset: self.pixel_offset + int(bytes_per_pixel)]
+                pixel_value: bytes = bytes(preview_snapshot.encoded_image_data[self.pixel_offset: self.pixel_offset + int(bytes_per_pixel)])
                 self.pixel_value_str = convert_bytes_to_hex_string(pixel_value)
-                self.pixel_value_rgba = self.opened_image.decoded_image_data[pixel_offset_rgba: pixel_offset_rgba + 4]
+                self.pixel_value_rgba = bytes(preview_snapshot.decoded_image_data[pixel_offset_rgba: pixel_offset_rgba + 4])
                 self.infobox_pixel_offset_label.set_html(self._get_html_for_infobox_label(
                     self.get_translation_text(TranslationKeys.TRANSLATION_TEXT_INFO_PIXEL_OFFSET),
                     str(self.pixel_offset)))
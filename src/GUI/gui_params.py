@@ -10,6 +10,7 @@ from src.Image.constants import (
     DEFAULT_ZOOM_NAME,
     DEFAULT_ZOOM_RESAMPLING_NAME,
 )
+from src.Image.heatspec import DecodeSpec, ViewSpec
 
 
 class GuiParams:
@@ -43,3 +44,36 @@ class GuiParams:
         self.vertical_flip_flag: bool = False
         self.horizontal_flip_flag: bool = False
         self.rotate_name: str = DEFAULT_ROTATE_NAME
+        self.view_channel_mode: str = "RGBA"
+
+    def get_decode_spec(self) -> DecodeSpec:
+        # specs are built here, so Image modules (also used by CLI) don't depend on GUI
+        return DecodeSpec(
+            img_file_path=self.img_file_path,
+            total_file_size=self.total_file_size,
+            pixel_format=self.pixel_format,
+            endianess_type=self.endianess_type,
+            swizzling_type=self.swizzling_type,
+            compression_type=self.compression_type,
+            img_start_offset=self.img_start_offset,
+            img_end_offset=self.img_end_offset,
+            img_width=self.img_width,
+            img_height=self.img_height,
+            palette_format=self.palette_format,
+            palette_loadfrom_value=self.palette_loadfrom_value,
+            palette_file_path=self.palette_file_path,
+            palette_offset=self.palette_offset,
+            palette_scale_value=self.palette_scale_value,
+            palette_endianess=self.palette_endianess,
+            palette_ps2_swizzle_flag=self.palette_ps2_swizzle_flag,
+        )
+
+    def get_view_spec(self) -> ViewSpec:
+        return ViewSpec(
+            zoom_name=self.zoom_name,
+            zoom_resampling_name=self.zoom_resampling_name,
+            vertical_flip_flag=self.vertical_flip_flag,
+            horizontal_flip_flag=self.horizontal_flip_flag,
+            rotate_name=self.rotate_name,
+            view_channel_mode=self.view_channel_mode,
+        )
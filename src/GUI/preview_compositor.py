@@ -0,0 +1,51 @@
+"""
+Copyright © 2026  Bartłomiej Duda
+License: GPL-3.0 License
+"""
+
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image
+from reversebox.common.logger import get_logger
+
+logger = get_logger(__name__)
+
+# fmt: off
+
+CHECKERBOARD_BACKGROUND: str = "checkerboard"
+CHECKERBOARD_SQUARE_SIZE: int = 10
+CHECKERBOARD_COLORS: tuple = ((0x8F, 0x8F, 0x8F), (0xBA, 0xBA, 0xBA))
+
+
+@lru_cache(maxsize=8)
+def _get_checkerboard_image(width: int, height: int) -> Image.Image:
+    square_columns = (np.arange(width) // CHECKERBOARD_SQUARE_SIZE)[np.newaxis, :]
+    square_rows = (np.arange(height) // CHECKERBOARD_SQUARE_SIZE)[:, np.newaxis]
+    is_second_color = ((square_columns + square_rows) % 2).astype(bool)
+    checkerboard_pixels = np.where(is_second_color[:, :, np.newaxis], np.array(CHECKERBOARD_COLORS[1], dtype=np.uint8),
+                                   np.array(CHECKERBOARD_COLORS[0], dtype=np.uint8))
+    return Image.fromarray(checkerboard_pixels, "RGB")
+
+
+def get_background_image(background_color: str, width: int, height: int, offset_x: int = 0, offset_y: int = 0) -> Image.Image:
+    # offset is the position on canvas, so checkerboard squares are aligned between tiles
+    if background_color == CHECKERBOARD_BACKGROUND:
+        pattern_size: int = CHECKERBOARD_SQUARE_SIZE * 2
+        shift_x, shift_y = offset_x % pattern_size, offset_y % pattern_size
+        checkerboard_image = _get_checkerboard_image(width + pattern_size, height + pattern_size)
+        return checkerboard_image.crop((shift_x, shift_y, shift_x + width, shift_y + height))
+    return Image.new("RGB", (width, height), background_color)
+
+
+def composite_on_background(pil_img: Image.Image, background_color: str, offset_x: int = 0, offset_y: int = 0) -> Image.Image:
+    """
+    Blends RGBA image with selected background (solid color or checkerboard) in one pass.
+    Result is an opaque RGB image, so canvas doesn't need a separate background item.
+    """
+    if pil_img.mode != "RGBA":
+        return pil_img if pil_img.mode == "RGB" else pil_img.convert("RGB")
+
+    composited_image: Image.Image = get_background_image(background_color, pil_img.width, pil_img.height, offset_x, offset_y)
+    composited_image.paste(pil_img, (0, 0), pil_img)
+    return composited_image
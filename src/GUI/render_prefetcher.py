@@ -0,0 +1,144 @@
+"""
+Copyright © 2026  Bartłomiej Duda
+License: GPL-3.0 License
+"""
+
+from dataclasses import replace
+from typing import Optional
+
+from reversebox.common.logger import get_logger
+from reversebox.image.common import (
+    convert_bpp_to_bytes_per_pixel,
+    get_block_data_size,
+    get_bpp_for_image_format,
+    is_compressed_image_format,
+)
+from reversebox.image.image_formats import ImageFormats
+
+from src.GUI.render_scheduler import RenderScheduler
+from src.Image.constants import PIXEL_FORMATS_NAMES
+from src.Image.heatcache import HeatCache, HeatStageCaches
+from src.Image.heatimage import HeatImage
+from src.Image.heatmemory import (
+    HeatMemoryBudget,
+    get_decode_memory_estimate,
+    get_decoded_size_estimate,
+)
+from src.Image.heatsource import get_file_identity
+from src.Image.heatspec import DecodeSpec
+from src.Image.heattrace import trace_render_job
+from src.Image.heatunswizzle import HeatUnswizzler
+
+logger = get_logger(__name__)
+
+# fmt: off
+
+MAX_PREFETCH_JOBS: int = 4  # predicted images decoded after every preview
+MAX_PREFETCH_IMAGE_SIZE: int = 64 * 1024 * 1024  # decoded RGBA bytes, bigger images are not prefetched
+
+
+def get_page_size(pixel_format: str, img_width: int, img_height: int) -> int:
+    # number of bytes of one image, same as PageUp/PageDown step
+    image_format: ImageFormats = ImageFormats[pixel_format]
+    bytes_per_pixel: int = convert_bpp_to_bytes_per_pixel(get_bpp_for_image_format(image_format))
+    block_width: int = 1
+    block_height: int = 1
+
+    if is_compressed_image_format(image_format):
+        bytes_per_pixel = get_block_data_size(image_format)
+        block_width = 4
+        block_height = 4
+
+    return (img_width // block_width) * (img_height // block_height) * bytes_per_pixel
+
+
+def get_prefetch_specs(decode_spec: DecodeSpec) -> list:
+    # most likely next requests: next/previous page at current pixel format, then next/previous pixel format
+    prefetch_specs: list = []
+    try:
+        page_size: int = get_page_size(decode_spec.pixel_format, decode_spec.img_width, decode_spec.img_height)
+    except Exception:
+        page_size = 0
+
+    if page_size > 0:
+        new_start_offset: int = decode_spec.img_start_offset + page_size
+        if new_start_offset <= decode_spec.total_file_size:
+            new_end_offset: int = decode_spec.img_end_offset + page_size
+            if new_end_offset > decode_spec.total_file_size:
+                new_end_offset = decode_spec.img_end_offset
+            prefetch_specs.append(replace(decode_spec, img_start_offset=new_start_offset, img_end_offset=new_end_offset))
+
+    if decode_spec.pixel_format in PIXEL_FORMATS_NAMES:
+        format_number: int = PIXEL_FORMATS_NAMES.index(decode_spec.pixel_format)
+        prefetch_specs.append(replace(decode_spec, pixel_format=PIXEL_FORMATS_NAMES[(format_number + 1) % len(PIXEL_FORMATS_NAMES)]))
+
+    if page_size > 0 and decode_spec.img_start_offset - page_size >= 0:
+        prefetch_specs.append(replace(decode_spec, img_start_offset=decode_spec.img_start_offset - page_size))
+
+    if decode_spec.pixel_format in PIXEL_FORMATS_NAMES:
+        prefetch_specs.append(replace(decode_spec, pixel_format=PIXEL_FORMATS_NAMES[format_number - 1]))
+
+    return prefetch_specs
+
+
+class RenderPrefetcher:
+    """
+    Speculatively decodes the most likely next images (see get_prefetch_specs) into decode cache,
+    while user is looking at the current one, so PageUp/PageDown and pixel format cycling hit the cache.
+    Runs on its own background worker with its own HeatImage (caches are shared),
+    at most MAX_PREFETCH_JOBS images per preview. Prefetch is cancelled when parameters change.
+    Images that don't fit in free memory budget are not prefetched (other buffers are never released for prefetch).
+    """
+
+    def __init__(self, decode_cache: Optional[HeatCache], stage_caches: Optional[HeatStageCaches] = None,
+                 unswizzler: Optional[HeatUnswizzler] = None, memory_budget: Optional[HeatMemoryBudget] = None):
+        self.decode_cache: Optional[HeatCache] = decode_cache
+        self.stage_caches: Optional[HeatStageCaches] = stage_caches
+        self.unswizzler: Optional[HeatUnswizzler] = unswizzler
+        self.memory_budget: Optional[HeatMemoryBudget] = memory_budget
+        self.heat_image: Optional[HeatImage] = None
+        self.prefetch_scheduler: RenderScheduler = RenderScheduler("prefetch_worker")
+
+    def submit(self, decode_spec: DecodeSpec) -> bool:
+        if self.decode_cache is None or not decode_spec.img_file_path:
+            return False
+        self.prefetch_scheduler.submit(self._prefetch, decode_spec)
+        return True
+
+    def cancel(self) -> bool:
+        self.prefetch_scheduler.cancel()
+        return True
+
+    def get_memory_sizes(self) -> dict:
+        heat_image: Optional[HeatImage] = self.heat_image
+        return heat_image.get_memory_sizes() if heat_image is not None else {}
+
+    def _get_heat_image(self, decode_spec: DecodeSpec) -> HeatImage:
+        # prefetch image is reopened only when file changes
+        if self.heat_image is not None and self.heat_image.file_source is not None \
+                and self.heat_image.file_source.file_identity != get_file_identity(decode_spec.img_file_path):
+            self.heat_image.image_close()
+            self.heat_image = None
+        if self.heat_image is None:
+            self.heat_image = HeatImage(decode_spec, self.decode_cache, self.stage_caches, self.unswizzler)
+        return self.heat_image
+
+    def _prefetch(self, generation: int, decode_spec: DecodeSpec) -> None:
+        for prefetch_number, prefetch_spec in enumerate(get_prefetch_specs(decode_spec)[:MAX_PREFETCH_JOBS]):
+            if not self.prefetch_scheduler.is_job_current(generation):
+                logger.info(f"[PREFETCH] Job #{generation} cancelled")
+                return
+            if get_decoded_size_estimate(prefetch_spec) > MAX_PREFETCH_IMAGE_SIZE:
+                continue
+            if self.memory_budget is not None \
+                    and not self.memory_budget.ensure_available(get_decode_memory_estimate(prefetch_spec), is_release_allowed=False):
+                logger.info(f"[PREFETCH] Job #{generation}: not enough free memory budget, prefetch stopped")
+                return
+
+            heat_image: HeatImage = self._get_heat_image(prefetch_spec)
+            heat_image.decode_spec = prefetch_spec
+            heat_image.image_reload()  # result goes to decode cache
+            trace_render_job("prefetch", heat_image.render_timings, prefetch_spec)
+            heat_image.pixel_stream.clear()  # prefetched pages are not continued, so stream is not kept
+            logger.info(f"[PREFETCH] Job #{generation}: prefetched image {prefetch_number + 1}, pixel_format={prefetch_spec.pixel_format},"
+                        f" start_offset={prefetch_spec.img_start_offset}")
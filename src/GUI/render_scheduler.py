@@ -0,0 +1,82 @@
+"""
+Copyright © 2026  Bartłomiej Duda
+License: GPL-3.0 License
+"""
+
+import threading
+from typing import Callable, Optional
+
+from reversebox.common.logger import get_logger
+
+logger = get_logger(__name__)
+
+# fmt: off
+
+
+class RenderScheduler:
+    """
+    Runs render jobs (read -> decode -> postprocess) on a single background worker.
+    Every job gets a generation number and only the newest one matters:
+    pending jobs are dropped when a new job is submitted and running jobs
+    can check is_job_current() to stop early and skip their result.
+    Dropped jobs can have a drop function (e.g. closing resources passed to the job),
+    it's run by the worker before the next job, so it never runs alongside a job.
+    """
+
+    def __init__(self, worker_name: str = "render_worker"):
+        self.current_generation: int = 0
+        self._pending_job: Optional[tuple] = None
+        self._drop_functions: list = []
+        self._condition = threading.Condition()
+        self._worker = threading.Thread(target=self._worker_loop, name=worker_name, daemon=True)
+        self._worker.start()
+
+    def submit(self, job_function: Callable, *job_args, drop_function: Optional[Callable] = None) -> int:
+        with self._condition:
+            self.current_generation += 1
+            if self._pending_job is not None:
+                logger.info(f"[RENDER] Job #{self._pending_job[0]} superseded before start, dropping it")
+                self._drop_pending_job()
+            self._pending_job = (self.current_generation, job_function, job_args, drop_function)
+            self._condition.notify()
+            return self.current_generation
+
+    def cancel(self) -> int:
+        # pending job is dropped and running job is no longer current
+        with self._condition:
+            self.current_generation += 1
+            self._drop_pending_job()
+            self._condition.notify()
+            return self.current_generation
+
+    def _drop_pending_job(self) -> None:
+        if self._pending_job is not None and self._pending_job[3] is not None:
+            self._drop_functions.append(self._pending_job[3])
+        self._pending_job = None
+
+    def _run_drop_functions(self, drop_functions: list) -> None:
+        for drop_function in drop_functions:
+            try:
+                drop_function()
+            except Exception as error:
+                logger.error(f"[RENDER] Drop function of dropped job failed! Error: {error}")
+
+    def is_job_current(self, generation: int) -> bool:
+        return generation == self.current_generation
+
+    def _worker_loop(self) -> None:
+        while True:
+            with self._condition:
+                while self._pending_job is None and not self._drop_functions:
+                    self._condition.wait()
+                drop_functions, self._drop_functions = self._drop_functions, []
+                pending_job, self._pending_job = self._pending_job, None
+
+            self._run_drop_functions(drop_functions)
+            if pending_job is None:
+                continue
+            generation, job_function, job_args, _ = pending_job
+            try:
+                job_function(generation, *job_args)
+            except Exception as error:
+                logger.error(f"[RENDER] Job #{generation} failed! Error: {error}")
@@ -0,0 +1,237 @@
+"""
+Copyright © 2026  Bartłomiej Duda
+License: GPL-3.0 License
+"""
+
+import time
+import tkinter as tk
+from typing import Optional
+
+from PIL import Image, ImageTk
+from reversebox.common.logger import get_logger
+
+from src.GUI.preview_compositor import composite_on_background
+from src.Image.heattiming import (
+    STAGE_CANVAS,
+    STAGE_COMPOSITE,
+    STAGE_PHOTO_IMAGE,
+    STAGE_RESIZE,
+    RenderTimings,
+    get_image_data_length,
+)
+
+logger = get_logger(__name__)
+
+# fmt: off
+
+TILE_SIZE: int = 512
+MAX_SPARE_TILES: int = 64
+PPM_HEADER_FORMAT: str = "P6 {} {} 255\n"
+
+
+class TiledCanvas:
+    """
+    Draws preview image on tk.Canvas as fixed-size tiles.
+    Only tiles that intersect the visible part of the canvas are converted to PhotoImage,
+    tiles that go out of view are evicted, so the cost depends on viewport size, not on (zoomed) image size.
+    Canvas items and PhotoImages are kept between frames and updated in place.
+    """
+
+    def __init__(self, canvas: tk.Canvas, h_scroll: tk.Scrollbar, v_scroll: tk.Scrollbar, tile_size: int = TILE_SIZE):
+        self.canvas: tk.Canvas = canvas
+        self.h_scroll: tk.Scrollbar = h_scroll
+        self.v_scroll: tk.Scrollbar = v_scroll
+        self.tile_size: int = tile_size
+        self.source_image: Optional[Image.Image] = None
+        self.display_scale: float = 1
+        self.resampling_type: Image.Resampling = Image.Resampling.NEAREST
+        self.background_color: str = ""
+        self.tiles: dict[tuple[int, int], tuple] = {}  # (column, row): (canvas item, PhotoImage)
+        self.spare_tiles: list = []  # hidden tiles, ready to be reused
+        self.is_pil_blit_available: bool = True
+        self.render_timings: Optional[RenderTimings] = None  # set only while drawing a new frame
+        self._update_job: Optional[str] = None
+
+        # every view change (scrolling, resizing) goes through scroll commands
+        self.canvas.configure(xscrollcommand=self._on_xscroll, yscrollcommand=self._on_yscroll)
+        self.canvas.bind("<Configure>", lambda event: self.schedule_update(), add="+")
+
+    def _on_xscroll(self, first: str, last: str) -> None:
+        self.h_scroll.set(first, last)
+        self.schedule_update()
+
+    def _on_yscroll(self, first: str, last: str) -> None:
+        self.v_scroll.set(first, last)
+        self.schedule_update()
+
+    def clear(self) -> bool:
+        self.canvas.delete("all")
+        self.tiles.clear()
+        self.spare_tiles.clear()
+        self.source_image = None
+        self.display_scale = 1
+        return True
+
+    def release_spare_tiles(self) -> bool:
+        # spare tiles are created again when needed
+        for canvas_item, _ in self.spare_tiles:
+            self.canvas.delete(canvas_item)
+        self.spare_tiles.clear()
+        return True
+
+    def set_image(self, pil_img: Image.Image, background_color: str, display_scale: float = 1,
+                  resampling_type: Image.Resampling = Image.Resampling.NEAREST, render_timings: Optional[RenderTimings] = None) -> bool:
+        # transparent pixels are blended with background_color (solid color or checkerboard) for every tile
+        # display_scale > 1 means upscale with resampling_type, done only for visible tiles
+        # tiles drawn later while scrolling are not part of the render job, so they are not timed
+        if not self.tiles and not self.spare_tiles:
+            self.canvas.delete("all")  # e.g. error preview
+        previous_tiles: dict = self.tiles
+        self.tiles = {}
+        self.source_image = pil_img
+        self.display_scale = display_scale
+        self.resampling_type = resampling_type
+        self.background_color = background_color
+        image_width, image_height = self.get_image_size()
+        self.render_timings = render_timings
+        try:
+            start_time = time.perf_counter()
+            self.canvas.configure(scrollregion=(0, 0, image_width, image_height))
+            self._add_stage(STAGE_CANVAS, start_time, 0, 0)
+            self.update_visible_tiles(previous_tiles)
+        finally:
+            self.render_timings = None
+        return True
+
+    def _add_stage(self, stage_name: str, start_time: float, input_size: int, output_size: int) -> None:
+        if self.render_timings is not None:
+            self.render_timings.add_stage(stage_name, start_time, input_size, output_size)
+
+    def schedule_update(self) -> None:
+        # many scroll events can come in one go, tiles are updated once when GUI is idle
+        if self._update_job is None and self.source_image is not None:
+            self._update_job = self.canvas.after_idle(self._run_scheduled_update)
+
+    def _run_scheduled_update(self) -> None:
+        self._update_job = None
+        self.update_visible_tiles()
+
+    def get_memory_size(self) -> int:
+        # upper bound (edge tiles are smaller), Tk keeps 4 bytes per pixel of PhotoImage
+        return (len(self.tiles) + len(self.spare_tiles)) * self.tile_size * self.tile_size * 4
+
+    def get_image_size(self) -> tuple:
+        # size of the image on canvas (after upscale)
+        return int(self.source_image.width * self.display_scale), int(self.source_image.height * self.display_scale)
+
+    def _get_visible_tiles(self) -> set:
+        image_width, image_height = self.get_image_size()
+        view_left: int = int(self.canvas.canvasx(0))
+        view_top: int = int(self.canvas.canvasy(0))
+        view_right: int = view_left + max(self.canvas.winfo_width(), 1)
+        view_bottom: int = view_top + max(self.canvas.winfo_height(), 1)
+
+        # one extra tile around the viewport, so short scrolls don't show empty space
+        first_column: int = max(view_left // self.tile_size - 1, 0)
+        first_row: int = max(view_top // self.tile_size - 1, 0)
+        last_column: int = min(view_right // self.tile_size + 1, (image_width - 1) // self.tile_size)
+        last_row: int = min(view_bottom // self.tile_size + 1, (image_height - 1) // self.tile_size)
+        return {(column, row) for column in range(first_column, last_column + 1) for row in range(first_row, last_row + 1)}
+
+    def _blit(self, photo_image: Optional[object], rgb_image: Image.Image) -> object:
+        # PIL's C blit straight into Tk photo memory is the cheapest path,
+        # Tk's own PPM reader is used when PIL's Tk hook is not available
+        if self.is_pil_blit_available:
+            try:
+                if photo_image is None:
+                    photo_image = ImageTk.PhotoImage("RGB", rgb_image.size)
+                photo_image.paste(rgb_image)
+                return photo_image
+            except (tk.TclError, ImportError) as error:
+                logger.warning(f"PIL blit is not available, using PPM data transfer! Error: {error}")
+                self.is_pil_blit_available = False
+                photo_image = None
+
+        ppm_data: bytes = PPM_HEADER_FORMAT.format(rgb_image.width, rgb_image.height).encode("ascii") + rgb_image.tobytes()
+        if photo_image is None:
+            photo_image = tk.PhotoImage(master=self.canvas, width=rgb_image.width, height=rgb_image.height)
+        photo_image.configure(data=ppm_data, format="ppm")
+        return photo_image
+
+    def _release_tile(self, tile: tuple) -> None:
+        canvas_item, _ = tile
+        if len(self.spare_tiles) < MAX_SPARE_TILES:
+            self.canvas.itemconfigure(canvas_item, state="hidden")
+            self.spare_tiles.append(tile)
+        else:
+            self.canvas.delete(canvas_item)
+
+    def _take_spare_tile(self, tile_size: tuple) -> Optional[tuple]:
+        for spare_number, (_, photo_image) in enumerate(self.spare_tiles):
+            if (photo_image.width(), photo_image.height()) == tile_size:
+                return self.spare_tiles.pop(spare_number)
+        return None
+
+    def _draw_tile(self, column: int, row: int, tile: Optional[tuple] = None) -> tuple:
+        image_width, image_height = self.get_image_size()
+        left: int = column * self.tile_size
+        top: int = row * self.tile_size
+        right: int = min(left + self.tile_size, image_width)
+        bottom: int = min(top + self.tile_size, image_height)
+
+        if self.display_scale == 1:
+            tile_image = self.source_image.crop((left, top, right, bottom))
+        else:
+            # only the tile region is resampled, filters still read source pixels around it, so tiles have no seams
+            start_time = time.perf_counter()
+            source_box: tuple = (left / self.display_scale, top / self.display_scale, right / self.display_scale, bottom / self.display_scale)
+            tile_image = self.source_image.resize((right - left, bottom - top), self.resampling_type, box=source_box)
+            input_size: int = int((source_box[2] - source_box[0]) * (source_box[3] - source_box[1])) * len(tile_image.getbands())
+            self._add_stage(STAGE_RESIZE, start_time, input_size, get_image_data_length(tile_image))
+
+        tile_size: tuple = (right - left, bottom - top)
+        if tile is not None and (tile[1].width(), tile[1].height()) != tile_size:
+            self._release_tile(tile)
+            tile = None
+        if tile is None:
+            tile = self._take_spare_tile(tile_size)
+
+        # PhotoImage must be referenced to prevent garbage collection
+        canvas_item, photo_image = tile if tile is not None else (None, None)
+        start_time = time.perf_counter()
+        rgb_image: Image.Image = composite_on_background(tile_image, self.background_color, left, top)
+        self._add_stage(STAGE_COMPOSITE, start_time, get_image_data_length(tile_image), get_image_data_length(rgb_image))
+
+        start_time = time.perf_counter()
+        photo_image = self._blit(photo_image, rgb_image)
+        self._add_stage(STAGE_PHOTO_IMAGE, start_time, get_image_data_length(rgb_image), get_image_data_length(rgb_image))
+
+        start_time = time.perf_counter()
+        if canvas_item is None:
+            canvas_item = self.canvas.create_image(left, top, anchor="nw", image=photo_image)
+        else:
+            self.canvas.coords(canvas_item, left, top)
+            self.canvas.itemconfigure(canvas_item, image=photo_image, state="normal")
+        self._add_stage(STAGE_CANVAS, start_time, 0, 0)
+        return canvas_item, photo_image
+
+    def update_visible_tiles(self, previous_tiles: Optional[dict] = None) -> bool:
+        # previous_tiles are tiles of the previous frame, the ones at the same position are updated in place
+        if self.source_image is None:
+            return False
+
+        visible_tiles: set = self._get_visible_tiles()
+        for tile_position in [tile_position for tile_position in self.tiles if tile_position not in visible_tiles]:
+            self._release_tile(self.tiles.pop(tile_position))
+
+        reused_tiles: dict = {}
+        for tile_position, tile in (previous_tiles or {}).items():
+            if tile_position in visible_tiles:
+                reused_tiles[tile_position] = tile
+            else:
+                self._release_tile(tile)
+
+        for tile_position in visible_tiles:
+            if tile_position not in self.tiles:
+                self.tiles[tile_position] = self._draw_tile(*tile_position, reused_tiles.get(tile_position))
+        return True
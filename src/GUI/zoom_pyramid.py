@@ -0,0 +1,80 @@
+"""
+Copyright © 2026  Bartłomiej Duda
+License: GPL-3.0 License
+"""
+
+from typing import Any, Optional
+
+from PIL import Image
+from PIL.Image import Resampling
+from reversebox.common.logger import get_logger
+
+from src.Image.constants import SUPPORTED_ZOOM_TYPES
+from src.Image.heatcache import HeatCache
+
+logger = get_logger(__name__)
+
+# fmt: off
+
+MAX_ZOOM_PYRAMID_SIZE: int = 512 * 1024 * 1024
+ZOOM_REDUCING_GAP: float = 2.0
+
+
+def is_viewport_zoom(zoom_value: float) -> bool:
+    # every upscale is done by TiledCanvas, only for visible tiles (full upscaled image can take GBs)
+    return zoom_value > 1.0
+
+
+class ZoomPyramid:
+    """
+    Zoomed versions of one decoded image, built lazily and cached per (zoom value, resampling type).
+    Downscales are made from the nearest cached bigger level (integer reduce() when possible),
+    so zooming through all supported zoom values never repeats the same work.
+    """
+
+    def __init__(self, base_image: Image.Image, source_data: Any):
+        self.base_image: Image.Image = base_image
+        self.source_data: Any = source_data  # decoded data that pyramid was built from
+        self.levels: HeatCache = HeatCache("zoom_pyramid", MAX_ZOOM_PYRAMID_SIZE)
+
+    def is_built_for(self, source_data: Any, img_width: int, img_height: int) -> bool:
+        return self.source_data is source_data and self.base_image.size == (img_width, img_height)
+
+    def get_memory_size(self) -> int:
+        # base image shares decoded data, only zoom levels take extra memory
+        return self.levels.get_size_bytes()
+
+    def is_own_image(self, pil_img: Image.Image) -> bool:
+        return pil_img is self.base_image or any(level is pil_img for level in self.levels.values())
+
+    def _get_nearest_bigger_level(self, zoom_value: float, resampling_type: Resampling) -> Image.Image:
+        bigger_zoom_values: list = sorted(zoom_type.zoom_value for zoom_type in SUPPORTED_ZOOM_TYPES if zoom_value < zoom_type.zoom_value < 1.0)
+        for bigger_zoom_value in bigger_zoom_values:
+            level: Optional[Image.Image] = self.levels.get((bigger_zoom_value, resampling_type))
+            if level is not None:
+                return level
+        return self.base_image
+
+    def get_level(self, zoom_value: float, resampling_type: Resampling) -> Image.Image:
+        if zoom_value == 1.0:
+            return self.base_image
+
+        level_key: tuple = (zoom_value, resampling_type)
+        level: Optional[Image.Image] = self.levels.get(level_key)
+        if level is not None:
+            return level
+
+        target_size: tuple = (int(zoom_value * self.base_image.width), int(zoom_value * self.base_image.height))
+        if zoom_value < 1.0:
+            source_image: Image.Image = self._get_nearest_bigger_level(zoom_value, resampling_type)
+            reduce_factor: int = source_image.width // max(target_size[0], 1)
+            if resampling_type == Resampling.BOX and reduce_factor > 1 \
+                    and source_image.size == (target_size[0] * reduce_factor, target_size[1] * reduce_factor):
+                level = source_image.reduce(reduce_factor)
+            else:
+                level = source_image.resize(target_size, resampling_type, reducing_gap=ZOOM_REDUCING_GAP)
+        else:
+            level = self.base_image.resize(target_size, resampling_type)
+
+        self.levels.put(level_key, level, size_bytes=level.width * level.height * len(level.getbands()))
+        return level
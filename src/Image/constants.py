@@ -312,6 +312,12 @@ DEFAULT_ZOOM_RESAMPLING_NAME: str = ZOOM_RESAMPLING_TYPES_NAMES[0]
 DEFAULT_ROTATE_NAME: str = ROTATE_TYPES_NAMES[0]
 
 
+DEFAULT_DECODE_CACHE_SIZE_MB: int = 512
+DEFAULT_STAGE_CACHE_SIZE_MB: int = 128
+DEFAULT_UNSWIZZLE_MAP_CACHE_SIZE_MB: int = 256
+DEFAULT_MEMORY_BUDGET_MB: int = 2048
+
+
 class ConfigKeys(str, Enum):
     SAVE_AS_DIRECTORY_PATH = "save_as_directory_path"
     SAVE_RAW_DATA_DIRECTORY_PATH = "save_raw_data_directory_path"
@@ -319,6 +325,11 @@ class ConfigKeys(str, Enum):
     OPEN_PALETTE_DIRECTORY_PATH = "open_palette_directory_path"
     CURRENT_PROGRAM_LANGUAGE = "current_program_language"
     CURRENT_CANVAS_COLOR = "current_canvas_color"
+    DECODE_CACHE_SIZE_MB = "decode_cache_size_mb"
+    STAGE_CACHE_SIZE_MB = "stage_cache_size_mb"
+    UNSWIZZLE_MAP_CACHE_SIZE_MB = "unswizzle_map_cache_size_mb"
+    PERFORMANCE_HUD_FLAG = "performance_hud_flag"
+    MEMORY_BUDGET_MB = "memory_budget_mb"
 
 
 class TranslationKeys(str, Enum):
@@ -418,11 +429,14 @@ class TranslationKeys(str, Enum):
     TRANSLATION_TEXT_POPUPS_EMPTY_IMAGE_DATA = "TRANSLATION_TEXT_POPUPS_EMPTY_IMAGE_DATA"
     TRANSLATION_TEXT_POPUPS_FILE_SAVED_SUCCESSFULLY = "TRANSLATION_TEXT_POPUPS_FILE_SAVED_SUCCESSFULLY"
     TRANSLATION_TEXT_POPUPS_RAW_DATA_SAVED_SUCCESSFULLY = "TRANSLATION_TEXT_POPUPS_RAW_DATA_SAVED_SUCCESSFULLY"
+    TRANSLATION_TEXT_POPUPS_MEMORY_BUDGET_EXCEEDED = "TRANSLATION_TEXT_POPUPS_MEMORY_BUDGET_EXCEEDED"
     TRANSLATION_TEXT_OPTIONSMENU_BACKGROUND_COLOR = "TRANSLATION_TEXT_OPTIONSMENU_BACKGROUND_COLOR"
     TRANSLATION_TEXT_OPTIONSMENU_BACKGROUND_GRAY = "TRANSLATION_TEXT_OPTIONSMENU_BACKGROUND_GRAY"
     TRANSLATION_TEXT_OPTIONSMENU_BACKGROUND_BLACK = "TRANSLATION_TEXT_OPTIONSMENU_BACKGROUND_BLACK"
     TRANSLATION_TEXT_OPTIONSMENU_BACKGROUND_WHITE = "TRANSLATION_TEXT_OPTIONSMENU_BACKGROUND_WHITE"
     TRANSLATION_TEXT_OPTIONSMENU_BACKGROUND_CHECKERBOARD = "TRANSLATION_TEXT_OPTIONSMENU_BACKGROUND_CHECKERBOARD"
+    TRANSLATION_TEXT_OPTIONSMENU_PERFORMANCE_HUD = "TRANSLATION_TEXT_OPTIONSMENU_PERFORMANCE_HUD"
+    TRANSLATION_TEXT_OPTIONSMENU_PROFILE_NEXT_RELOAD = "TRANSLATION_TEXT_OPTIONSMENU_PROFILE_NEXT_RELOAD"
 
 
 @dataclass
@@ -539,6 +553,9 @@ TRANSLATION_MEMORY: List[TranslationEntry] = [
     TranslationEntry(
         id=TranslationKeys.TRANSLATION_TEXT_POPUPS_RAW_DATA_SAVED_SUCCESSFULLY, default="Raw data saved successfully!"
     ),
+    TranslationEntry(
+        id=TranslationKeys.TRANSLATION_TEXT_POPUPS_MEMORY_BUDGET_EXCEEDED, default="Image is too big for the memory budget!"
+    ),
     TranslationEntry(id=TranslationKeys.TRANSLATION_TEXT_OPTIONSMENU_BACKGROUND_COLOR, default="Canvas Color"),
     TranslationEntry(id=TranslationKeys.TRANSLATION_TEXT_OPTIONSMENU_BACKGROUND_GRAY, default="Gray (Default)"),
     TranslationEntry(id=TranslationKeys.TRANSLATION_TEXT_OPTIONSMENU_BACKGROUND_BLACK, default="Black"),
@@ -546,4 +563,6 @@ TRANSLATION_MEMORY: List[TranslationEntry] = [
     TranslationEntry(
         id=TranslationKeys.TRANSLATION_TEXT_OPTIONSMENU_BACKGROUND_CHECKERBOARD, default="Checkerboard (Alpha)"
     ),
+    TranslationEntry(id=TranslationKeys.TRANSLATION_TEXT_OPTIONSMENU_PERFORMANCE_HUD, default="Performance HUD"),
+    TranslationEntry(id=TranslationKeys.TRANSLATION_TEXT_OPTIONSMENU_PROFILE_NEXT_RELOAD, default="Profile next reload"),
 ]
@@ -0,0 +1,149 @@
+"""
+Copyright © 2026  Bartłomiej Duda
+License: GPL-3.0 License
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from reversebox.common.logger import get_logger
+
+logger = get_logger(__name__)
+
+# fmt: off
+
+STAGE_SWAP: str = "swap"
+STAGE_DECOMPRESS: str = "decompress"
+STAGE_UNSWIZZLE: str = "unswizzle"
+
+
+def get_data_size(data: Any) -> int:
+    # memoryviews point into memory-mapped file, so they don't cost any RAM
+    if data is None or isinstance(data, memoryview):
+        return 0
+    if isinstance(data, (bytes, bytearray)):
+        return len(data)
+    if isinstance(data, (tuple, list)):
+        return sum(get_data_size(entry) for entry in data)
+    return getattr(data, "nbytes", 0)
+
+
+class HeatCache:
+    """
+    LRU cache with a memory budget (in bytes).
+    Least recently used entries are evicted when budget is exceeded.
+    """
+
+    def __init__(self, cache_name: str, max_size_bytes: int):
+        self.cache_name: str = cache_name
+        self.max_size_bytes: int = max_size_bytes
+        self.current_size_bytes: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, size_bytes: Optional[int] = None) -> bool:
+        if size_bytes is None:
+            size_bytes = get_data_size(value)
+        if size_bytes > self.max_size_bytes:
+            logger.info(f"[{self.cache_name}] Entry too big for cache ({size_bytes} bytes), skipping")
+            return False
+
+        with self._lock:
+            old_entry = self._entries.pop(key, None)
+            if old_entry is not None:
+                self.current_size_bytes -= old_entry[1]
+            self._entries[key] = (value, size_bytes)
+            self.current_size_bytes += size_bytes
+
+            while self.current_size_bytes > self.max_size_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_size_bytes -= evicted_size
+
+        return True
+
+    def set_max_size(self, max_size_bytes: int) -> bool:
+        with self._lock:
+            self.max_size_bytes = max_size_bytes
+            while self.current_size_bytes > self.max_size_bytes and self._entries:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_size_bytes -= evicted_size
+        return True
+
+    def clear(self) -> bool:
+        with self._lock:
+            self._entries.clear()
+            self.current_size_bytes = 0
+        return True
+
+    def remove_if(self, key_function: Callable[[Hashable], bool]) -> int:
+        # returns number of removed entries
+        with self._lock:
+            removed_keys: list = [key for key in self._entries if key_function(key)]
+            for key in removed_keys:
+                _, removed_size = self._entries.pop(key)
+                self.current_size_bytes -= removed_size
+        return len(removed_keys)
+
+    def get_size_bytes(self) -> int:
+        # read under lock, size is changed by render and prefetch workers
+        with self._lock:
+            return self.current_size_bytes
+
+    def values(self) -> list:
+        with self._lock:
+            return [entry[0] for entry in self._entries.values()]
+
+    def __contains__(self, key: Hashable) -> bool:
+        # doesn't count as hit or miss
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats_str(self) -> str:
+        return (f"[{self.cache_name}] hits={self.hits}, misses={self.misses}, entries={len(self._entries)}, "
+                f"size={self.current_size_bytes}/{self.max_size_bytes} bytes")
+
+
+class HeatStageCaches:
+    """
+    Separate cache for each stage of the decode pipeline
+    (byte swap -> decompression -> unswizzling).
+    """
+
+    def __init__(self, max_size_bytes_per_stage: int):
+        self.caches: dict[str, HeatCache] = {
+            stage_name: HeatCache(f"{stage_name}_cache", max_size_bytes_per_stage)
+            for stage_name in (STAGE_SWAP, STAGE_DECOMPRESS, STAGE_UNSWIZZLE)
+        }
+
+    def get_cache(self, stage_name: str) -> Optional[HeatCache]:
+        return self.caches.get(stage_name)
+
+    def clear(self) -> bool:
+        for stage_cache in self.caches.values():
+            stage_cache.clear()
+        return True
+
+    def remove_if(self, key_function: Callable[[Hashable], bool]) -> int:
+        return sum(stage_cache.remove_if(key_function) for stage_cache in self.caches.values())
+
+    def get_size_bytes(self) -> int:
+        return sum(stage_cache.get_size_bytes() for stage_cache in self.caches.values())
+
+    def get_stats_str(self) -> str:
+        return ", ".join(stage_cache.get_stats_str() for stage_cache in self.caches.values())
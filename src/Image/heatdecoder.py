@@ -0,0 +1,299 @@
+"""
+Copyright © 2026  Bartłomiej Duda
+License: GPL-3.0 License
+"""
+
+from typing import Callable, Optional
+
+import numpy as np
+from reversebox.common.logger import get_logger
+from reversebox.image.image_decoder import ImageDecoder
+from reversebox.image.image_formats import ImageFormats
+
+from src.Image.heatcache import HeatCache
+
+logger = get_logger(__name__)
+
+# fmt: off
+
+# Vectorized decoding of uncompressed pixel formats
+# Formats up to 16 bpp are decoded with a lookup table (one RGBA entry for every possible pixel value)
+# generated from ReverseBox decode functions, so results are always the same.
+# Wider formats (24/32/48 bpp) are decoded with bit-field extraction on whole arrays.
+# Output size is the same as in ImageDecoder._decode_generic.
+
+
+def _get_channel(pixels: np.ndarray, shift: int, mask: int = 0xFF) -> np.ndarray:
+    return (pixels >> shift) & mask
+
+
+def _get_translucent_alpha(pixels: np.ndarray) -> np.ndarray:
+    return np.where(pixels & 0x8000, 0x80, np.where(pixels == 0, 0x00, 0xFF))
+
+
+def _lookup_rgba(lut: np.ndarray, values: np.ndarray) -> np.ndarray:
+    # RGBA entries are gathered as single uint32 values, which is a lot faster than gathering rows
+    return lut.view(np.uint32).ravel()[values].view(np.uint8).reshape(-1, 4)
+
+
+EXPAND_6_BIT_LUT: np.ndarray = np.array([(value * 255 + 32) // 63 for value in range(64)], dtype=np.uint8)
+
+# image_format: function returning (R, G, B, A) arrays (or constant values) from pixel values
+WIDE_DATA_FORMATS: dict[ImageFormats, Callable[[np.ndarray], tuple]] = {
+    ImageFormats.RGBX6666: lambda p: (EXPAND_6_BIT_LUT[_get_channel(p, 0, 63)], EXPAND_6_BIT_LUT[_get_channel(p, 8, 63)],
+                                      EXPAND_6_BIT_LUT[_get_channel(p, 16, 63)], 0xFF),
+    ImageFormats.RGBA6666: lambda p: (EXPAND_6_BIT_LUT[_get_channel(p, 0, 63)], EXPAND_6_BIT_LUT[_get_channel(p, 8, 63)],
+                                      EXPAND_6_BIT_LUT[_get_channel(p, 16, 63)], np.where(_get_channel(p, 24, 63), 0xFF, 0x00)),
+    ImageFormats.RGB888: lambda p: (_get_channel(p, 0), _get_channel(p, 8), _get_channel(p, 16), 0xFF),
+    ImageFormats.BGR888: lambda p: (_get_channel(p, 16), _get_channel(p, 8), _get_channel(p, 0), 0xFF),
+
+    ImageFormats.ARGB8888: lambda p: (_get_channel(p, 8), _get_channel(p, 16), _get_channel(p, 24), _get_channel(p, 0)),
+    ImageFormats.ABGR8888: lambda p: (_get_channel(p, 24), _get_channel(p, 16), _get_channel(p, 8), _get_channel(p, 0)),
+    ImageFormats.RGBA8888: lambda p: (_get_channel(p, 0), _get_channel(p, 8), _get_channel(p, 16), _get_channel(p, 24)),
+    ImageFormats.BGRA8888: lambda p: (_get_channel(p, 16), _get_channel(p, 8), _get_channel(p, 0), _get_channel(p, 24)),
+    ImageFormats.BGRA8888_TZAR: lambda p: (_get_channel(p, 16), _get_channel(p, 8), _get_channel(p, 0), np.where(p == 0x6F, 0x00, 0xFF)),
+    ImageFormats.XRGB8888: lambda p: (_get_channel(p, 8), _get_channel(p, 16), _get_channel(p, 24), 0xFF),
+    ImageFormats.RGBX8888: lambda p: (_get_channel(p, 0), _get_channel(p, 8), _get_channel(p, 16), 0xFF),
+    ImageFormats.BGRX8888: lambda p: (_get_channel(p, 16), _get_channel(p, 8), _get_channel(p, 0), 0xFF),
+    ImageFormats.BGRT8888: lambda p: (_get_channel(p, 16), _get_channel(p, 8), _get_channel(p, 0), _get_translucent_alpha(p)),
+    ImageFormats.R32: lambda p: (_get_channel(p, 0), 0x00, 0x00, 0xFF),
+    ImageFormats.G32: lambda p: (0x00, _get_channel(p, 0), 0x00, 0xFF),
+    ImageFormats.B32: lambda p: (0x00, 0x00, _get_channel(p, 0), 0xFF),
+
+    ImageFormats.RGB48: lambda p: (_get_channel(p, 8), _get_channel(p, 24), _get_channel(p, 40), 0xFF),
+    ImageFormats.BGR48: lambda p: (_get_channel(p, 40), _get_channel(p, 24), _get_channel(p, 8), 0xFF),
+}
+
+# Indexed formats are decoded with a palette lookup table (palette entries decoded once, with scale value applied).
+# image_format: (bytes per pixel, palette index byte for little/big endian, alpha byte for little/big endian)
+INDEXED_DATA_FORMATS: dict[ImageFormats, tuple] = {
+    ImageFormats.PAL8: (1, (0, 0), None),
+    ImageFormats.PAL8_TZAR: (1, (0, 0), None),
+    ImageFormats.PAL16: (2, (0, 1), None),
+    ImageFormats.PAL_I8A8: (2, (0, 1), (1, 0)),
+    ImageFormats.PAL32: (4, (0, 3), None),
+}
+
+TZAR_TRANSPARENT_INDEX: int = 0x6F
+MAX_LUT_CACHE_SIZE: int = 16 * 1024 * 1024  # 16 bpp format takes 320 KB
+MAX_PALETTE_LUT_CACHE_SIZE: int = 16 * 1024 * 1024
+
+
+class HeatDecoder:
+    """
+    Fast path for ImageDecoder.decode_image.
+    Returns None when format or data is not supported, so ReverseBox decoder can be used instead.
+    """
+
+    image_decoder = ImageDecoder()
+    # shared by render and prefetch workers (HeatCache is locked)
+    lut_cache = HeatCache("lut", MAX_LUT_CACHE_SIZE)
+    palette_lut_cache = HeatCache("palette_lut", MAX_PALETTE_LUT_CACHE_SIZE)
+
+    def _get_lut(self, image_format: ImageFormats) -> tuple:
+        # (RGBA lookup table, mask of pixel values that can be decoded)
+        lut_entry = self.lut_cache.get(image_format)
+        if lut_entry is None:
+            decode_function, bits_per_pixel, _ = ImageDecoder.generic_data_formats[image_format]
+            number_of_values: int = 1 << bits_per_pixel
+            lut = np.zeros((number_of_values, 4), dtype=np.uint8)
+            valid_values = np.ones(number_of_values, dtype=bool)
+            for pixel_value in range(number_of_values):
+                try:
+                    lut[pixel_value] = np.frombuffer(decode_function(self.image_decoder, pixel_value), dtype=np.uint8)
+                except ValueError:
+                    # ReverseBox can't decode this value (result doesn't fit in a byte)
+                    valid_values[pixel_value] = False
+            lut_entry = (lut, valid_values)
+            self.lut_cache.put(image_format, lut_entry, size_bytes=lut.nbytes + valid_values.nbytes)
+        return lut_entry
+
+    def _read_pixels(self, image_data: bytes, bits_per_pixel: int, number_of_pixels: int, image_endianess: str) -> np.ndarray:
+        endianess_format: str = "<" if image_endianess == "little" else ">"
+        if bits_per_pixel in (8, 16, 32):
+            return np.frombuffer(image_data, dtype=np.dtype(f"{endianess_format}u{bits_per_pixel // 8}"), count=number_of_pixels)
+
+        # 24 and 48 bpp values are combined from single bytes
+        bytes_per_pixel: int = bits_per_pixel // 8
+        pixel_bytes = np.frombuffer(image_data, dtype=np.uint8, count=number_of_pixels * bytes_per_pixel)
+        pixel_bytes = pixel_bytes.reshape(number_of_pixels, bytes_per_pixel).astype(np.uint64)
+        if image_endianess == "big":
+            pixel_bytes = pixel_bytes[:, ::-1]
+        pixels = np.zeros(number_of_pixels, dtype=np.uint64)
+        for byte_number in range(bytes_per_pixel):
+            pixels |= pixel_bytes[:, byte_number] << np.uint64(8 * byte_number)
+        return pixels
+
+    def decode_image(self, image_data: bytes, img_width: int, img_height: int, image_format: ImageFormats, image_endianess: str = "little") -> Optional[bytes]:
+        if image_endianess not in ("little", "big") or image_format not in ImageDecoder.generic_data_formats:
+            return None
+        _, bits_per_pixel, _ = ImageDecoder.generic_data_formats[image_format]
+        number_of_output_pixels: int = img_width * img_height
+
+        if bits_per_pixel == 4:
+            # two pixels in every byte, ReverseBox fails if there is not enough data
+            number_of_pixels: int = (number_of_output_pixels + 1) // 2
+            if len(image_data) < number_of_pixels:
+                return None
+            pixel_bytes = np.frombuffer(image_data, dtype=np.uint8, count=number_of_pixels)
+            pixels = np.empty((number_of_pixels, 2), dtype=np.uint8)
+            first_nibble, second_nibble = (pixel_bytes & 0xF, pixel_bytes >> 4) if image_endianess == "little" else (pixel_bytes >> 4, pixel_bytes & 0xF)
+            pixels[:, 0] = first_nibble
+            pixels[:, 1] = second_nibble
+            pixels = pixels.ravel()
+        elif bits_per_pixel in (8, 16, 24, 32, 48):
+            pixels = self._read_pixels(image_data, bits_per_pixel, len(image_data) // (bits_per_pixel // 8), image_endianess)
+        else:
+            return None
+
+        if bits_per_pixel <= 16:
+            lut, valid_values = self._get_lut(image_format)
+            if not valid_values.all() and not valid_values[pixels].all():
+                return None
+            decoded_pixels = _lookup_rgba(lut, pixels)
+        else:
+            channels_function = WIDE_DATA_FORMATS.get(image_format)
+            if channels_function is None:
+                return None
+            decoded_pixels = np.empty((pixels.size, 4), dtype=np.uint8)
+            for channel_number, channel_value in enumerate(channels_function(pixels)):
+                decoded_pixels[:, channel_number] = channel_value
+
+        # output has at least width*height pixels, missing pixels are zeros (same as in ReverseBox)
+        if decoded_pixels.shape[0] < number_of_output_pixels:
+            texture_data = np.zeros((number_of_output_pixels, 4), dtype=np.uint8)
+            texture_data[:decoded_pixels.shape[0]] = decoded_pixels
+            return texture_data.tobytes()
+        return decoded_pixels.tobytes()
+
+    def _build_ia_palette_lut(self, palette_data: bytes, palette_format: ImageFormats) -> Optional[np.ndarray]:
+        # two IA palettes (16 bit + 16 bit), same layout as in ImageDecoder._decode_indexed
+        number_of_colours: int = len(palette_data) // 4 if len(palette_data) <= 1024 else 256
+        aligned_offset: int = (number_of_colours * 2 + 31) & ~31
+        if aligned_offset + number_of_colours * 2 > len(palette_data):
+            return None
+        first_palette = np.frombuffer(palette_data, dtype=np.uint8, count=number_of_colours * 2).reshape(number_of_colours, 2)
+        second_palette = np.frombuffer(palette_data, dtype=np.uint8, count=number_of_colours * 2, offset=aligned_offset).reshape(number_of_colours, 2)
+        lut = np.empty((number_of_colours, 4), dtype=np.uint8)
+        if palette_format == ImageFormats.IA_X2_ARGB:
+            lut[:, 0], lut[:, 1], lut[:, 2], lut[:, 3] = first_palette[:, 1], second_palette[:, 0], second_palette[:, 1], first_palette[:, 0]
+        else:
+            lut[:, 0], lut[:, 1], lut[:, 2], lut[:, 3] = first_palette[:, 1], first_palette[:, 0], second_palette[:, 1], second_palette[:, 0]
+        return lut
+
+    def get_palette_lut(self, palette_data: bytes, palette_format: ImageFormats, palette_endianess: str = "little", scale_value: int = 1) -> Optional[tuple]:
+        # (RGBA lookup table, mask of palette entries that can be decoded)
+        palette_data = bytes(palette_data)
+        lut_key: tuple = (palette_data, palette_format, palette_endianess, scale_value)
+        lut_entry = self.palette_lut_cache.get(lut_key)
+        if lut_entry is not None:
+            return lut_entry
+
+        if palette_format in (ImageFormats.IA_X2_ARGB, ImageFormats.IA_X2_GRAB):
+            lut = self._build_ia_palette_lut(palette_data, palette_format)
+            if lut is None:
+                return None
+            valid_entries = np.ones(lut.shape[0], dtype=bool)
+        else:
+            if palette_endianess not in ("little", "big") or palette_format not in ImageDecoder.generic_data_formats:
+                return None
+            decode_function, bits_per_pixel, entry_read_function = ImageDecoder.generic_data_formats[palette_format]
+            if bits_per_pixel % 8 != 0:
+                return None
+            entry_size: int = bits_per_pixel // 8
+            endianess_format: str = "<" if palette_endianess == "little" else ">"
+            number_of_entries: int = len(palette_data) // entry_size
+            lut = np.zeros((number_of_entries, 4), dtype=np.uint8)
+            valid_entries = np.zeros(number_of_entries, dtype=bool)
+            for entry_number in range(number_of_entries):
+                entry_value: int = entry_read_function(palette_data[entry_number * entry_size: (entry_number + 1) * entry_size], endianess_format) * scale_value
+                try:
+                    lut[entry_number] = np.frombuffer(decode_function(self.image_decoder, entry_value), dtype=np.uint8)
+                    valid_entries[entry_number] = True
+                except Exception:
+                    # ReverseBox would fail only if this entry is really used by the image
+                    pass
+
+        # palette index is always a single byte, so missing entries are marked as not valid
+        if lut.shape[0] < 256:
+            lut = np.concatenate((lut, np.zeros((256 - lut.shape[0], 4), dtype=np.uint8)))
+            valid_entries = np.concatenate((valid_entries, np.zeros(256 - valid_entries.shape[0], dtype=bool)))
+
+        lut_entry = (lut, valid_entries)
+        self.palette_lut_cache.put(lut_key, lut_entry, size_bytes=lut.nbytes + valid_entries.nbytes + len(palette_data))
+        return lut_entry
+
+    def get_palette_indexes(self, image_data: bytes, img_width: int, img_height: int, image_format: ImageFormats,
+                            image_endianess: str = "little") -> Optional[tuple]:
+        # (palette indexes, alpha values or None, is data complete), one entry for every pixel
+        number_of_pixels: int = img_width * img_height
+        if image_endianess not in ("little", "big"):
+            return None
+
+        if image_format == ImageFormats.PAL4:
+            # two pixels in every byte, ReverseBox fails for odd number of pixels
+            if number_of_pixels % 2 != 0:
+                return None
+            pixel_bytes = self._read_index_bytes(image_data, number_of_pixels // 2)
+            indexes = np.empty((number_of_pixels // 2, 2), dtype=np.uint8)
+            first_nibble, second_nibble = (pixel_bytes & 0xF, pixel_bytes >> 4) if image_endianess == "little" else (pixel_bytes >> 4, pixel_bytes & 0xF)
+            indexes[:, 0] = first_nibble
+            indexes[:, 1] = second_nibble
+            return indexes.ravel(), None, len(image_data) >= number_of_pixels // 2
+
+        indexed_format = INDEXED_DATA_FORMATS.get(image_format)
+        if indexed_format is None:
+            return None
+        bytes_per_pixel, index_byte_numbers, alpha_byte_numbers = indexed_format
+        pixel_bytes = self._read_index_bytes(image_data, number_of_pixels * bytes_per_pixel).reshape(number_of_pixels, bytes_per_pixel)
+        endianess_number: int = 0 if image_endianess == "little" else 1
+        indexes = pixel_bytes[:, index_byte_numbers[endianess_number]]
+        alphas = pixel_bytes[:, alpha_byte_numbers[endianess_number]] if alpha_byte_numbers else None
+        return indexes, alphas, len(image_data) >= number_of_pixels * bytes_per_pixel
+
+    def _read_index_bytes(self, image_data: bytes, data_size: int) -> np.ndarray:
+        # missing bytes are read as zeros (same as in ReverseBox)
+        if len(image_data) >= data_size:
+            return np.frombuffer(image_data, dtype=np.uint8, count=data_size)
+        pixel_bytes = np.zeros(data_size, dtype=np.uint8)
+        pixel_bytes[:len(image_data)] = np.frombuffer(image_data, dtype=np.uint8)
+        return pixel_bytes
+
+    def apply_palette_lut(self, palette_indexes: tuple, palette_lut: tuple, image_format: ImageFormats, palette_format: ImageFormats) -> Optional[bytes]:
+        indexes, alphas, is_data_complete = palette_indexes
+        lut, valid_entries = palette_lut
+
+        if palette_format in (ImageFormats.IA_X2_ARGB, ImageFormats.IA_X2_GRAB):
+            # ReverseBox supports IA palettes only for 4/8 bpp and fails on missing image data
+            if image_format not in (ImageFormats.PAL4, ImageFormats.PAL8, ImageFormats.PAL8_TZAR) or not is_data_complete:
+                return None
+        elif image_format == ImageFormats.PAL8_TZAR:
+            # special index is decoded directly with palette format function
+            decode_function = ImageDecoder.generic_data_formats[palette_format][0]
+            lut, valid_entries = lut.copy(), valid_entries.copy()
+            try:
+                lut[TZAR_TRANSPARENT_INDEX] = np.frombuffer(decode_function(self.image_decoder, TZAR_TRANSPARENT_INDEX), dtype=np.uint8)
+                valid_entries[TZAR_TRANSPARENT_INDEX] = True
+            except Exception:
+                valid_entries[TZAR_TRANSPARENT_INDEX] = False
+
+        if not valid_entries.all() and not valid_entries[indexes].all():
+            return None
+        decoded_pixels = _lookup_rgba(lut, indexes)
+
+        if alphas is not None:
+            # alpha from image data, colours are premultiplied
+            decoded_pixels[:, :3] = (decoded_pixels[:, :3].astype(np.uint16) * alphas[:, None] // 255).astype(np.uint8)
+            decoded_pixels[:, 3] = alphas
+        return decoded_pixels.tobytes()
+
+    def decode_indexed_image(self, image_data: bytes, palette_data: bytes, img_width: int, img_height: int, image_format: ImageFormats,
+                             palette_format: ImageFormats, image_endianess: str = "little", palette_endianess: str = "little",
+                             scale_value: int = 1) -> Optional[bytes]:
+        palette_lut = self.get_palette_lut(palette_data, palette_format, palette_endianess, scale_value)
+        if palette_lut is None:
+            return None
+        palette_indexes = self.get_palette_indexes(image_data, img_width, img_height, image_format, image_endianess)
+        if palette_indexes is None:
+            return None
+        return self.apply_palette_lut(palette_indexes, palette_lut, image_format, palette_format)
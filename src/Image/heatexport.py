@@ -0,0 +1,62 @@
+"""
+Copyright © 2026  Bartłomiej Duda
+License: GPL-3.0 License
+"""
+
+import os
+from typing import Optional
+
+from PIL import Image
+from PIL.Image import Transpose
+from reversebox.common.logger import get_logger
+from reversebox.image.pillow_wrapper import PillowWrapper
+
+from src.Image.constants import get_rotate_id
+from src.Image.heatspec import ViewSpec
+
+logger = get_logger(__name__)
+
+# fmt: off
+
+
+def get_export_image(decoded_image_data: bytes, img_width: int, img_height: int, view_spec: ViewSpec) -> Image.Image:
+    # full size image (no zoom) with flip/rotate post-processing applied
+    export_pil_img = Image.frombuffer(
+        "RGBA",
+        (int(img_width), int(img_height)),
+        decoded_image_data,
+        "raw",
+        "RGBA",
+        0,
+        1,
+    )
+
+    if view_spec.vertical_flip_flag:
+        export_pil_img = export_pil_img.transpose(Transpose.FLIP_TOP_BOTTOM)
+    if view_spec.horizontal_flip_flag:
+        export_pil_img = export_pil_img.transpose(Transpose.FLIP_LEFT_RIGHT)
+
+    rotate_id = get_rotate_id(view_spec.rotate_name)
+    if rotate_id == "rotate_90_left":
+        export_pil_img = export_pil_img.transpose(Transpose.ROTATE_90)
+    elif rotate_id == "rotate_90_right":
+        export_pil_img = export_pil_img.transpose(Transpose.ROTATE_270)
+    elif rotate_id == "rotate_180":
+        export_pil_img = export_pil_img.transpose(Transpose.ROTATE_180)
+
+    return export_pil_img
+
+
+def get_export_format(out_file_path: str) -> Optional[str]:
+    # Pillow format (e.g. "JPEG" for ".jpg") for the file extension, None if Pillow can't write it
+    file_extension: str = os.path.splitext(out_file_path)[1].lower()
+    export_format: Optional[str] = Image.registered_extensions().get(file_extension)
+    return export_format if export_format in Image.SAVE else None
+
+
+def get_export_file_data(export_pil_img: Image.Image, out_file_path: str) -> bytes:
+    # output format (DDS, PNG, BMP etc.) is taken from file extension
+    export_format: Optional[str] = get_export_format(out_file_path)
+    if export_format is None:
+        raise ValueError(f"Not supported output file extension: \"{os.path.splitext(out_file_path)[1]}\"")
+    return PillowWrapper().get_pil_image_file_data_for_export2(export_pil_img, pillow_format=export_format)
@@ -4,7 +4,7 @@ License: GPL-3.0 License
 """
 
 import time
-from typing import Optional
+from typing import Callable, Optional
 
 from reversebox.common.logger import get_logger
 from reversebox.compression.compression_lz4 import LZ4Handler
@@ -44,83 +44,240 @@ from reversebox.image.swizzling.swizzle_switch import unswizzle_switch
 from reversebox.image.swizzling.swizzle_wii_u import unswizzle_wii_u
 from reversebox.image.swizzling.swizzle_x360 import unswizzle_x360
 
-from src.GUI.gui_params import GuiParams
 from src.Image.constants import (
     PIXEL_FORMATS_NAMES,
     get_compression_id,
     get_endianess_id,
     get_swizzling_id,
 )
+from src.Image.heatcache import (
+    STAGE_DECOMPRESS,
+    STAGE_SWAP,
+    STAGE_UNSWIZZLE,
+    HeatCache,
+    HeatStageCaches,
+    get_data_size,
+)
+from src.Image.heatdecoder import HeatDecoder
+from src.Image.heatmemory import (
+    MEMORY_DECODED,
+    MEMORY_ENCODED,
+    MEMORY_INDEX,
+    MEMORY_PIXEL_STREAM,
+    HeatMemoryBudget,
+    get_decode_memory_estimate,
+)
 from src.Image.heatpalette import HeatPalette
+from src.Image.heatpixelstream import HeatPixelStream
+from src.Image.heatscratch import (
+    OUT_OF_CORE_MIN_IMAGE_SIZE,
+    HeatScratchFile,
+    decode_to_scratch_file,
+    is_out_of_core_format,
+)
+from src.Image.heatsource import HeatFileSource, get_file_identity
+from src.Image.heatspec import DecodeSpec
+from src.Image.heattiming import (
+    STAGE_CACHE,
+    STAGE_DECODE,
+    STAGE_PALETTE,
+    STAGE_READ,
+    RenderTimings,
+    get_data_length,
+)
+from src.Image.heatunswizzle import HeatUnswizzler
 
 logger = get_logger(__name__)
 
 # fmt: off
 
+UNCOMPRESSED_IMAGE_FORMATS: tuple = (
+    ImageFormats.RGB121,
+    ImageFormats.ALPHA4,
+    ImageFormats.ALPHA4_17X,
+
+    ImageFormats.RGBX2222,
+    ImageFormats.RGBA2222,
+    ImageFormats.RGB121_BYTE,
+    ImageFormats.RGB332,
+    ImageFormats.BGR332,
+    ImageFormats.ALPHA8,
+    ImageFormats.ALPHA8_17X,
+    ImageFormats.LA44,
+    ImageFormats.R8,
+    ImageFormats.G8,
+    ImageFormats.B8,
+
+    ImageFormats.GRAY8A,
+    ImageFormats.GRAY16,
+    ImageFormats.RG88,
+    ImageFormats.RGB565,
+    ImageFormats.BGR565,
+    ImageFormats.RGBX5551,
+    ImageFormats.RGBA5551,
+    ImageFormats.RGBT5551,
+    ImageFormats.BGRT5551,
+    ImageFormats.BGRA5551,
+    ImageFormats.BGRA5551_TZAR,
+    ImageFormats.BGRX5551,
+    ImageFormats.RGBA4444,
+    ImageFormats.ARGB4444,
+    ImageFormats.XRGB4444,
+    ImageFormats.ABGR4444,
+    ImageFormats.XBGR4444,
+    ImageFormats.RGBX4444,
+    ImageFormats.BGRA4444,
+    ImageFormats.BGRA4444_LEAPSTER,
+    ImageFormats.BGRX4444,
+    ImageFormats.XRGB1555,
+    ImageFormats.XBGR1555,
+    ImageFormats.ARGB1555,
+    ImageFormats.ABGR1555,
+    ImageFormats.R16,
+    ImageFormats.G16,
+    ImageFormats.B16,
+
+    ImageFormats.RGB888,
+    ImageFormats.BGR888,
+    ImageFormats.RGBA6666,
+    ImageFormats.RGBX6666,
+
+    ImageFormats.RGBA8888,
+    ImageFormats.BGRA8888,
+    ImageFormats.BGRA8888_TZAR,
+    ImageFormats.ARGB8888,
+    ImageFormats.ABGR8888,
+    ImageFormats.XRGB8888,
+    ImageFormats.RGBX8888,
+    ImageFormats.BGRX8888,
+    ImageFormats.BGRT8888,
+    ImageFormats.RGBM8888,
+    ImageFormats.R32,
+    ImageFormats.G32,
+    ImageFormats.B32,
+
+    ImageFormats.RGB48,
+    ImageFormats.BGR48,
+
+    ImageFormats.N64_RGB5A3,
+    ImageFormats.N64_BGR5A3,
+    ImageFormats.GRAY4,
+    ImageFormats.GRAY8,
+    ImageFormats.N64_IA4,
+    ImageFormats.N64_IA8,
+)
+
 
 class HeatImage:
-    def __init__(self, gui_params: GuiParams):
-        self.gui_params: GuiParams = gui_params
-        self.loaded_image_data: Optional[bytes] = None
-        self.encoded_image_data: Optional[bytes] = None
-        self.decoded_image_data: Optional[bytes] = None
+    def __init__(self, decode_spec: DecodeSpec, decode_cache: Optional[HeatCache] = None, stage_caches: Optional[HeatStageCaches] = None,
+                 unswizzler: Optional[HeatUnswizzler] = None, memory_budget: Optional[HeatMemoryBudget] = None):
+        self.decode_spec: DecodeSpec = decode_spec
+        self.img_width: Optional[int] = decode_spec.img_width  # size of decoded image (can be aligned, e.g. PS4 padding)
+        self.img_height: Optional[int] = decode_spec.img_height
+        self.decode_cache: Optional[HeatCache] = decode_cache
+        self.stage_caches: Optional[HeatStageCaches] = stage_caches
+        self.unswizzler: HeatUnswizzler = unswizzler if unswizzler is not None else HeatUnswizzler()
+        self.file_source: Optional[HeatFileSource] = None
+        self.loaded_image_data: Optional[memoryview] = None
+        self.encoded_image_data: Optional[bytes | memoryview] = None
+        self.decoded_image_data: Optional[bytes | memoryview] = None
         self.is_preview_error: bool = False
         self.is_data_loaded_from_file: bool = False
         self.heat_palette: Optional[HeatPalette] = None
+        self.index_image_data: Optional[bytes | memoryview] = None
+        self.palette_indexes: Optional[tuple] = None
+        self.palette_indexes_key: Optional[tuple] = None
+        self.pixel_stream: HeatPixelStream = HeatPixelStream()
+        self.decoded_params_key: Optional[tuple] = None
+        self.render_timings: RenderTimings = RenderTimings()  # stages of the last reload
+        self.is_cache_used: bool = True  # cached results are not read during reload from scratch
+        self.memory_budget: Optional[HeatMemoryBudget] = memory_budget
+        self.memory_error_message: Optional[str] = None  # set when decode was refused by memory budget
+        self.scratch_file: Optional[HeatScratchFile] = None  # decoded data of out-of-core decode
 
     def _image_read(self) -> bool:
+        start_time = time.perf_counter()
         if not self.is_data_loaded_from_file:
-            logger.info("Reading image data from file")
-            img_file = open(self.gui_params.img_file_path, "rb")
-            self.loaded_image_data = img_file.read()
-            img_file.close()
-            self.encoded_image_data = self.loaded_image_data
+            logger.info("Mapping image data from file")
+            self.file_source = HeatFileSource(self.decode_spec.img_file_path)
+            self.loaded_image_data = self.file_source.get_view()
             self.is_data_loaded_from_file = True
-        else:
-            self.encoded_image_data = self.loaded_image_data[self.gui_params.img_start_offset: self.gui_params.img_end_offset]
 
+        # zero-copy view of the selected range
+        self.encoded_image_data = self.file_source.get_view(self.decode_spec.img_start_offset, self.decode_spec.img_end_offset)
+        self.render_timings.add_stage(STAGE_READ, start_time, get_data_length(self.encoded_image_data), get_data_length(self.encoded_image_data))
         return True
 
-    def _get_image_format_from_str(self, pixel_format: str) -> ImageFormats:
-        return ImageFormats[pixel_format]
-
-    def _image_decode(self) -> bool:
-        logger.info(f"Image decode with pixel_format={self.gui_params.pixel_format} start...")
-        if self.gui_params.pixel_format not in PIXEL_FORMATS_NAMES:
-            logger.error(f"[1] Not supported pixel format! Pixel_format={self.gui_params.pixel_format}")
-            self.is_preview_error = True
+    def _materialize_encoded_data(self) -> bool:
+        # some ReverseBox functions (and native decoders) can't work on memoryview,
+        # so selected range is copied only right before such stage
+        if isinstance(self.encoded_image_data, memoryview):
+            self.encoded_image_data = bytes(self.encoded_image_data)
+        return True
 
-        image_decoder = ImageDecoder()
-        image_format: ImageFormats = self._get_image_format_from_str(self.gui_params.pixel_format)
-        palette_format: ImageFormats = self._get_image_format_from_str(self.gui_params.palette_format)
-        palette_scale_value: int = self.gui_params.palette_scale_value
+    def _remove_file_cache_entries(self) -> bool:
+        # every cache key starts with file identity
+        if self.file_source is None:
+            return False
+        file_identity: tuple = self.file_source.file_identity
+        removed_entries_count: int = 0
+        if self.decode_cache is not None:
+            removed_entries_count += self.decode_cache.remove_if(lambda cache_key: cache_key[0] == file_identity)
+        if self.stage_caches is not None:
+            removed_entries_count += self.stage_caches.remove_if(lambda cache_key: cache_key[0] == file_identity)
+        logger.info(f"Removed {removed_entries_count} cache entries of closed file")
+        return True
 
-        # endianess logic
-        endianess_id: str = get_endianess_id(self.gui_params.endianess_type)
+    def image_close(self) -> bool:
+        self._remove_file_cache_entries()
+        self.loaded_image_data = None
+        self.encoded_image_data = None
+        if self.heat_palette:
+            self.heat_palette.palette_close()
+            self.heat_palette = None
+        self.index_image_data = None
+        self.palette_indexes = None
+        self.palette_indexes_key = None
+        self.pixel_stream.clear()
+        if self.file_source:
+            self.file_source.close()
+            self.file_source = None
+        self._close_scratch_file()
+        self.is_data_loaded_from_file = False
+        self.decoded_params_key = None
+        return True
 
-        if endianess_id == "byte_swap_x360":
-            endianess_id = "little"
-            try:
-                self.encoded_image_data = swap_byte_order_x360(self.encoded_image_data)
-            except Exception as error:
-                logger.warning(f"Byte swap function failed! Error: {error}")
+    def _get_image_format_from_str(self, pixel_format: str) -> ImageFormats:
+        return ImageFormats[pixel_format]
 
-        if endianess_id == "byte_swap_gamecube":
-            endianess_id = "little"
-            try:
-                self.encoded_image_data = swap_byte_order_gamecube(self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height)
-            except Exception as error:
-                logger.warning(f"Byte swap function failed! Error: {error}")
+    def _run_cached_stage(self, stage_name: str, stage_key: tuple, stage_function: Callable, *stage_args) -> bool:
+        start_time = time.perf_counter()
+        input_size: int = get_data_length(self.encoded_image_data)
+        stage_cache: Optional[HeatCache] = self.stage_caches.get_cache(stage_name) if self.stage_caches is not None else None
+        cached_data = stage_cache.get(stage_key) if stage_cache is not None and self.is_cache_used else None
+        if cached_data is not None:
+            self.encoded_image_data = cached_data
+        else:
+            stage_function(*stage_args)
+            if stage_cache is not None and not isinstance(self.encoded_image_data, memoryview):
+                # failed stage leaves a view of the file, caching it would keep the file mapped
+                stage_cache.put(stage_key, self.encoded_image_data)
+        self.render_timings.add_stage(stage_name, start_time, input_size, get_data_length(self.encoded_image_data))
+        return True
 
-        # image bpp logic
+    def _image_swap_byte_order(self, endianess_id: str) -> bool:
+        self._materialize_encoded_data()
         try:
-            image_bpp: int = get_bpp_for_image_format(image_format)
+            if endianess_id == "byte_swap_x360":
+                self.encoded_image_data = swap_byte_order_x360(self.encoded_image_data)
+            elif endianess_id == "byte_swap_gamecube":
+                self.encoded_image_data = swap_byte_order_gamecube(self.encoded_image_data, self.img_width, self.img_height)
         except Exception as error:
-            logger.warning(f"Couldn't get image bpp! Setting default value! Error: {error}")
-            image_bpp = 8
+            logger.warning(f"Byte swap function failed! Error: {error}")
+        return True
 
-        # decompression logic
-        compression_id = get_compression_id(self.gui_params.compression_type)
+    def _image_decompress(self, compression_id: str, image_bpp: int) -> bool:
+        self._materialize_encoded_data()
         try:
             if compression_id == "none":
                 pass
@@ -133,15 +290,15 @@ class HeatImage:
             elif compression_id == "zlib":
                 self.encoded_image_data = decompress_zlib(self.encoded_image_data)
             elif compression_id == "rle_executioners":
-                self.encoded_image_data = decompress_rle_executioners(self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height, image_bpp)
+                self.encoded_image_data = decompress_rle_executioners(self.encoded_image_data, self.img_width, self.img_height, image_bpp)
             elif compression_id == "rle_emergency":
-                self.encoded_image_data = decompress_rle_emergency(self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height, image_bpp)
+                self.encoded_image_data = decompress_rle_emergency(self.encoded_image_data, self.img_width, self.img_height, image_bpp)
             elif compression_id == "rle_neversoft":
                 self.encoded_image_data = decompress_rle_neversoft(self.encoded_image_data, image_bpp)
             elif compression_id == "rle_tzar":
-                self.encoded_image_data = decompress_rle_tzar(self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height, image_bpp)
+                self.encoded_image_data = decompress_rle_tzar(self.encoded_image_data, self.img_width, self.img_height, image_bpp)
             elif compression_id == "rle_leapster":
-                self.encoded_image_data = decompress_rle_leapster(self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height, image_bpp)
+                self.encoded_image_data = decompress_rle_leapster(self.encoded_image_data, self.img_width, self.img_height, image_bpp)
             elif compression_id == "lz4_frame":
                 self.encoded_image_data = LZ4Handler().decompress_data(self.encoded_image_data)
             elif compression_id == "lz4_block":
@@ -150,160 +307,163 @@ class HeatImage:
                 logger.error(f"Compression type not supported! Type: {compression_id}")
         except Exception as error:
             logger.error(f"Couldn't decompress data for compression_id={compression_id}. Error: {error}")
+        return True
 
-        # unswizzling logic
-        swizzling_id = get_swizzling_id(self.gui_params.swizzling_type)
-        encoded_data_size: int = len(self.encoded_image_data)
+    def _image_unswizzle(self, swizzling_id: str, image_format: ImageFormats, image_bpp: int) -> bool:
+        self._materialize_encoded_data()
+
+        # vectorized fast path, ReverseBox functions are used only when it's not possible
+        unswizzled_data: Optional[bytes] = self.unswizzler.unswizzle(
+            swizzling_id, self.encoded_image_data, self.img_width, self.img_height, image_bpp, image_format
+        )
+        if unswizzled_data is not None:
+            self.encoded_image_data = unswizzled_data
+            return True
 
-        if swizzling_id == "none":
-            pass
-        elif swizzling_id == "psp":
-            self.encoded_image_data = unswizzle_psp(self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height, image_bpp)
+        if swizzling_id == "psp":
+            self.encoded_image_data = unswizzle_psp(self.encoded_image_data, self.img_width, self.img_height, image_bpp)
         elif swizzling_id == "morton":
-            self.encoded_image_data = unswizzle_morton(self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height, image_bpp, block_width=1, block_height=1)
+            self.encoded_image_data = unswizzle_morton(self.encoded_image_data, self.img_width, self.img_height, image_bpp, block_width=1, block_height=1)
         elif swizzling_id == "morton_4x4":
-            self.encoded_image_data = unswizzle_morton(self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height, image_bpp, block_width=4, block_height=4)
+            self.encoded_image_data = unswizzle_morton(self.encoded_image_data, self.img_width, self.img_height, image_bpp, block_width=4, block_height=4)
         elif swizzling_id == "morton_8x8":
-            self.encoded_image_data = unswizzle_morton(self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height, image_bpp, block_width=8, block_height=8)
+            self.encoded_image_data = unswizzle_morton(self.encoded_image_data, self.img_width, self.img_height, image_bpp, block_width=8, block_height=8)
         elif swizzling_id == "dreamcast_psvita":
-            self.encoded_image_data = unswizzle_psvita_dreamcast(self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height, image_bpp, block_width=1, block_height=1)
+            self.encoded_image_data = unswizzle_psvita_dreamcast(self.encoded_image_data, self.img_width, self.img_height, image_bpp, block_width=1, block_height=1)
         elif swizzling_id == "dreamcast_psvita_4x4":
-            self.encoded_image_data = unswizzle_psvita_dreamcast(self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height, image_bpp, block_width=4, block_height=4)
+            self.encoded_image_data = unswizzle_psvita_dreamcast(self.encoded_image_data, self.img_width, self.img_height, image_bpp, block_width=4, block_height=4)
         elif swizzling_id == "dreamcast_psvita_8x8":
-            self.encoded_image_data = unswizzle_psvita_dreamcast(self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height, image_bpp, block_width=8, block_height=8)
+            self.encoded_image_data = unswizzle_psvita_dreamcast(self.encoded_image_data, self.img_width, self.img_height, image_bpp, block_width=8, block_height=8)
         elif swizzling_id == "ps4":
-            self.encoded_image_data = unswizzle_ps4(self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height, block_width=4, block_height=4, block_data_size=get_block_data_size(image_format))
-        elif swizzling_id == "ps4_padding":
-            self.gui_params.img_width = calculate_aligned_value(self.gui_params.img_width, 32)
-            self.gui_params.img_height = calculate_aligned_value(self.gui_params.img_height, 32)
-            self.encoded_image_data = unswizzle_ps4(self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height, block_width=4, block_height=4, block_data_size=get_block_data_size(image_format))
+            self.encoded_image_data = unswizzle_ps4(self.encoded_image_data, self.img_width, self.img_height, block_width=4, block_height=4, block_data_size=get_block_data_size(image_format))
+        elif swizzling_id == "ps4_padding":  # dimensions are already aligned to 32
+            self.encoded_image_data = unswizzle_ps4(self.encoded_image_data, self.img_width, self.img_height, block_width=4, block_height=4, block_data_size=get_block_data_size(image_format))
         elif swizzling_id == "ps5":
-            self.encoded_image_data = unswizzle_ps5(self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height, block_width=4, block_height=4, block_data_size=get_block_data_size(image_format))
+            self.encoded_image_data = unswizzle_ps5(self.encoded_image_data, self.img_width, self.img_height, block_width=4, block_height=4, block_data_size=get_block_data_size(image_format))
         elif swizzling_id == "nintendo_switch_4_4":
-            self.encoded_image_data = unswizzle_switch(self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height, bytes_per_block=4, block_height=4)
+            self.encoded_image_data = unswizzle_switch(self.encoded_image_data, self.img_width, self.img_height, bytes_per_block=4, block_height=4)
         elif swizzling_id == "nintendo_switch_4_8":
-            self.encoded_image_data = unswizzle_switch(self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height, bytes_per_block=4, block_height=8)
+            self.encoded_image_data = unswizzle_switch(self.encoded_image_data, self.img_width, self.img_height, bytes_per_block=4, block_height=8)
         elif swizzling_id == "nintendo_switch_1_16":
-            self.encoded_image_data = unswizzle_switch(self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height, bytes_per_block=1, block_height=16)
+            self.encoded_image_data = unswizzle_switch(self.encoded_image_data, self.img_width, self.img_height, bytes_per_block=1, block_height=16)
         elif swizzling_id == "nintendo_switch_2_16":
-            self.encoded_image_data = unswizzle_switch(self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height, bytes_per_block=2, block_height=16)
+            self.encoded_image_data = unswizzle_switch(self.encoded_image_data, self.img_width, self.img_height, bytes_per_block=2, block_height=16)
         elif swizzling_id == "nintendo_switch_4_16":
-            self.encoded_image_data = unswizzle_switch(self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height, bytes_per_block=4, block_height=16)
+            self.encoded_image_data = unswizzle_switch(self.encoded_image_data, self.img_width, self.img_height, bytes_per_block=4, block_height=16)
         elif swizzling_id == "gamecube_wii":
-            self.encoded_image_data = unswizzle_gamecube(self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height, image_bpp)
+            self.encoded_image_data = unswizzle_gamecube(self.encoded_image_data, self.img_width, self.img_height, image_bpp)
         elif swizzling_id == "x360_1_1":  # 8-bpp
-            self.encoded_image_data = unswizzle_x360(self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height,
+            self.encoded_image_data = unswizzle_x360(self.encoded_image_data, self.img_width, self.img_height,
                                                      block_pixel_size=1, texel_byte_pitch=1)
         elif swizzling_id == "x360_1_2":  # 16-bpp
-            self.encoded_image_data = unswizzle_x360(self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height,
+            self.encoded_image_data = unswizzle_x360(self.encoded_image_data, self.img_width, self.img_height,
                                                      block_pixel_size=1, texel_byte_pitch=2)
         elif swizzling_id == "x360_1_4":  # 32-bpp
-            self.encoded_image_data = unswizzle_x360(self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height,
+            self.encoded_image_data = unswizzle_x360(self.encoded_image_data, self.img_width, self.img_height,
                                                      block_pixel_size=1, texel_byte_pitch=4)
         elif swizzling_id == "x360_4_8":  # 64-bit 4x4 blocks
-            self.encoded_image_data = unswizzle_x360(self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height,
+            self.encoded_image_data = unswizzle_x360(self.encoded_image_data, self.img_width, self.img_height,
                                                      block_pixel_size=4, texel_byte_pitch=8)
         elif swizzling_id == "x360_4_16":  # 128-bit 4x4 blocks, used in MT Framework
-            self.encoded_image_data = unswizzle_x360(self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height,
+            self.encoded_image_data = unswizzle_x360(self.encoded_image_data, self.img_width, self.img_height,
                                                      block_pixel_size=4, texel_byte_pitch=16)
         elif swizzling_id == "ps2_type1":
-            self.encoded_image_data = unswizzle_ps2(self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height, image_bpp, swizzle_type=1)
+            self.encoded_image_data = unswizzle_ps2(self.encoded_image_data, self.img_width, self.img_height, image_bpp, swizzle_type=1)
         elif swizzling_id == "ps2_type2":
-            self.encoded_image_data = unswizzle_ps2(self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height, image_bpp, swizzle_type=2)
+            self.encoded_image_data = unswizzle_ps2(self.encoded_image_data, self.img_width, self.img_height, image_bpp, swizzle_type=2)
         elif swizzling_id == "wii_u_linear":
-            self.encoded_image_data = unswizzle_wii_u(self.gui_params.img_width, self.gui_params.img_height, image_format=0x0000001a,
+            self.encoded_image_data = unswizzle_wii_u(self.img_width, self.img_height, image_format=0x0000001a,
                                                       tile_mode=0, swizzle_type=0, pitch=64, input_data=self.encoded_image_data)
         elif swizzling_id == "wii_u_bc":
-            self.encoded_image_data = unswizzle_wii_u(self.gui_params.img_width, self.gui_params.img_height, image_format=0x00000031,
+            self.encoded_image_data = unswizzle_wii_u(self.img_width, self.img_height, image_format=0x00000031,
                                                       tile_mode=4, swizzle_type=0, pitch=64, input_data=self.encoded_image_data)
         elif swizzling_id == "bc":
-            self.encoded_image_data = unswizzle_bc(self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height, 8, 8, image_bpp)
+            self.encoded_image_data = unswizzle_bc(self.encoded_image_data, self.img_width, self.img_height, 8, 8, image_bpp)
         elif swizzling_id == "3ds":
-            self.encoded_image_data = unswizzle_3ds(self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height, image_bpp)
+            self.encoded_image_data = unswizzle_3ds(self.encoded_image_data, self.img_width, self.img_height, image_bpp)
         else:
             logger.error(f"Swizzling type not supported! Type: {swizzling_id}")
+        return True
+
+    def _image_decode(self) -> bool:
+        logger.info(f"Image decode with pixel_format={self.decode_spec.pixel_format} start...")
+        if self.decode_spec.pixel_format not in PIXEL_FORMATS_NAMES:
+            logger.error(f"[1] Not supported pixel format! Pixel_format={self.decode_spec.pixel_format}")
+            self.is_preview_error = True
+
+        image_decoder = ImageDecoder()
+        self.img_width, self.img_height = self.decode_spec.img_width, self.decode_spec.img_height
+        self.index_image_data = None
+        self.palette_indexes = None
+        self.palette_indexes_key = None
+        image_format: ImageFormats = self._get_image_format_from_str(self.decode_spec.pixel_format)
+        palette_format: ImageFormats = self._get_image_format_from_str(self.decode_spec.palette_format)
+        palette_scale_value: int = self.decode_spec.palette_scale_value
+
+        # endianess logic
+        endianess_id: str = get_endianess_id(self.decode_spec.endianess_type)
+
+        # every stage output is cached separately, keyed by the parameters of all stages before it
+        stage_key: tuple = (
+            self.file_source.file_identity if self.file_source else get_file_identity(self.decode_spec.img_file_path),
+            self.decode_spec.img_start_offset,
+            self.decode_spec.img_end_offset,
+        )
+
+        if endianess_id in ("byte_swap_x360", "byte_swap_gamecube"):
+            stage_key += (endianess_id, self.img_width, self.img_height)
+            self._run_cached_stage(STAGE_SWAP, stage_key, self._image_swap_byte_order, endianess_id)
+            endianess_id = "little"
+
+        # image bpp logic
+        try:
+            image_bpp: int = get_bpp_for_image_format(image_format)
+        except Exception as error:
+            logger.warning(f"Couldn't get image bpp! Setting default value! Error: {error}")
+            image_bpp = 8
+
+        # decompression logic
+        compression_id = get_compression_id(self.decode_spec.compression_type)
+        if compression_id != "none":
+            if compression_id in ("packbits", "zlib", "lz4_frame", "lz4_block"):
+                stage_key += (compression_id,)
+            elif compression_id in ("rle_tga", "rle_tga_reversed", "rle_neversoft"):
+                stage_key += (compression_id, image_bpp)
+            else:
+                stage_key += (compression_id, image_bpp, self.img_width, self.img_height)
+            self._run_cached_stage(STAGE_DECOMPRESS, stage_key, self._image_decompress, compression_id, image_bpp)
+
+        # unswizzling logic
+        swizzling_id = get_swizzling_id(self.decode_spec.swizzling_type)
+        encoded_data_size: int = len(self.encoded_image_data)
+        if swizzling_id == "ps4_padding":
+            self.img_width = calculate_aligned_value(self.img_width, 32)
+            self.img_height = calculate_aligned_value(self.img_height, 32)
+
+        if swizzling_id != "none":
+            stage_key += (swizzling_id, self.img_width, self.img_height, image_bpp)
+            if swizzling_id in ("ps4", "ps4_padding", "ps5"):
+                stage_key += (self.decode_spec.pixel_format,)
+            self._run_cached_stage(STAGE_UNSWIZZLE, stage_key, self._image_unswizzle, swizzling_id, image_format, image_bpp)
 
         if len(self.encoded_image_data) != encoded_data_size:
             logger.warning(f"Different data size after unswizzling! Swizzling_id: {swizzling_id}")
 
+        if self.stage_caches is not None:
+            logger.info(self.stage_caches.get_stats_str())
+
         # decoding logic
-        if image_format in (ImageFormats.RGB121,
-                            ImageFormats.ALPHA4,
-                            ImageFormats.ALPHA4_17X,
-
-                            ImageFormats.RGBX2222,
-                            ImageFormats.RGBA2222,
-                            ImageFormats.RGB121_BYTE,
-                            ImageFormats.RGB332,
-                            ImageFormats.BGR332,
-                            ImageFormats.ALPHA8,
-                            ImageFormats.ALPHA8_17X,
-                            ImageFormats.LA44,
-                            ImageFormats.R8,
-                            ImageFormats.G8,
-                            ImageFormats.B8,
-
-                            ImageFormats.GRAY8A,
-                            ImageFormats.GRAY16,
-                            ImageFormats.RG88,
-                            ImageFormats.RGB565,
-                            ImageFormats.BGR565,
-                            ImageFormats.RGBX5551,
-                            ImageFormats.RGBA5551,
-                            ImageFormats.RGBT5551,
-                            ImageFormats.BGRT5551,
-                            ImageFormats.BGRA5551,
-                            ImageFormats.BGRA5551_TZAR,
-                            ImageFormats.BGRX5551,
-                            ImageFormats.RGBA4444,
-                            ImageFormats.ARGB4444,
-                            ImageFormats.XRGB4444,
-                            ImageFormats.ABGR4444,
-                            ImageFormats.XBGR4444,
-                            ImageFormats.RGBX4444,
-                            ImageFormats.BGRA4444,
-                            ImageFormats.BGRA4444_LEAPSTER,
-                            ImageFormats.BGRX4444,
-                            ImageFormats.XRGB1555,
-                            ImageFormats.XBGR1555,
-                            ImageFormats.ARGB1555,
-                            ImageFormats.ABGR1555,
-                            ImageFormats.R16,
-                            ImageFormats.G16,
-                            ImageFormats.B16,
-
-                            ImageFormats.RGB888,
-                            ImageFormats.BGR888,
-                            ImageFormats.RGBA6666,
-                            ImageFormats.RGBX6666,
-
-                            ImageFormats.RGBA8888,
-                            ImageFormats.BGRA8888,
-                            ImageFormats.BGRA8888_TZAR,
-                            ImageFormats.ARGB8888,
-                            ImageFormats.ABGR8888,
-                            ImageFormats.XRGB8888,
-                            ImageFormats.RGBX8888,
-                            ImageFormats.BGRX8888,
-                            ImageFormats.BGRT8888,
-                            ImageFormats.RGBM8888,
-                            ImageFormats.R32,
-                            ImageFormats.G32,
-                            ImageFormats.B32,
-
-                            ImageFormats.RGB48,
-                            ImageFormats.BGR48,
-
-                            ImageFormats.N64_RGB5A3,
-                            ImageFormats.N64_BGR5A3,
-                            ImageFormats.GRAY4,
-                            ImageFormats.GRAY8,
-                            ImageFormats.N64_IA4,
-                            ImageFormats.N64_IA8
-                            ):
-            self.decoded_image_data = image_decoder.decode_image(
-                self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height, image_format, endianess_id
+        decode_start_time = time.perf_counter()
+        decode_input_size: int = get_data_length(self.encoded_image_data)
+        if image_format in UNCOMPRESSED_IMAGE_FORMATS:
+            # vectorized fast path, ReverseBox decoder is used only when it's not possible
+            self.decoded_image_data = HeatDecoder().decode_image(
+                self.encoded_image_data, self.img_width, self.img_height, image_format, endianess_id
             )
+            if self.decoded_image_data is None:
+                self.decoded_image_data = image_decoder.decode_image(
+                    self.encoded_image_data, self.img_width, self.img_height, image_format, endianess_id
+                )
         elif image_format in (ImageFormats.PAL4,
                               ImageFormats.PAL8,
                               ImageFormats.PAL8_TZAR,
@@ -312,22 +472,31 @@ class HeatImage:
                               ImageFormats.PAL_I8A8
                               ):
 
-            if (self.gui_params.palette_loadfrom_value == 1 and self.gui_params.img_file_path is not None) \
-             or (self.gui_params.palette_loadfrom_value == 2 and self.gui_params.palette_file_path is not None):  # noqa: E121
-                palette_endianess_id: str = get_endianess_id(self.gui_params.palette_endianess)
-                self.heat_palette = HeatPalette(self.gui_params)
-                self.heat_palette.palette_reload()
+            if self._is_palette_selected():
+                palette_endianess_id: str = get_endianess_id(self.decode_spec.palette_endianess)
+                self._palette_reload()
+                decode_start_time = time.perf_counter()  # palette has its own stage
 
-                self.decoded_image_data = image_decoder.decode_indexed_image(
-                    self.encoded_image_data, self.heat_palette.decoded_palette_data, self.gui_params.img_width, self.gui_params.img_height,
-                    image_format, palette_format, endianess_id, palette_endianess_id, scale_value=palette_scale_value
+                # index data is kept, so palette changes don't require decoding image data again
+                self.index_image_data = self.encoded_image_data
+                self.palette_indexes = HeatDecoder().get_palette_indexes(
+                    self.encoded_image_data, self.img_width, self.img_height, image_format, endianess_id
                 )
+                self.palette_indexes_key = self.get_image_params_key()
+
+                # palette is decoded once to lookup table, ReverseBox decoder is used only when it's not possible
+                if not self._image_apply_palette():
+                    self.decoded_image_data = image_decoder.decode_indexed_image(
+                        self.encoded_image_data, self.heat_palette.decoded_palette_data, self.img_width, self.img_height,
+                        image_format, palette_format, endianess_id, palette_endianess_id, scale_value=palette_scale_value
+                    )
             else:
                 logger.info("Palette not loaded...")
 
         elif image_format in (ImageFormats.N64_RGBA32, ImageFormats.N64_CMPR):
+            self._materialize_encoded_data()
             self.decoded_image_data = image_decoder.decode_n64_image(
-                self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height, image_format
+                self.encoded_image_data, self.img_width, self.img_height, image_format
             )
         elif image_format in (ImageFormats.BC1_DXT1,
                               ImageFormats.BC2_DXT2,
@@ -339,15 +508,17 @@ class HeatImage:
                               ImageFormats.BC6H_UF16,
                               ImageFormats.BC7_UNORM
                               ):
+            self._materialize_encoded_data()
             self.decoded_image_data = image_decoder.decode_compressed_image(
-                self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height, image_format
+                self.encoded_image_data, self.img_width, self.img_height, image_format
             )
         elif image_format in (ImageFormats.PSP_DXT1,
                               ImageFormats.PSP_DXT3,
                               ImageFormats.PSP_DXT5,
                               ):
+            self._materialize_encoded_data()
             self.decoded_image_data = image_decoder.decode_psp_dxt_image(
-                self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height, image_format
+                self.encoded_image_data, self.img_width, self.img_height, image_format
             )
         elif "ASTC" in image_format.value\
                 or "PVRTCI" in image_format.value\
@@ -356,8 +527,9 @@ class HeatImage:
                 or image_format in (ImageFormats.BW1bpp,
                                     ImageFormats.SharedExponentR9G9B9E5, ImageFormats.RGBG8888, ImageFormats.GRGB8888,
                                     ImageFormats.RGBM, ImageFormats.RGBD):
+            self._materialize_encoded_data()
             self.decoded_image_data = image_decoder.decode_pvrtexlib_image(
-                self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height, image_format
+                self.encoded_image_data, self.img_width, self.img_height, image_format
             )
         elif image_format in (ImageFormats.GST121,
                               ImageFormats.GST221,
@@ -382,25 +554,265 @@ class HeatImage:
                               ImageFormats.YUV440P,
                               ImageFormats.YUV444P,
                               ImageFormats.AYUV):
+            self._materialize_encoded_data()
             self.decoded_image_data = image_decoder.decode_yuv_image(
-                self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height, image_format
+                self.encoded_image_data, self.img_width, self.img_height, image_format
             )
         elif image_format == ImageFormats.BUMPMAP_SR:
+            self._materialize_encoded_data()
             self.decoded_image_data = image_decoder.decode_bumpmap_image(
-                self.encoded_image_data, self.gui_params.img_width, self.gui_params.img_height, image_format
+                self.encoded_image_data, self.img_width, self.img_height, image_format
             )
         else:
             logger.error("[3] Not supported pixel format!")
             self.is_preview_error = True
 
+        self.render_timings.add_stage(STAGE_DECODE, decode_start_time, decode_input_size, get_data_length(self.decoded_image_data))
+        return True
+
+    def _is_indexed_format(self) -> bool:
+        return self.decode_spec.pixel_format in ("PAL4", "PAL8", "PAL8_TZAR", "PAL16", "PAL32", "PAL_I8A8")
+
+    def _is_palette_selected(self) -> bool:
+        return (self.decode_spec.palette_loadfrom_value == 1 and self.decode_spec.img_file_path is not None) \
+            or (self.decode_spec.palette_loadfrom_value == 2 and self.decode_spec.palette_file_path is not None)
+
+    def _palette_reload(self) -> bool:
+        start_time = time.perf_counter()
+        if self.heat_palette is None:
+            self.heat_palette = HeatPalette(self.decode_spec, self.file_source)
+        self.heat_palette.decode_spec = self.decode_spec
+        is_reloaded: bool = self.heat_palette.palette_reload()
+        self.render_timings.add_stage(STAGE_PALETTE, start_time, get_data_length(self.heat_palette.encoded_palette_data),
+                                      get_data_length(self.heat_palette.decoded_palette_data))
+        return is_reloaded
+
+    def _image_apply_palette(self) -> bool:
+        # decodes kept palette indexes with current palette
+        if self.palette_indexes is None:
+            return False
+        image_format: ImageFormats = self._get_image_format_from_str(self.decode_spec.pixel_format)
+        palette_format: ImageFormats = self._get_image_format_from_str(self.decode_spec.palette_format)
+        heat_decoder: HeatDecoder = HeatDecoder()
+        palette_lut: Optional[tuple] = heat_decoder.get_palette_lut(
+            self.heat_palette.decoded_palette_data, palette_format, get_endianess_id(self.decode_spec.palette_endianess), self.decode_spec.palette_scale_value
+        )
+        if palette_lut is None:
+            return False
+        decoded_image_data: Optional[bytes] = heat_decoder.apply_palette_lut(self.palette_indexes, palette_lut, image_format, palette_format)
+        if decoded_image_data is None:
+            return False
+        self.decoded_image_data = decoded_image_data
+        return True
+
+    def _is_palette_only_change(self) -> bool:
+        return self._is_indexed_format() and self._is_palette_selected() \
+            and self.palette_indexes is not None and self.palette_indexes_key == self.get_image_params_key()
+
+    def _is_pixel_stream_format(self) -> bool:
+        # per-pixel data read straight from file (no byte swap, compression or swizzling)
+        return self.decode_spec.pixel_format in PIXEL_FORMATS_NAMES \
+            and self._get_image_format_from_str(self.decode_spec.pixel_format) in UNCOMPRESSED_IMAGE_FORMATS \
+            and get_endianess_id(self.decode_spec.endianess_type) in ("little", "big") \
+            and get_compression_id(self.decode_spec.compression_type) == "none" \
+            and get_swizzling_id(self.decode_spec.swizzling_type) == "none"
+
+    def _image_decode_from_pixel_stream(self) -> bool:
+        # width/height changes and offset steps by whole pixels reuse already decoded pixels
+        if not self._is_pixel_stream_format():
+            return False
+        start_time = time.perf_counter()
+        decoded_image_data: Optional[bytes] = self.pixel_stream.decode_image(
+            self.loaded_image_data, self.file_source.file_identity, self.decode_spec.img_start_offset, self.decode_spec.img_end_offset,
+            self.decode_spec.img_width, self.decode_spec.img_height,
+            self._get_image_format_from_str(self.decode_spec.pixel_format), get_endianess_id(self.decode_spec.endianess_type)
+        )
+        if decoded_image_data is None:
+            return False
+        self.img_width, self.img_height = self.decode_spec.img_width, self.decode_spec.img_height
+        self.index_image_data = None
+        self.palette_indexes = None
+        self.palette_indexes_key = None
+        self.decoded_image_data = decoded_image_data
+        self.render_timings.add_stage(STAGE_DECODE, start_time, max(self.decode_spec.img_end_offset - self.decode_spec.img_start_offset, 0),
+                                      get_data_length(self.decoded_image_data))
+        return True
+
+    def get_image_params_key(self) -> tuple:
+        # parameters that have impact on image (index) data, without palette
+        return (
+            self.file_source.file_identity if self.file_source else get_file_identity(self.decode_spec.img_file_path),
+            self.decode_spec.img_start_offset,
+            self.decode_spec.img_end_offset,
+            self.decode_spec.endianess_type,
+            self.decode_spec.compression_type,
+            self.decode_spec.swizzling_type,
+            self.decode_spec.pixel_format,
+            self.decode_spec.img_width,
+            self.decode_spec.img_height,
+        )
+
+    def get_decode_params_key(self) -> tuple:
+        # every parameter that has impact on decoded data must be part of the key
+        palette_key: tuple = ()
+        if self._is_indexed_format():
+            palette_key = (
+                self.decode_spec.palette_format,
+                self.decode_spec.palette_loadfrom_value,
+                get_file_identity(self.decode_spec.palette_file_path) if self.decode_spec.palette_loadfrom_value == 2 else (),
+                self.decode_spec.palette_offset,
+                self.decode_spec.palette_scale_value,
+                self.decode_spec.palette_endianess,
+                self.decode_spec.palette_ps2_swizzle_flag,
+            )
+        return self.get_image_params_key() + (palette_key,)
+
+    def is_decode_required(self) -> bool:
+        # view parameters (zoom, flips, rotate etc.) are not part of the key,
+        # so changing them doesn't require decoding the image again
+        return self.decoded_params_key is None or self.get_decode_params_key() != self.decoded_params_key
+
+    def _load_from_decode_cache(self, cache_key: tuple) -> bool:
+        start_time = time.perf_counter()
+        cache_entry: Optional[tuple] = self.decode_cache.get(cache_key)
+        if cache_entry is None:
+            return False
+
+        encoded_image_data, self.decoded_image_data, self.img_width, self.img_height = cache_entry
+        if encoded_image_data is not None:
+            self.encoded_image_data = encoded_image_data
+        self.index_image_data = None  # kept from previous decode, doesn't match cached image
+        self.palette_indexes = None
+        self.palette_indexes_key = None
+        self.render_timings.add_stage(STAGE_CACHE, start_time, 0, get_data_length(self.decoded_image_data))
+        return True
+
+    def _save_to_decode_cache(self, cache_key: tuple) -> bool:
+        # view of the file is not kept (it would keep closed file mapped), it's read again on cache hit
+        encoded_image_data: Optional[bytes] = self.encoded_image_data if not isinstance(self.encoded_image_data, memoryview) else None
+        cache_entry: tuple = (encoded_image_data, self.decoded_image_data, self.img_width, self.img_height)
+        return self.decode_cache.put(cache_key, cache_entry, get_data_size(cache_entry))
+
+    def get_memory_sizes(self) -> dict:
+        # live RAM of all buffers (memory-mapped file views cost nothing),
+        # encoded and decoded data shared with decode cache entry is accounted by the cache
+        is_shared_with_cache: bool = self.decode_cache is not None and self.decoded_params_key is not None \
+            and self.decoded_params_key in self.decode_cache
+        return {
+            MEMORY_ENCODED: get_data_size(self.encoded_image_data) if not is_shared_with_cache else 0,
+            MEMORY_INDEX: (get_data_size(self.index_image_data) if self.index_image_data is not self.encoded_image_data else 0)
+            + get_data_size(self.palette_indexes),
+            MEMORY_DECODED: get_data_size(self.decoded_image_data) if not is_shared_with_cache else 0,
+            MEMORY_PIXEL_STREAM: get_data_size(self.pixel_stream.stream_pixels),
+        }
+
+    def release_intermediates(self) -> bool:
+        # buffers kept only to speed up next reloads, decoded image stays
+        self.pixel_stream.clear()
+        self.palette_indexes = None
+        self.palette_indexes_key = None
         return True
 
-    def image_reload(self) -> bool:
+    def _close_scratch_file(self) -> bool:
+        if self.scratch_file:
+            self.scratch_file.close()
+            self.scratch_file = None
+        return True
+
+    def _is_out_of_core_decode_needed(self) -> bool:
+        # huge images, and images that don't fit in memory budget even after releasing caches, are decoded to scratch file
+        if not self._is_pixel_stream_format() or not is_out_of_core_format(
+                self._get_image_format_from_str(self.decode_spec.pixel_format), get_endianess_id(self.decode_spec.endianess_type)):
+            return False
+        if self.decode_spec.img_width * self.decode_spec.img_height * 4 >= OUT_OF_CORE_MIN_IMAGE_SIZE:
+            return True
+        return self.memory_budget is not None and not self.memory_budget.ensure_available(get_decode_memory_estimate(self.decode_spec))
+
+    def _image_decode_out_of_core(self) -> bool:
+        # decoded stripe by stripe, so only one stripe is in RAM at a time
+        start_time = time.perf_counter()
+        scratch_file: Optional[HeatScratchFile] = decode_to_scratch_file(
+            self.encoded_image_data, self.decode_spec.img_width, self.decode_spec.img_height,
+            self._get_image_format_from_str(self.decode_spec.pixel_format), get_endianess_id(self.decode_spec.endianess_type)
+        )
+        if scratch_file is None:
+            return False
+        self.img_width, self.img_height = self.decode_spec.img_width, self.decode_spec.img_height
+        self.index_image_data = None
+        self.palette_indexes = None
+        self.palette_indexes_key = None
+        self.pixel_stream.clear()
+        self.scratch_file = scratch_file
+        self.decoded_image_data = scratch_file.get_view()
+        self.render_timings.add_stage(STAGE_DECODE, start_time, get_data_length(self.encoded_image_data), scratch_file.file_size)
+        return True
+
+    def _is_decode_memory_available(self) -> bool:
+        required_size: int = get_decode_memory_estimate(self.decode_spec)
+        if self.memory_budget.ensure_available(required_size):
+            return True
+        self.memory_error_message = self.memory_budget.get_exceeded_message(required_size)
+        logger.error(f"Decode refused! {self.memory_error_message}")
+        return False
+
+    def image_reload(self, is_cache_used: bool = True) -> bool:
+        # is_cache_used=False decodes everything from scratch (e.g. for profiling), results are still cached
         logger.info("Image reload start")
         start_time = time.time()
+        self.render_timings = RenderTimings()
         self.is_preview_error = False
+        self.memory_error_message = None
+        self.is_cache_used = is_cache_used
+        if not is_cache_used:
+            self.release_intermediates()
         self._image_read()
-        self._image_decode()
+        self._close_scratch_file()  # mapping stays alive until previous decoded data is no longer used
+
+        # decode cache logic
+        decode_params_key: tuple = self.get_decode_params_key()
+        cache_key: Optional[tuple] = decode_params_key if self.decode_cache is not None else None
+        if cache_key is not None and is_cache_used and self._load_from_decode_cache(cache_key):
+            self.decoded_params_key = decode_params_key
+            execution_time = time.time() - start_time
+            logger.info(f"Image reload for pixel_format={self.decode_spec.pixel_format} loaded from cache. Time: {round(execution_time, 2)} seconds.")
+            return True
+
+        if self._is_out_of_core_decode_needed() and self._image_decode_out_of_core():
+            # scratch file is not cached, it would take disk space (and page cache) of many images
+            self.decoded_params_key = decode_params_key
+            execution_time = time.time() - start_time
+            logger.info(f"Image reload for pixel_format={self.decode_spec.pixel_format} decoded out of core. Time: {round(execution_time, 2)} seconds.")
+            return True
+
+        if self.memory_budget is not None and not self._is_decode_memory_available():
+            self.is_preview_error = True
+            self.decoded_params_key = None
+            return True
+
+        previous_decoded_image_data: Optional[bytes] = self.decoded_image_data
+        if self._is_palette_only_change():
+            # only palette parameters changed, kept index data is decoded with new palette
+            logger.info("Only palette parameters changed, applying new palette to kept index data...")
+            self.encoded_image_data = self.index_image_data
+            self._palette_reload()
+            decode_start_time = time.perf_counter()
+            if self._image_apply_palette():
+                self.render_timings.add_stage(STAGE_DECODE, decode_start_time, get_data_length(self.index_image_data),
+                                              get_data_length(self.decoded_image_data))
+            else:
+                # kept index data is already swapped, decompressed and unswizzled, full decode must start from file data
+                self._image_read()
+                self._image_decode()
+        elif self._image_decode_from_pixel_stream():
+            logger.info("Image decoded from pixel stream")
+        else:
+            self._image_decode()
+        if cache_key is not None and not self.is_preview_error \
+                and self.decoded_image_data is not None and self.decoded_image_data is not previous_decoded_image_data:
+            self._save_to_decode_cache(cache_key)
+        self.decoded_params_key = decode_params_key
+
         execution_time = time.time() - start_time
-        logger.info(f"Image reload for pixel_format={self.gui_params.pixel_format} finished successfully. Time: {round(execution_time, 2)} seconds.")
+        logger.info(f"Image reload for pixel_format={self.decode_spec.pixel_format} finished successfully. Time: {round(execution_time, 2)} seconds."
+                    f" Stages: {self.render_timings.get_summary_str()}")
         return True
@@ -0,0 +1,109 @@
+"""
+Copyright © 2026  Bartłomiej Duda
+License: GPL-3.0 License
+"""
+
+import threading
+from typing import Callable, Optional
+
+from reversebox.common.logger import get_logger
+from reversebox.image.common import get_bpp_for_image_format
+from reversebox.image.image_formats import ImageFormats
+
+from src.Image.heatspec import DecodeSpec
+
+logger = get_logger(__name__)
+
+# fmt: off
+
+# buffer categories
+MEMORY_ENCODED: str = "encoded"  # encoded data copied to RAM (byte swap, decompression and unswizzle outputs)
+MEMORY_INDEX: str = "index"  # palette indexes kept for palette-only changes
+MEMORY_DECODED: str = "decoded"
+MEMORY_PIXEL_STREAM: str = "stream"
+MEMORY_CACHES: str = "caches"
+MEMORY_PREVIEW: str = "preview"  # zoom levels, flipped/rotated copy and canvas tiles
+
+
+def get_size_mb(size: int) -> float:
+    return size / (1024 * 1024)
+
+
+def get_decoded_size_estimate(decode_spec: DecodeSpec) -> int:
+    # decoders output at least width*height pixels, or every pixel of selected range if there are more
+    try:
+        bpp: int = get_bpp_for_image_format(ImageFormats[decode_spec.pixel_format])
+    except Exception:
+        bpp = 8
+    data_size: int = max(min(decode_spec.img_end_offset, decode_spec.total_file_size) - decode_spec.img_start_offset, 0)
+    return max(decode_spec.img_width * decode_spec.img_height, data_size * 8 // max(bpp, 1)) * 4
+
+
+def get_decode_memory_estimate(decode_spec: DecodeSpec) -> int:
+    # peak memory of one decode: input and output of a stage (byte swap, decompression, unswizzle) are alive at the same time,
+    # and decoders make one temporary copy of their RGBA output
+    encoded_size: int = max(min(decode_spec.img_end_offset, decode_spec.total_file_size) - decode_spec.img_start_offset, 0)
+    return encoded_size * 2 + get_decoded_size_estimate(decode_spec) * 2
+
+
+class HeatMemoryBudget:
+    """
+    Accounting of live pipeline buffers (per category) with a global memory budget.
+    Owners of big buffers register a function returning their live sizes per category,
+    and optionally a function releasing buffers that can be recreated (caches, intermediates).
+    Before a decode its estimated peak memory must fit in the budget: releasable buffers are freed
+    in registration order until it fits, and decodes that can't fit even then are refused.
+    """
+
+    def __init__(self, max_size_bytes: int):
+        self.max_size_bytes: int = max_size_bytes
+        self._owners: list = []  # (owner name, get sizes function, release function)
+        self._lock = threading.Lock()  # decodes are started by render and prefetch workers
+
+    def register(self, owner_name: str, get_sizes_function: Callable[[], dict], release_function: Optional[Callable[[], bool]] = None) -> bool:
+        self._owners.append((owner_name, get_sizes_function, release_function))
+        return True
+
+    def get_live_sizes(self) -> dict:
+        live_sizes: dict = {}
+        for _, get_sizes_function, _ in self._owners:
+            for category_name, size in get_sizes_function().items():
+                live_sizes[category_name] = live_sizes.get(category_name, 0) + size
+        return live_sizes
+
+    def get_total_size(self) -> int:
+        return sum(self.get_live_sizes().values())
+
+    def get_available_size(self) -> int:
+        return max(self.max_size_bytes - self.get_total_size(), 0)
+
+    def ensure_available(self, required_size: int, is_release_allowed: bool = True) -> bool:
+        with self._lock:
+            if required_size > self.max_size_bytes:
+                return False
+            for owner_name, _, release_function in self._owners:
+                if self.get_available_size() >= required_size:
+                    return True
+                if release_function is not None and is_release_allowed:
+                    released_size: int = self.get_total_size()
+                    release_function()
+                    released_size -= self.get_total_size()
+                    logger.info(f"[MEMORY] Released {get_size_mb(released_size):.1f} MB of {owner_name} buffers to fit the memory budget")
+            return self.get_available_size() >= required_size
+
+    def get_exceeded_message(self, required_size: int) -> str:
+        return (f"Image needs about {get_size_mb(required_size):.0f} MB to decode, but only {get_size_mb(self.get_available_size()):.0f} MB"
+                f" of {get_size_mb(self.max_size_bytes):.0f} MB memory budget is available ({self.get_stats_str()})."
+                f" Choose smaller image dimensions or increase the memory budget.")
+
+    def get_stats_str(self) -> str:
+        return ", ".join(f"{category_name}={get_size_mb(size):.1f} MB" for category_name, size in self.get_live_sizes().items() if size > 0) \
+            or "no buffers"
+
+    def get_hud_text(self) -> str:
+        hud_lines: list = [f"{' memory':<11}{'MB':>8}"]
+        for category_name, size in self.get_live_sizes().items():
+            if size > 0:
+                hud_lines.append(f" {category_name:<10}{get_size_mb(size):>8.1f}")
+        hud_lines.append(f"{' total':<11}{get_size_mb(self.get_total_size()):>8.1f} / {get_size_mb(self.max_size_bytes):.0f}")
+        return "\n".join(hud_lines)
@@ -9,80 +9,106 @@ from typing import Optional
 from reversebox.common.logger import get_logger
 from reversebox.image.swizzling.swizzle_ps2 import unswizzle_ps2_palette
 
-from src.GUI.gui_params import GuiParams
+from src.Image.heatcache import HeatCache
+from src.Image.heatsource import HeatFileSource, get_file_identity
+from src.Image.heatspec import DecodeSpec
 
 logger = get_logger(__name__)
 
 # fmt: off
 
+MAX_PALETTE_CACHE_SIZE: int = 4 * 1024 * 1024  # decoded and encoded palette of each entry take up to 2 KB each
+
 
 class HeatPalette:
-    def __init__(self, gui_params: GuiParams):
-        self.gui_params: GuiParams = gui_params
-        self.loaded_palette_data: Optional[bytes] = None
+    """
+    Palette subsystem attached to the opened image file.
+    Palette source (image file or separate palette file) is opened once
+    and decoded palettes are cached, so changing palette parameters doesn't touch the disk.
+    """
+
+    def __init__(self, decode_spec: DecodeSpec, image_file_source: Optional[HeatFileSource] = None):
+        self.decode_spec: DecodeSpec = decode_spec
+        self.image_file_source: Optional[HeatFileSource] = image_file_source  # shared with HeatImage
+        self.is_image_file_source_owned: bool = image_file_source is None
+        self.palette_file_source: Optional[HeatFileSource] = None
+        self.loaded_palette_data: Optional[memoryview] = None
         self.encoded_palette_data: Optional[bytes] = None
         self.decoded_palette_data: Optional[bytes] = None
-        self.is_data_loaded_from_palette_file: bool = False
         self.MAX_PALETTE_SIZE: int = 2048
+        self.decoded_palettes_cache: HeatCache = HeatCache("palette", MAX_PALETTE_CACHE_SIZE)
 
-    def _palette_read(self) -> bool:
+    def _get_palette_source(self) -> Optional[HeatFileSource]:
         # load from the same file
-        if not self.is_data_loaded_from_palette_file and self.gui_params.palette_loadfrom_value == 1:
-            logger.info("Reading palette data from the same file")
-            palette_file = open(self.gui_params.img_file_path, "rb")
-            self.loaded_palette_data = palette_file.read()
-            palette_file.close()
-            self.encoded_palette_data = self.loaded_palette_data
-            self.is_data_loaded_from_palette_file = True
-        # load from another file
-        elif not self.is_data_loaded_from_palette_file and self.gui_params.palette_loadfrom_value == 2:
-            logger.info("Reading palette data from the another file")
-            palette_file = open(self.gui_params.palette_file_path, "rb")
-            self.loaded_palette_data = palette_file.read()
-            palette_file.close()
-            self.encoded_palette_data = self.loaded_palette_data
-            self.is_data_loaded_from_palette_file = True
-        else:
-            self.encoded_palette_data = self.loaded_palette_data[self.gui_params.palette_offset: self.gui_params.palette_offset + self.MAX_PALETTE_SIZE]
-
+        if self.decode_spec.palette_loadfrom_value == 1:
+            if self.image_file_source is None:
+                logger.info("Mapping palette data from the same file")
+                self.image_file_source = HeatFileSource(self.decode_spec.img_file_path)
+            return self.image_file_source
+        # load from another file (reopened only when path or file on disk has changed)
+        elif self.decode_spec.palette_loadfrom_value == 2:
+            if self.palette_file_source is None or self.palette_file_source.file_identity != get_file_identity(self.decode_spec.palette_file_path):
+                logger.info("Mapping palette data from the another file")
+                if self.palette_file_source is not None:
+                    self.palette_file_source.close()
+                self.palette_file_source = HeatFileSource(self.decode_spec.palette_file_path)
+            return self.palette_file_source
+        return None
+
+    def _palette_read(self, palette_source: HeatFileSource) -> bool:
+        self.loaded_palette_data = palette_source.get_view()
+        # palette is tiny, so it is copied out of the view
+        self.encoded_palette_data = bytes(self.loaded_palette_data[self.decode_spec.palette_offset: self.decode_spec.palette_offset + self.MAX_PALETTE_SIZE])
         return True
 
     def _palette_decode(self) -> bool:
         logger.info("Palette decode start...")
 
-        # calculate end offset
-        if len(self.loaded_palette_data) - self.gui_params.palette_offset > self.MAX_PALETTE_SIZE:
-            palette_end_offset = self.gui_params.palette_offset + self.MAX_PALETTE_SIZE
-        else:
-            palette_end_offset = len(self.loaded_palette_data)
-
         # set initial (encoded) palette data
-        encoded_palette_data: bytes = self.encoded_palette_data[self.gui_params.palette_offset:palette_end_offset]
+        encoded_palette_data: bytes = self.encoded_palette_data
 
         # unswizzle palette
-        if self.gui_params.palette_ps2_swizzle_flag:
+        if self.decode_spec.palette_ps2_swizzle_flag:
             self.decoded_palette_data = unswizzle_ps2_palette(palette_data=encoded_palette_data,
                                                               bpp=16 if len(encoded_palette_data) < 1024 else 32)
         else:
             self.decoded_palette_data = encoded_palette_data  # no decoding needed
 
         # fill small palette logic
-        if len(self.decoded_palette_data) < self.MAX_PALETTE_SIZE:
-            new_palette: bytearray = bytearray(self.MAX_PALETTE_SIZE)
-            for i in range(self.MAX_PALETTE_SIZE):
-                if i < len(self.decoded_palette_data):
-                    new_palette[i] = self.decoded_palette_data[i]
-                else:
-                    new_palette[i] = 0
-            self.decoded_palette_data = new_palette
-
+        self.decoded_palette_data = bytes(self.decoded_palette_data).ljust(self.MAX_PALETTE_SIZE, b"\x00")
         return True
 
     def palette_reload(self) -> bool:
         logger.info("Palette reload start")
         start_time = time.time()
-        self._palette_read()
+        palette_source: Optional[HeatFileSource] = self._get_palette_source()
+        if palette_source is None:
+            logger.warning("Palette source not selected!")
+            return False
+
+        palette_key: tuple = (palette_source.file_identity, self.decode_spec.palette_offset,
+                              self.decode_spec.palette_ps2_swizzle_flag, self.decode_spec.palette_format)
+        cache_entry: Optional[tuple] = self.decoded_palettes_cache.get(palette_key)
+        if cache_entry is not None:
+            # encoded palette must match the decoded one (it's used e.g. by palette timings)
+            self.decoded_palette_data, self.encoded_palette_data = cache_entry
+            logger.info("Palette loaded from cache")
+            return True
+
+        self._palette_read(palette_source)
         self._palette_decode()
+        self.decoded_palettes_cache.put(palette_key, (self.decoded_palette_data, self.encoded_palette_data))
         execution_time = time.time() - start_time
-        logger.info(f"Palette reload for pixel_format={self.gui_params.pixel_format} finished successfully. Time: {round(execution_time, 2)} seconds.")
+        logger.info(f"Palette reload for pixel_format={self.decode_spec.pixel_format} finished successfully. Time: {round(execution_time, 2)} seconds.")
+        return True
+
+    def palette_close(self) -> bool:
+        self.loaded_palette_data = None
+        if self.palette_file_source is not None:
+            self.palette_file_source.close()
+            self.palette_file_source = None
+        if self.image_file_source is not None and self.is_image_file_source_owned:
+            self.image_file_source.close()
+        self.image_file_source = None
+        self.decoded_palettes_cache.clear()
         return True
@@ -0,0 +1,108 @@
+"""
+Copyright © 2026  Bartłomiej Duda
+License: GPL-3.0 License
+"""
+
+from typing import Optional
+
+import numpy as np
+from reversebox.common.logger import get_logger
+from reversebox.image.image_decoder import ImageDecoder
+from reversebox.image.image_formats import ImageFormats
+
+from src.Image.heatdecoder import HeatDecoder
+
+logger = get_logger(__name__)
+
+# fmt: off
+
+MAX_PIXEL_STREAM_SIZE: int = 256 * 1024 * 1024  # decoded RGBA bytes
+
+
+class HeatPixelStream:
+    """
+    Decoded RGBA pixels of a linear byte range of the file, for per-pixel formats
+    (not swizzled, not compressed, at least 8 bpp).
+    Decoded pixels don't depend on image width/height and moving offsets by a multiple of bytes per pixel
+    only shifts the stream, so such changes are served with slices of already decoded pixels.
+    Only the bytes at the edges that were not decoded yet need decoding.
+    """
+
+    def __init__(self, max_size_bytes: int = MAX_PIXEL_STREAM_SIZE):
+        self.max_size_bytes: int = max_size_bytes
+        self.stream_key: Optional[tuple] = None
+        self.stream_start_offset: int = 0
+        self.stream_pixels: Optional[np.ndarray] = None
+        self.heat_decoder: HeatDecoder = HeatDecoder()
+
+    def clear(self) -> bool:
+        self.stream_key = None
+        self.stream_start_offset = 0
+        self.stream_pixels = None
+        return True
+
+    def _decode_range(self, file_data: memoryview, start_offset: int, end_offset: int, image_format: ImageFormats,
+                      image_endianess: str) -> Optional[np.ndarray]:
+        decoded_data: Optional[bytes] = self.heat_decoder.decode_image(file_data[start_offset: end_offset], 0, 0, image_format, image_endianess)
+        if decoded_data is None:
+            return None
+        return np.frombuffer(decoded_data, dtype=np.uint8).reshape(-1, 4)
+
+    def _update_stream(self, file_data: memoryview, stream_key: tuple, start_offset: int, end_offset: int,
+                       image_format: ImageFormats, image_endianess: str, bytes_per_pixel: int) -> bool:
+        stream_end_offset: int = self.stream_start_offset + (len(self.stream_pixels) * bytes_per_pixel if self.stream_pixels is not None else 0)
+        is_stream_reusable: bool = self.stream_key == stream_key and self.stream_pixels is not None \
+            and start_offset <= stream_end_offset and end_offset >= self.stream_start_offset \
+            and (max(end_offset, stream_end_offset) - min(start_offset, self.stream_start_offset)) // bytes_per_pixel * 4 <= self.max_size_bytes
+
+        if not is_stream_reusable:
+            stream_pixels = self._decode_range(file_data, start_offset, end_offset, image_format, image_endianess)
+            if stream_pixels is None:
+                return False
+            self.stream_key, self.stream_start_offset, self.stream_pixels = stream_key, start_offset, stream_pixels
+            return True
+
+        # only newly exposed bytes are decoded, stream is changed only when every part is decoded
+        prefix_pixels: Optional[np.ndarray] = None
+        suffix_pixels: Optional[np.ndarray] = None
+        if start_offset < self.stream_start_offset:
+            prefix_pixels = self._decode_range(file_data, start_offset, self.stream_start_offset, image_format, image_endianess)
+            if prefix_pixels is None:
+                return False
+        if end_offset > stream_end_offset:
+            suffix_pixels = self._decode_range(file_data, stream_end_offset, end_offset, image_format, image_endianess)
+            if suffix_pixels is None:
+                return False
+        if prefix_pixels is not None or suffix_pixels is not None:
+            self.stream_pixels = np.concatenate([stream_part for stream_part in (prefix_pixels, self.stream_pixels, suffix_pixels)
+                                                 if stream_part is not None])
+            self.stream_start_offset = min(start_offset, self.stream_start_offset)
+        return True
+
+    def decode_image(self, file_data: memoryview, file_identity: tuple, start_offset: int, end_offset: int, img_width: int, img_height: int,
+                     image_format: ImageFormats, image_endianess: str) -> Optional[bytes]:
+        # same result as decoding file_data[start_offset:end_offset] with HeatDecoder/ImageDecoder
+        data_format: Optional[tuple] = ImageDecoder.generic_data_formats.get(image_format)
+        if data_format is None or data_format[1] % 8 != 0 or image_endianess not in ("little", "big"):
+            return None
+        bytes_per_pixel: int = data_format[1] // 8
+        number_of_pixels: int = max(min(end_offset, len(file_data)) - start_offset, 0) // bytes_per_pixel
+        end_offset = start_offset + number_of_pixels * bytes_per_pixel
+
+        if number_of_pixels > 0:
+            # stream can be shifted only by whole pixels
+            stream_key: tuple = (file_identity, image_format, image_endianess, start_offset % bytes_per_pixel)
+            if not self._update_stream(file_data, stream_key, start_offset, end_offset, image_format, image_endianess, bytes_per_pixel):
+                return None
+            first_pixel: int = (start_offset - self.stream_start_offset) // bytes_per_pixel
+            pixels = self.stream_pixels[first_pixel: first_pixel + number_of_pixels]
+        else:
+            pixels = np.zeros((0, 4), dtype=np.uint8)
+
+        # output has at least width*height pixels, missing pixels are zeros (same as in ReverseBox)
+        number_of_output_pixels: int = img_width * img_height
+        if number_of_pixels < number_of_output_pixels:
+            texture_data = np.zeros((number_of_output_pixels, 4), dtype=np.uint8)
+            texture_data[:number_of_pixels] = pixels
+            return texture_data.tobytes()
+        return pixels.tobytes()
@@ -0,0 +1,124 @@
+"""
+Copyright © 2026  Bartłomiej Duda
+License: GPL-3.0 License
+"""
+
+import cProfile
+import dataclasses
+import io
+import json
+import os
+import pstats
+import shlex
+import time
+import tracemalloc
+from typing import Optional
+
+from reversebox.common.logger import get_logger
+
+from src.Image.heatspec import DecodeSpec, ViewSpec
+
+logger = get_logger(__name__)
+
+# fmt: off
+
+# profiles are saved in this directory next to config file
+PROFILE_DIRECTORY_NAME: str = "profiles"
+TOP_ALLOCATIONS_COUNT: int = 30
+TOP_FUNCTIONS_COUNT: int = 30
+
+# allocations made by the profilers themselves are not reported
+IGNORED_ALLOCATION_FILES: tuple = (tracemalloc.__file__, cProfile.__file__, "<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>")
+
+
+def get_profile_directory(main_directory: str) -> str:
+    return os.path.join(main_directory, PROFILE_DIRECTORY_NAME)
+
+
+class HeatProfiler:
+    """
+    Captures one image reload (decode and preview) with cProfile and tracemalloc.
+    cProfile works per thread, so it's paused when the job is passed from worker thread
+    to main thread and resumed there. Tracemalloc traces the whole process.
+    Results are saved as ".prof" file (for pstats, snakeviz etc.), text report with top allocations
+    and JSON file with decode parameters, so the capture can be replayed in command-line mode.
+    """
+
+    def __init__(self, profile_directory: str, top_allocations_count: int = TOP_ALLOCATIONS_COUNT):
+        self.profile_directory: str = profile_directory
+        self.top_allocations_count: int = top_allocations_count
+        self.profile: cProfile.Profile = cProfile.Profile()
+        self.is_tracemalloc_started: bool = False
+        self.is_running: bool = False
+        self.start_time: float = 0.0
+
+    def start(self) -> bool:
+        # tracemalloc may be already started by user (e.g. PYTHONTRACEMALLOC), then it's not stopped here
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.is_tracemalloc_started = True
+        tracemalloc.reset_peak()
+        self.start_time = time.perf_counter()
+        self.profile.enable()
+        self.is_running = True
+        return True
+
+    def pause(self) -> bool:
+        if self.is_running:
+            self.profile.disable()
+            self.is_running = False
+        return True
+
+    def resume(self) -> bool:
+        if not self.is_running:
+            self.profile.enable()
+            self.is_running = True
+        return True
+
+    def _get_allocations_report(self, memory_snapshot: tracemalloc.Snapshot, current_memory_size: int, peak_memory_size: int) -> str:
+        memory_snapshot = memory_snapshot.filter_traces([tracemalloc.Filter(False, file_name) for file_name in IGNORED_ALLOCATION_FILES])
+        report_lines: list = [
+            f"Traced memory: current={current_memory_size / (1024 * 1024):.2f} MB, peak={peak_memory_size / (1024 * 1024):.2f} MB",
+            "",
+            f"Top {self.top_allocations_count} allocations (still allocated at the end of reload):",
+        ]
+        for statistic_number, statistic in enumerate(memory_snapshot.statistics("lineno")[:self.top_allocations_count], start=1):
+            report_lines.append(f"#{statistic_number:<3} {statistic.size / 1024:>10.1f} KB {statistic.count:>8} blocks  {statistic.traceback}")
+
+        stats_stream = io.StringIO()
+        pstats.Stats(self.profile, stream=stats_stream).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(TOP_FUNCTIONS_COUNT)
+        report_lines += ["", f"Top {TOP_FUNCTIONS_COUNT} functions (cumulative time):", stats_stream.getvalue()]
+        return "\n".join(report_lines)
+
+    def stop(self, decode_spec: DecodeSpec, view_spec: ViewSpec, replay_argv: Optional[list] = None) -> Optional[str]:
+        # returns path of saved ".prof" file
+        self.pause()
+        execution_time: float = time.perf_counter() - self.start_time
+        memory_snapshot: tracemalloc.Snapshot = tracemalloc.take_snapshot()
+        current_memory_size, peak_memory_size = tracemalloc.get_traced_memory()
+        if self.is_tracemalloc_started:
+            tracemalloc.stop()
+            self.is_tracemalloc_started = False
+
+        try:
+            os.makedirs(self.profile_directory, exist_ok=True)
+            profile_file_stem: str = os.path.join(self.profile_directory, f"profile_{time.strftime('%Y%m%d_%H%M%S')}_{decode_spec.pixel_format}")
+            self.profile.dump_stats(profile_file_stem + ".prof")
+
+            with open(profile_file_stem + "_memory.txt", "wt", encoding="utf-8") as report_file:
+                report_file.write(self._get_allocations_report(memory_snapshot, current_memory_size, peak_memory_size))
+
+            with open(profile_file_stem + "_params.json", "wt", encoding="utf-8") as params_file:
+                json.dump({
+                    "execution_time": round(execution_time, 6),
+                    "peak_memory_size": peak_memory_size,
+                    "decode_spec": dataclasses.asdict(decode_spec),
+                    "view_spec": dataclasses.asdict(view_spec),
+                    "replay_command": "python -m src.main " + shlex.join(replay_argv) if replay_argv else None,
+                }, params_file, indent=4)
+        except Exception as error:
+            logger.error(f"Couldn't save profile! Error: {error}")
+            return None
+
+        logger.info(f"Profile saved to {profile_file_stem}.prof (time: {execution_time:.2f} s, peak memory: {peak_memory_size / (1024 * 1024):.2f} MB)")
+        return profile_file_stem + ".prof"
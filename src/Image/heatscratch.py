@@ -0,0 +1,113 @@
+"""
+Copyright © 2026  Bartłomiej Duda
+License: GPL-3.0 License
+"""
+
+import mmap
+import shutil
+import tempfile
+import time
+from typing import BinaryIO, Optional
+
+from reversebox.common.logger import get_logger
+from reversebox.image.image_decoder import ImageDecoder
+from reversebox.image.image_formats import ImageFormats
+
+from src.Image.heatdecoder import HeatDecoder
+from src.Image.heatmemory import get_size_mb
+
+logger = get_logger(__name__)
+
+# fmt: off
+
+# images with bigger decoded RGBA output are decoded out of core (to memory-mapped scratch file)
+OUT_OF_CORE_MIN_IMAGE_SIZE: int = 1024 * 1024 * 1024
+STRIPE_SIZE: int = 16 * 1024 * 1024  # decoded RGBA bytes of one stripe
+MIN_FREE_DISK_SPACE: int = 256 * 1024 * 1024  # kept free on disk with scratch files
+
+
+class HeatScratchFile:
+    """
+    Temporary file mapped to memory, used as decoded image buffer for images too big for RAM.
+    Only the pages in use take RAM, the rest is written back to disk by the OS.
+    File is anonymous (deleted right after creation), so it doesn't stay on disk after crash.
+    """
+
+    def __init__(self, file_size: int, directory_path: Optional[str] = None):
+        self.file_size: int = file_size
+        self._file: Optional[BinaryIO] = tempfile.TemporaryFile(prefix="imageheat_", suffix=".scratch", dir=directory_path)
+        self._mmap: Optional[mmap.mmap] = None
+        try:
+            self._file.truncate(file_size)  # sparse file filled with zeros
+            self._mmap = mmap.mmap(self._file.fileno(), file_size)
+        except (ValueError, OSError):
+            self.close()
+            raise
+        self._view: Optional[memoryview] = memoryview(self._mmap)
+
+    def get_view(self, start_offset: int = 0, end_offset: Optional[int] = None) -> memoryview:
+        return self._view[start_offset: end_offset]
+
+    def close(self) -> bool:
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # decoded image is still used (e.g. by preview), mapping will be released by GC
+                logger.info("Scratch file is still in use, close postponed")
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        return True
+
+
+def is_out_of_core_format(image_format: ImageFormats, image_endianess: str) -> bool:
+    # every pixel can be decoded separately, so any stripe of rows can be decoded on its own
+    return image_endianess in ("little", "big") and image_format in ImageDecoder.generic_data_formats \
+        and ImageDecoder.generic_data_formats[image_format][1] in (4, 8, 16, 24, 32, 48)
+
+
+def get_stripe_rows(img_width: int, bits_per_pixel: int) -> int:
+    stripe_rows: int = max(STRIPE_SIZE // max(img_width * 4, 1), 1)
+    if bits_per_pixel == 4 and img_width % 2 == 1:
+        stripe_rows = max(stripe_rows - stripe_rows % 2, 2)  # stripes start at whole bytes
+    return stripe_rows
+
+
+def decode_to_scratch_file(image_data: memoryview, img_width: int, img_height: int, image_format: ImageFormats,
+                           image_endianess: str = "little") -> Optional[HeatScratchFile]:
+    # output has exactly width*height pixels, missing pixels are zeros (same as in ReverseBox)
+    start_time = time.perf_counter()
+    decoded_size: int = img_width * img_height * 4
+    free_disk_space: int = shutil.disk_usage(tempfile.gettempdir()).free
+    if decoded_size + MIN_FREE_DISK_SPACE > free_disk_space:
+        logger.error(f"Not enough disk space for scratch file! Required: {get_size_mb(decoded_size):.0f} MB,"
+                     f" free: {get_size_mb(free_disk_space):.0f} MB")
+        return None
+    try:
+        scratch_file: HeatScratchFile = HeatScratchFile(decoded_size)
+    except (ValueError, OSError) as error:
+        logger.error(f"Couldn't create scratch file! Error: {error}")
+        return None
+
+    heat_decoder: HeatDecoder = HeatDecoder()
+    bits_per_pixel: int = ImageDecoder.generic_data_formats[image_format][1]
+    number_of_data_pixels: int = min(len(image_data) * 8 // bits_per_pixel, img_width * img_height)
+    stripe_pixels: int = get_stripe_rows(img_width, bits_per_pixel) * img_width
+    for first_pixel in range(0, number_of_data_pixels, stripe_pixels):
+        number_of_pixels: int = min(stripe_pixels, number_of_data_pixels - first_pixel)
+        stripe_data: memoryview = image_data[first_pixel * bits_per_pixel // 8: ((first_pixel + number_of_pixels) * bits_per_pixel + 7) // 8]
+        decoded_stripe_data: Optional[bytes] = heat_decoder.decode_image(stripe_data, number_of_pixels, 1, image_format, image_endianess)
+        if decoded_stripe_data is None:
+            logger.warning(f"Couldn't decode stripe at pixel {first_pixel}, out-of-core decode stopped")
+            scratch_file.close()
+            return None
+        scratch_file.get_view(first_pixel * 4, (first_pixel + number_of_pixels) * 4)[:] = decoded_stripe_data[:number_of_pixels * 4]
+
+    logger.info(f"Decoded {get_size_mb(decoded_size):.0f} MB image to scratch file in stripes of {stripe_pixels // img_width} rows."
+                f" Time: {time.perf_counter() - start_time:.2f} seconds.")
+    return scratch_file
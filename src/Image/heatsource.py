@@ -0,0 +1,87 @@
+"""
+Copyright © 2026  Bartłomiej Duda
+License: GPL-3.0 License
+"""
+
+import mmap
+import os
+from typing import BinaryIO, Optional
+
+from reversebox.common.logger import get_logger
+
+logger = get_logger(__name__)
+
+# fmt: off
+
+
+def get_file_identity(file_path: Optional[str]) -> tuple:
+    # path + size + modification time is enough to tell if file has changed on disk
+    if not file_path:
+        return ()
+    try:
+        file_stat = os.stat(file_path)
+    except OSError:
+        return (file_path,)
+    return file_path, file_stat.st_size, file_stat.st_mtime_ns
+
+
+class HeatFileSource:
+    """
+    Read-only view of a file on disk.
+    File is memory-mapped, so opening is cheap even for multi-GB dumps
+    and every range is handed out as a zero-copy memoryview.
+    Buffered read is used only when file can't be mapped (e.g. empty file).
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path: str = file_path
+        self.file_size: int = 0
+        self.is_memory_mapped: bool = False
+        self._file: Optional[BinaryIO] = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._buffer: Optional[bytes] = None
+        self._view: Optional[memoryview] = None
+        self.file_identity: tuple = get_file_identity(file_path)
+        self._open()
+
+    def _open(self) -> bool:
+        self._file = open(self.file_path, "rb")
+        self.file_size = os.fstat(self._file.fileno()).st_size
+
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._mmap)
+            self.is_memory_mapped = True
+        except (ValueError, OSError) as error:
+            logger.warning(f"Couldn't memory-map file, falling back to buffered read! Error: {error}")
+            self._buffer = self._file.read()
+            self._view = memoryview(self._buffer)
+            self._file.close()
+            self._file = None
+
+        return True
+
+    def get_view(self, start_offset: int = 0, end_offset: Optional[int] = None) -> memoryview:
+        # slicing a memoryview doesn't copy any data
+        return self._view[start_offset: end_offset]
+
+    def get_bytes(self, start_offset: int = 0, end_offset: Optional[int] = None) -> bytes:
+        # copy of the requested range only, for consumers that can't work on views
+        return bytes(self._view[start_offset: end_offset])
+
+    def close(self) -> bool:
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # views are still exported somewhere, mapping will be released by GC
+                logger.info("Memory-mapped file is still in use, close postponed")
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._buffer = None
+        return True
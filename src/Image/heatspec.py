@@ -0,0 +1,75 @@
+"""
+Copyright © 2026  Bartłomiej Duda
+License: GPL-3.0 License
+"""
+
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from src.Image.constants import (
+    DEFAULT_ROTATE_NAME,
+    DEFAULT_ZOOM_NAME,
+    DEFAULT_ZOOM_RESAMPLING_NAME,
+)
+
+# fmt: off
+
+
+@dataclass(frozen=True, slots=True)
+class DecodeSpec:
+    """
+    Immutable snapshot of all parameters that have impact on decoded image data.
+    Render jobs get their own spec, so GUI changes can't affect the job in progress,
+    and spec is hashable, so it can be used as (part of) a cache key.
+    """
+
+    # image parameters
+    img_file_path: Optional[str] = None
+    total_file_size: int = 0
+    pixel_format: Optional[str] = None
+    endianess_type: Optional[str] = None
+    swizzling_type: Optional[str] = None
+    compression_type: Optional[str] = None
+    img_start_offset: int = 0
+    img_end_offset: int = 0
+    img_width: Optional[int] = None
+    img_height: Optional[int] = None
+
+    # palette parameters
+    palette_format: Optional[str] = None
+    palette_loadfrom_value: Optional[int] = None
+    palette_file_path: Optional[str] = None
+    palette_offset: Optional[int] = None
+    palette_scale_value: Optional[int] = None
+    palette_endianess: Optional[str] = None
+    palette_ps2_swizzle_flag: Optional[bool] = None
+
+
+@dataclass(frozen=True, slots=True)
+class ViewSpec:
+    """
+    Immutable snapshot of post-processing parameters (no impact on decoded data).
+    """
+
+    zoom_name: str = DEFAULT_ZOOM_NAME
+    zoom_resampling_name: str = DEFAULT_ZOOM_RESAMPLING_NAME
+    vertical_flip_flag: bool = False
+    horizontal_flip_flag: bool = False
+    rotate_name: str = DEFAULT_ROTATE_NAME
+    view_channel_mode: str = "RGBA"
+
+
+@dataclass(frozen=True, slots=True)
+class PreviewSnapshot:
+    """
+    Image data shown in preview, together with the specs it was decoded with.
+    Main thread reads pixel values only from the snapshot, because render worker
+    may be reloading the image at the same time.
+    """
+
+    decode_spec: DecodeSpec
+    view_spec: ViewSpec
+    encoded_image_data: Any
+    decoded_image_data: Any
+    img_width: int  # size of decoded image (can be aligned, e.g. PS4 padding)
+    img_height: int
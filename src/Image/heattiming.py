@@ -0,0 +1,155 @@
+"""
+Copyright © 2026  Bartłomiej Duda
+License: GPL-3.0 License
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from reversebox.common.logger import get_logger
+
+logger = get_logger(__name__)
+
+# fmt: off
+
+# decode stages (swap, decompress and unswizzle stage names are shared with stage caches)
+STAGE_READ: str = "read"
+STAGE_CACHE: str = "cache"
+STAGE_PALETTE: str = "palette"
+STAGE_DECODE: str = "decode"
+
+# preview stages
+STAGE_RESIZE: str = "resize"
+STAGE_TRANSPOSE: str = "transpose"
+STAGE_CHANNEL: str = "channel"
+STAGE_COMPOSITE: str = "composite"
+STAGE_PHOTO_IMAGE: str = "photo"
+STAGE_CANVAS: str = "canvas"
+
+MAX_TIMINGS_HISTORY_SIZE: int = 100
+
+# render jobs are written to this trace file (see heattrace.py),
+# stage spans are recorded only when tracing is enabled
+TRACE_FILE_ENV_VAR: str = "IMAGEHEAT_TRACE_FILE"
+IS_TRACING_ENABLED: bool = bool(os.environ.get(TRACE_FILE_ENV_VAR))
+TRACE_ORIGIN_TIME: float = time.perf_counter()  # trace timestamps are relative to program start
+
+
+def get_data_length(data: Any) -> int:
+    return len(data) if data is not None else 0
+
+
+def get_image_data_length(pil_img: Any) -> int:
+    return pil_img.width * pil_img.height * len(pil_img.getbands()) if pil_img is not None else 0
+
+
+def _get_size_str(size: int) -> str:
+    if size >= 1024 * 1024:
+        return f"{size / (1024 * 1024):.1f}M"
+    if size >= 1024:
+        return f"{size / 1024:.0f}K"
+    return str(size)
+
+
+@dataclass
+class StageSpan:
+    stage_name: str
+    start_time: float  # time.perf_counter() values
+    end_time: float
+    thread_id: int
+    thread_name: str
+    input_size: int
+    output_size: int
+
+
+@dataclass
+class StageTiming:
+    stage_name: str
+    execution_time: float = 0.0  # seconds
+    input_size: int = 0  # bytes
+    output_size: int = 0
+    calls: int = 0
+
+
+class RenderTimings:
+    """
+    Execution time and data size of every stage of one render job.
+    Stages that run many times in one job (e.g. composite for every tile) are summed up.
+    Decode stages are added by worker thread and drawing stages by main thread, never at the same time.
+    """
+
+    def __init__(self):
+        self.stages: dict[str, StageTiming] = {}
+        self.spans: Optional[list[StageSpan]] = [] if IS_TRACING_ENABLED else None  # every stage call, for trace file
+        self.job_time: Optional[float] = None  # whole job, including waiting for threads
+
+    def add_stage(self, stage_name: str, start_time: float, input_size: int, output_size: int) -> bool:
+        # start_time is the time.perf_counter() value from the beginning of the stage
+        end_time: float = time.perf_counter()
+        stage_timing: StageTiming = self.stages.setdefault(stage_name, StageTiming(stage_name))
+        stage_timing.execution_time += end_time - start_time
+        stage_timing.input_size += input_size
+        stage_timing.output_size += output_size
+        stage_timing.calls += 1
+        if self.spans is not None:
+            current_thread: threading.Thread = threading.current_thread()
+            self.spans.append(StageSpan(stage_name, start_time, end_time, current_thread.native_id or 0, current_thread.name,
+                                        input_size, output_size))
+        return True
+
+    def get_stage_times(self) -> dict:
+        return {stage_name: stage_timing.execution_time for stage_name, stage_timing in self.stages.items()}
+
+    def get_total_time(self) -> float:
+        return sum(stage_timing.execution_time for stage_timing in self.stages.values())
+
+    def get_slowest_stage_name(self) -> Optional[str]:
+        return max(self.stages.values(), key=lambda stage_timing: stage_timing.execution_time).stage_name if self.stages else None
+
+    def get_summary_str(self) -> str:
+        return ", ".join(f"{stage_timing.stage_name}={stage_timing.execution_time * 1000:.1f}ms" for stage_timing in self.stages.values())
+
+
+class RenderTimingsHistory:
+    """
+    Rolling history of render job timings, so single slow frames can be told apart from slow stages.
+    """
+
+    def __init__(self, max_size: int = MAX_TIMINGS_HISTORY_SIZE):
+        self.timings: deque = deque(maxlen=max_size)
+
+    def add(self, render_timings: RenderTimings) -> bool:
+        self.timings.append(render_timings)
+        return True
+
+    def get_last(self) -> Optional[RenderTimings]:
+        return self.timings[-1] if self.timings else None
+
+    def get_average_stage_times(self) -> dict:
+        # average of jobs that ran the stage (e.g. decode is skipped for view-only changes)
+        stage_times: dict = {}
+        for render_timings in self.timings:
+            for stage_name, execution_time in render_timings.get_stage_times().items():
+                stage_times.setdefault(stage_name, []).append(execution_time)
+        return {stage_name: sum(execution_times) / len(execution_times) for stage_name, execution_times in stage_times.items()}
+
+    def get_hud_text(self) -> str:
+        last_timings: Optional[RenderTimings] = self.get_last()
+        if last_timings is None:
+            return "No render jobs yet"
+
+        average_stage_times: dict = self.get_average_stage_times()
+        slowest_stage_name: Optional[str] = last_timings.get_slowest_stage_name()
+        hud_lines: list = [f"{' stage':<11}{'ms':>6}{'avg':>6}{'in':>6}{'out':>6}"]
+        for stage_timing in last_timings.stages.values():
+            hud_lines.append(f"{'*' if stage_timing.stage_name == slowest_stage_name else ' '}{stage_timing.stage_name:<10}"
+                             f"{stage_timing.execution_time * 1000:>6.1f}{average_stage_times[stage_timing.stage_name] * 1000:>6.1f}"
+                             f"{_get_size_str(stage_timing.input_size):>6}{_get_size_str(stage_timing.output_size):>6}")
+        hud_lines.append(f"{' stages':<11}{last_timings.get_total_time() * 1000:>6.1f}")
+        if last_timings.job_time is not None:
+            hud_lines.append(f"{' job':<11}{last_timings.job_time * 1000:>6.1f}  ({len(self.timings)} jobs)")
+        return "\n".join(hud_lines)
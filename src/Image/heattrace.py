@@ -0,0 +1,160 @@
+"""
+Copyright © 2026  Bartłomiej Duda
+License: GPL-3.0 License
+"""
+
+import atexit
+import dataclasses
+import json
+import multiprocessing
+import os
+import threading
+import time
+from typing import Optional
+
+from reversebox.common.logger import get_logger
+
+from src.Image.heatspec import DecodeSpec
+from src.Image.heattiming import (
+    IS_TRACING_ENABLED,
+    TRACE_FILE_ENV_VAR,
+    TRACE_ORIGIN_TIME,
+    RenderTimings,
+)
+
+logger = get_logger(__name__)
+
+# fmt: off
+
+# ".jsonl" trace file gets one JSON object per render job,
+# any other extension gets Chrome Trace Event Format (chrome://tracing, ui.perfetto.dev)
+JSON_LINES_EXTENSIONS: tuple = (".jsonl", ".ndjson")
+
+
+class HeatTracer:
+    """
+    Writes render jobs with all their stage spans to a trace file.
+    Every job is written and flushed as soon as it's finished, so long sessions can be traced
+    and the file is usable even when the program doesn't exit cleanly
+    (closing "]" is optional in Chrome trace JSON array format).
+    """
+
+    def __init__(self, trace_file_path: str):
+        self.trace_file_path: str = trace_file_path
+        self.is_json_lines: bool = os.path.splitext(trace_file_path)[1].lower() in JSON_LINES_EXTENSIONS
+        self.trace_file = open(trace_file_path, "wt", encoding="utf-8")
+        self.lock: threading.Lock = threading.Lock()  # jobs are finished by main thread and by workers
+        self.process_id: int = os.getpid()
+        self.job_number: int = 0
+        self.thread_ids: set = set()
+        self.is_first_event: bool = True
+        if not self.is_json_lines:
+            self.trace_file.write("[\n")
+            self._write_event({"name": "process_name", "ph": "M", "pid": self.process_id, "tid": 0, "args": {"name": "ImageHeat"}})
+        logger.info(f"Tracing render jobs to {trace_file_path}")
+
+    def _get_timestamp(self, perf_counter_value: float) -> float:
+        # microseconds from program start
+        return round((perf_counter_value - TRACE_ORIGIN_TIME) * 1_000_000, 3)
+
+    def _write_event(self, trace_event: dict) -> None:
+        self.trace_file.write(("" if self.is_first_event else ",\n") + json.dumps(trace_event))
+        self.is_first_event = False
+
+    def _write_thread_name(self, thread_id: int, thread_name: str) -> None:
+        if thread_id not in self.thread_ids:
+            self.thread_ids.add(thread_id)
+            self._write_event({"name": "thread_name", "ph": "M", "pid": self.process_id, "tid": thread_id, "args": {"name": thread_name}})
+
+    def write_job(self, job_name: str, render_timings: RenderTimings, decode_spec: Optional[DecodeSpec] = None) -> bool:
+        end_time: float = time.perf_counter()
+        spans: list = render_timings.spans or []
+        if render_timings.job_time is not None:
+            start_time: float = end_time - render_timings.job_time
+        else:
+            start_time = min((span.start_time for span in spans), default=end_time)
+        decode_params: dict = dataclasses.asdict(decode_spec) if decode_spec is not None else {}
+        current_thread: threading.Thread = threading.current_thread()
+
+        with self.lock:
+            self.job_number += 1
+            if self.is_json_lines:
+                self.trace_file.write(json.dumps({
+                    "job": self.job_number,
+                    "name": job_name,
+                    "pid": self.process_id,
+                    "tid": current_thread.native_id,
+                    "start_us": self._get_timestamp(start_time),
+                    "duration_us": round((end_time - start_time) * 1_000_000, 3),
+                    "decode_params": decode_params,
+                    "stages": [{
+                        "name": span.stage_name,
+                        "tid": span.thread_id,
+                        "thread_name": span.thread_name,
+                        "start_us": self._get_timestamp(span.start_time),
+                        "duration_us": round((span.end_time - span.start_time) * 1_000_000, 3),
+                        "input_size": span.input_size,
+                        "output_size": span.output_size,
+                    } for span in spans],
+                }) + "\n")
+            else:
+                self._write_thread_name(current_thread.native_id, current_thread.name)
+                self._write_event({
+                    "name": f"{job_name} #{self.job_number}", "cat": "job", "ph": "X", "pid": self.process_id, "tid": current_thread.native_id,
+                    "ts": self._get_timestamp(start_time), "dur": round((end_time - start_time) * 1_000_000, 3), "args": decode_params,
+                })
+                for span in spans:
+                    self._write_thread_name(span.thread_id, span.thread_name)
+                    self._write_event({
+                        "name": span.stage_name, "cat": job_name, "ph": "X", "pid": self.process_id, "tid": span.thread_id,
+                        "ts": self._get_timestamp(span.start_time), "dur": round((span.end_time - span.start_time) * 1_000_000, 3),
+                        "args": {"job": self.job_number, "input_size": span.input_size, "output_size": span.output_size},
+                    })
+            self.trace_file.flush()
+        return True
+
+    def close(self) -> bool:
+        with self.lock:
+            if self.trace_file.closed:
+                return False
+            if not self.is_json_lines:
+                self.trace_file.write("\n]\n")
+            self.trace_file.close()
+        return True
+
+
+_tracer: Optional[HeatTracer] = None
+_tracer_lock: threading.Lock = threading.Lock()
+_is_tracer_failed: bool = False  # trace file is not reopened for every job
+
+
+def get_trace_file_path() -> str:
+    # worker processes (e.g. batch conversion) write to their own files
+    trace_file_path: str = os.environ[TRACE_FILE_ENV_VAR]
+    if multiprocessing.parent_process() is not None:
+        trace_file_stem, trace_file_extension = os.path.splitext(trace_file_path)
+        trace_file_path = f"{trace_file_stem}.{os.getpid()}{trace_file_extension}"
+    return trace_file_path
+
+
+def get_tracer() -> Optional[HeatTracer]:
+    # tracer is created on first finished job, only when tracing is enabled
+    global _tracer, _is_tracer_failed
+    if not IS_TRACING_ENABLED:
+        return None
+    with _tracer_lock:
+        if _tracer is None and not _is_tracer_failed:
+            try:
+                _tracer = HeatTracer(get_trace_file_path())
+                atexit.register(_tracer.close)
+            except Exception as error:
+                logger.error(f"Couldn't open trace file! Error: {error}")
+                _is_tracer_failed = True
+    return _tracer
+
+
+def trace_render_job(job_name: str, render_timings: RenderTimings, decode_spec: Optional[DecodeSpec] = None) -> bool:
+    if not IS_TRACING_ENABLED:
+        return False
+    tracer: Optional[HeatTracer] = get_tracer()
+    return tracer.write_job(job_name, render_timings, decode_spec) if tracer is not None else False
@@ -0,0 +1,381 @@
+"""
+Copyright © 2026  Bartłomiej Duda
+License: GPL-3.0 License
+"""
+
+import math
+from typing import Callable, Optional
+
+import numpy as np
+from reversebox.common.logger import get_logger
+from reversebox.image.common import (
+    convert_bpp_to_bytes_per_pixel,
+    get_block_data_size,
+    get_storage_wh,
+    get_stride_value_psp,
+)
+from reversebox.image.image_formats import ImageFormats
+
+from src.Image.constants import DEFAULT_UNSWIZZLE_MAP_CACHE_SIZE_MB
+from src.Image.heatcache import HeatCache
+
+logger = get_logger(__name__)
+
+# fmt: off
+
+# Vectorized unswizzling
+# Every supported ReverseBox unswizzle function is a fixed list of copy operations
+# "output[dst:dst+size] = input[src:src+size]". Here those lists are generated with NumPy,
+# merged into a single index map (one entry per copied unit) and applied as one gather.
+# Maps depend only on swizzle parameters and input length, so they are cached.
+# If any copy would go out of bounds (ReverseBox would then resize the output or raise an error),
+# map is not created and caller has to use the original ReverseBox function.
+
+
+class CopyStep:
+    """
+    List of copy operations, all of them with the same size.
+    First step reads from the input data, each next step reads from the output of the previous one.
+    """
+
+    def __init__(self, dst_offsets: np.ndarray, src_offsets: np.ndarray, copy_size: int, output_size: int):
+        self.dst_offsets: np.ndarray = np.asarray(dst_offsets, dtype=np.int64).ravel()
+        self.src_offsets: np.ndarray = np.asarray(src_offsets, dtype=np.int64).ravel()
+        self.copy_size: int = copy_size
+        self.output_size: int = output_size
+
+
+def _morton_index(t: np.ndarray, input_width: int, input_height: int) -> np.ndarray:
+    # vectorized version of reversebox.image.swizzling.morton_index.calculate_morton_index
+    num1 = num2 = 1
+    num3 = np.zeros_like(t)
+    num4 = np.zeros_like(t)
+    img_width, img_height = input_width, input_height
+    while img_width > 1 or img_height > 1:
+        if img_width > 1:
+            num3 += num2 * (t & 1)
+            t = t >> 1
+            num2 *= 2
+            img_width >>= 1
+        if img_height > 1:
+            num4 += num1 * (t & 1)
+            t = t >> 1
+            num1 *= 2
+            img_height >>= 1
+    return num4 * input_width + num3
+
+
+def _morton_index_psvita_dreamcast(p: np.ndarray, width: int, height: int) -> np.ndarray:
+    # vectorized version of calculate_morton_index_psvita_dreamcast
+    ddx, ddy = 1, width
+    q = np.zeros_like(p)
+    for _ in range(16):
+        height >>= 1
+        if height:
+            q |= (p & 1) * ddy
+            p = p >> 1
+        ddy <<= 1
+        if width >> 1:
+            q |= (p & 1) * ddx
+            p = p >> 1
+        ddx <<= 1
+    return q
+
+
+def _get_morton_block_data_size(bpp: int, block_width: int, block_height: int) -> int:
+    if bpp == 1:
+        return (block_width * block_height) // 8
+    elif bpp == 2:
+        return (block_width * block_height) // 4
+    elif bpp == 4:
+        return (block_width * block_height) // 2
+    return convert_bpp_to_bytes_per_pixel(bpp) * block_width * block_height
+
+
+def _plan_psp(data_size: int, img_width: int, img_height: int, bpp: int) -> list:
+    stride: int = get_stride_value_psp(img_width, bpp)
+    y = np.arange(img_height, dtype=np.int64)[:, None]
+    x = np.arange(0, stride, 16, dtype=np.int64)[None, :]  # 16-byte rows inside 16x8 blocks
+    src = ((x // 16) + (y // 8) * (stride // 16)) * 128 + (y % 8) * 16
+    dst = y * stride + x
+    return [CopyStep(dst, src, 16, data_size)]
+
+
+def _plan_morton(data_size: int, img_width: int, img_height: int, bpp: int, block_width: int, block_height: int) -> list:
+    block_data_size: int = _get_morton_block_data_size(bpp, block_width, block_height)
+    width, height = img_width // block_width, img_height // block_height
+    t = np.arange(width * height, dtype=np.int64)
+    return [CopyStep(block_data_size * _morton_index(t, width, height), block_data_size * t, block_data_size, data_size)]
+
+
+def _plan_psvita_dreamcast(data_size: int, img_width: int, img_height: int, bpp: int, block_width: int, block_height: int) -> list:
+    block_data_size: int = _get_morton_block_data_size(bpp, block_width, block_height)
+    width, height = img_width // block_width, img_height // block_height
+    t = np.arange(width * height, dtype=np.int64)
+    return [CopyStep(block_data_size * _morton_index_psvita_dreamcast(t, width, height), block_data_size * t, block_data_size, data_size)]
+
+
+def _plan_ps4(data_size: int, img_width: int, img_height: int, block_data_size: int) -> list:
+    width, height = img_width // 4, img_height // 4
+    morton = _morton_index(np.arange(64, dtype=np.int64), 8, 8)
+    y = np.arange((height + 7) // 8, dtype=np.int64)[:, None, None]
+    x = np.arange((width + 7) // 8, dtype=np.int64)[None, :, None]
+    local_x = x * 8 + morton % 8
+    local_y = y * 8 + morton // 8
+    valid = (local_x < width) & (local_y < height)
+    dst = block_data_size * (local_y * width + local_x)
+    dst = np.broadcast_to(dst, valid.shape)[valid]
+    return [CopyStep(dst, block_data_size * np.arange(dst.size, dtype=np.int64), block_data_size, data_size)]
+
+
+def _plan_ps5(data_size: int, img_width: int, img_height: int, block_data_size: int) -> list:
+    width, height = img_width // 4, img_height // 4
+    block_value: int = 4 if block_data_size == 4 else 2 if block_data_size == 8 else 1
+    morton = _morton_index(np.arange(256 // block_value, dtype=np.int64), 16, 16 // block_value)
+    y = np.arange((height + 63) // 64, dtype=np.int64)[:, None, None, None, None]
+    x = np.arange((width + 63) // 64, dtype=np.int64)[None, :, None, None, None]
+    data_x = (morton // 16)[None, None, :, None, None]
+    data_y = (morton % 16)[None, None, :, None, None]
+    i = np.arange(16, dtype=np.int64)[None, None, None, :, None]
+    j = np.arange(block_value, dtype=np.int64)[None, None, None, None, :]
+    local_x = x * 64 + (data_x * 4 + i // 4) * block_value + j
+    local_y = y * 64 + data_y * 4 + i % 4
+    valid = (local_x < width) & (local_y < height)
+    dst = block_data_size * (local_y * width + local_x)
+    dst = np.broadcast_to(dst, valid.shape)[valid]
+    return [CopyStep(dst, block_data_size * np.arange(dst.size, dtype=np.int64), block_data_size, data_size)]
+
+
+def _plan_switch(data_size: int, img_width: int, img_height: int, bytes_per_block: int, block_height: int,
+                 width_pad: int = 8, height_pad: int = 8) -> list:
+    width_show, height_show = img_width, img_height
+    if img_width % width_pad or img_height % height_pad:
+        img_width = ((img_width + width_pad - 1) // width_pad) * width_pad
+        img_height = ((img_height + height_pad - 1) // height_pad) * height_pad
+    image_width_in_gobs: int = img_width * bytes_per_block // 64
+
+    y = np.arange(img_height, dtype=np.int64)[:, None]
+    x = np.arange(img_width, dtype=np.int64)[None, :]
+    gob_address = (y // (8 * block_height)) * 512 * block_height * image_width_in_gobs \
+        + (x * bytes_per_block // 64) * 512 * block_height + (y % (8 * block_height) // 8) * 512
+    x_bytes = x * bytes_per_block
+    src = gob_address + ((x_bytes % 64) // 32) * 256 + ((y % 8) // 2) * 64 + ((x_bytes % 32) // 16) * 32 + (y % 2) * 16 + (x_bytes % 16)
+    dst = (y * img_width + x) * bytes_per_block
+    copy_steps: list = [CopyStep(dst, src, bytes_per_block, data_size)]
+
+    # crop logic
+    if width_show != img_width or height_show != img_height:
+        rows = np.arange(height_show, dtype=np.int64)
+        copy_steps.append(CopyStep(rows * width_show * bytes_per_block, rows * img_width * bytes_per_block,
+                                   width_show * bytes_per_block, width_show * height_show * bytes_per_block))
+    return copy_steps
+
+
+def _plan_3ds(img_width: int, img_height: int, bpp: int) -> list:
+    strip_size: int = bpp * 2 // 8
+    y = np.arange(0, img_height, 8, dtype=np.int64).reshape(-1, 1, 1, 1, 1, 1, 1)
+    x = np.arange(0, img_width, 8, dtype=np.int64).reshape(1, -1, 1, 1, 1, 1, 1)
+    y1 = np.arange(0, 8, 4, dtype=np.int64).reshape(1, 1, -1, 1, 1, 1, 1)
+    x1 = np.arange(0, 8, 4, dtype=np.int64).reshape(1, 1, 1, -1, 1, 1, 1)
+    y2 = np.arange(0, 4, 2, dtype=np.int64).reshape(1, 1, 1, 1, -1, 1, 1)
+    x2 = np.arange(0, 4, 2, dtype=np.int64).reshape(1, 1, 1, 1, 1, -1, 1)
+    y3 = np.arange(2, dtype=np.int64).reshape(1, 1, 1, 1, 1, 1, -1)
+    dst = ((((y + y1 + y2 + y3) * img_width) + x + x1 + x2) * bpp // 8).ravel()
+    return [CopyStep(dst, strip_size * np.arange(dst.size, dtype=np.int64), strip_size, img_width * img_height * bpp // 8)]
+
+
+def _plan_bc(img_width: int, img_height: int, block_width: int, block_height: int, bpp: int) -> list:
+    strip_size: int = bpp * block_width // 8
+    storage_width, storage_height = get_storage_wh(img_width, img_height, block_width, block_height)
+    y = np.arange(0, storage_height, block_height, dtype=np.int64)[:, None, None]
+    x = np.arange(0, storage_width, block_width, dtype=np.int64)[None, :, None]
+    y2 = np.arange(block_height, dtype=np.int64)[None, None, :]
+    dst = ((((y + y2) * storage_width) + x) * bpp // 8).ravel()
+    copy_steps: list = [CopyStep(dst, strip_size * np.arange(dst.size, dtype=np.int64), strip_size, storage_width * storage_height * bpp // 8)]
+
+    # crop logic (see reversebox.image.common.crop_image)
+    if storage_width != img_width or storage_height != img_height:
+        rows = np.arange(min(storage_height, img_height), dtype=np.int64)
+        copy_steps.append(CopyStep(rows * img_width * bpp // 8, rows * storage_width * bpp // 8,
+                                   min(storage_width, img_width) * bpp // 8, img_width * img_height * bpp // 8))
+    return copy_steps
+
+
+def _plan_gamecube(data_size: int, img_width: int, img_height: int, bpp: int) -> list:
+    y = np.arange(img_height, dtype=np.int64)[:, None]
+    x = np.arange(img_width, dtype=np.int64)[None, :]
+    if bpp == 32:
+        offset = ((y >> 2) * ((3 + img_width) >> 2) + (x >> 2) << 6) + (((y & 3) << 3) + ((x & 3) << 1))
+    elif bpp in (15, 16):
+        offset = ((y >> 2) * ((3 + img_width) >> 2) + (x >> 2) << 5) + (((y & 3) << 3) + ((x & 3) << 1))
+    elif bpp == 8:
+        offset = ((y >> 2) * ((7 + img_width) >> 3) + (x >> 3) << 5) + (((y & 3) << 3) + (x & 7))
+    elif bpp == 4:
+        offset = ((y >> 3) * ((7 + img_width) >> 3) + (x >> 3) << 5) + (((y & 7) << 2) + ((x & 7) >> 1))
+    else:
+        raise Exception("Bpp not supported!")
+
+    if bpp == 4:
+        # same output byte is written for every pair of pixels, last write wins
+        return [CopyStep(y * (img_width // 2) + x // 2, offset, 1, data_size)]
+    elif bpp == 32:
+        # AR and GB parts of the pixel are stored 32 bytes apart
+        dst = 4 * (y * img_width + x)
+        return [CopyStep(np.stack((dst, dst + 2), axis=-1), np.stack((offset, offset + 32), axis=-1), 2, data_size)]
+
+    bytes_per_pixel: int = convert_bpp_to_bytes_per_pixel(bpp)
+    return [CopyStep(bytes_per_pixel * (y * img_width + x), offset, bytes_per_pixel, data_size)]
+
+
+def _plan_x360(data_size: int, img_width: int, img_height: int, block_pixel_size: int, texel_byte_pitch: int) -> list:
+    width_in_blocks: int = img_width // block_pixel_size
+    height_in_blocks: int = img_height // block_pixel_size
+    padded_width_in_blocks: int = (width_in_blocks + 31) & ~31
+    padded_height_in_blocks: int = (height_in_blocks + 31) & ~31
+    output_size: int = width_in_blocks * height_in_blocks * texel_byte_pitch
+    if padded_width_in_blocks == 0 or padded_height_in_blocks == 0:
+        return [CopyStep(np.empty(0), np.empty(0), texel_byte_pitch, output_size)]
+
+    block_offset = np.arange(padded_width_in_blocks * padded_height_in_blocks, dtype=np.int64)
+    log_bpp: int = (texel_byte_pitch >> 2) + ((texel_byte_pitch >> 1) >> (texel_byte_pitch >> 2))
+    offset_byte = block_offset << log_bpp
+    offset_tile = ((offset_byte & ~0xFFF) >> 3) + ((offset_byte & 0x700) >> 2) + (offset_byte & 0x3F)
+    offset_macro = offset_tile >> (7 + log_bpp)
+
+    # _xg_address_2d_tiled_x
+    macro_x = (offset_macro % (padded_width_in_blocks >> 5)) << 2
+    tile_x = (((offset_tile >> (5 + log_bpp)) & 2) + (offset_byte >> 6)) & 3
+    micro_x = ((((offset_tile >> 1) & ~0xF) + (offset_tile & 0xF)) & ((texel_byte_pitch << 3) - 1)) >> log_bpp
+    x = ((macro_x + tile_x) << 3) + micro_x
+
+    # _xg_address_2d_tiled_y
+    macro_y = (offset_macro // (padded_width_in_blocks >> 5)) << 2
+    tile_y = ((offset_tile >> (6 + log_bpp)) & 1) + ((offset_byte & 0x800) >> 10)
+    micro_y = (((offset_tile & ((texel_byte_pitch << 6) - 1 & ~0x1F)) + ((offset_tile & 0xF) << 1)) >> (3 + log_bpp)) & ~1
+    y = ((macro_y + tile_y) << 3) + micro_y + ((offset_tile & 0x10) >> 4)
+
+    src = block_offset * texel_byte_pitch
+    valid = (x < width_in_blocks) & (y < height_in_blocks) & (src + texel_byte_pitch <= data_size)
+    dst = (y * width_in_blocks + x) * texel_byte_pitch
+    return [CopyStep(dst[valid], src[valid], texel_byte_pitch, output_size)]
+
+
+def _assign_last_write_wins(target: np.ndarray, indexes: np.ndarray, values: np.ndarray) -> None:
+    # NumPy doesn't guarantee order of writes for duplicated indexes,
+    # so only the last write for each index is kept (same as in sequential loop)
+    if indexes.size == 0:
+        return
+    unique_indexes, first_positions = np.unique(indexes[::-1], return_index=True)
+    target[unique_indexes] = values[::-1][first_positions]
+
+
+def build_unswizzle_map(copy_steps: list, input_size: int) -> Optional[tuple]:
+    """
+    Merges copy steps into a single map.
+    Returns (unit_map, unit_size) where unit_map[i] is the input offset of output unit "i" (or -1 for zero-filled unit),
+    or None if any copy is out of bounds.
+    """
+    unit_size: int = 0
+    previous_size: int = input_size
+    for step_number, copy_step in enumerate(copy_steps):
+        unit_size = math.gcd(unit_size, copy_step.output_size)
+        if copy_step.copy_size == 0 or copy_step.dst_offsets.size == 0:
+            previous_size = copy_step.output_size
+            continue
+        if copy_step.dst_offsets.min() < 0 or copy_step.src_offsets.min() < 0 \
+                or copy_step.dst_offsets.max() + copy_step.copy_size > copy_step.output_size \
+                or copy_step.src_offsets.max() + copy_step.copy_size > previous_size:
+            return None
+        unit_size = math.gcd(unit_size, copy_step.copy_size, int(np.gcd.reduce(copy_step.dst_offsets)))
+        if step_number > 0:
+            unit_size = math.gcd(unit_size, int(np.gcd.reduce(copy_step.src_offsets)))
+        previous_size = copy_step.output_size
+
+    unit_size = max(unit_size, 1)
+    unit_map: Optional[np.ndarray] = None
+    for step_number, copy_step in enumerate(copy_steps):
+        step_map = np.full(copy_step.output_size // unit_size, -1, dtype=np.int64)
+        if copy_step.copy_size > 0 and copy_step.dst_offsets.size > 0:
+            # every copy is split into units
+            unit_offsets = np.arange(0, copy_step.copy_size, unit_size, dtype=np.int64)
+            dst_units = ((copy_step.dst_offsets[:, None] + unit_offsets) // unit_size).ravel()
+            src_offsets = (copy_step.src_offsets[:, None] + unit_offsets).ravel()
+            if step_number == 0:
+                _assign_last_write_wins(step_map, dst_units, src_offsets)
+            else:
+                _assign_last_write_wins(step_map, dst_units, unit_map[src_offsets // unit_size])
+        unit_map = step_map
+
+    if input_size < 2 ** 31:
+        unit_map = unit_map.astype(np.int32)
+    return unit_map, unit_size
+
+
+def apply_unswizzle_map(image_data: bytes, unit_map: np.ndarray, unit_size: int) -> bytes:
+    source = np.frombuffer(image_data, dtype=np.uint8)
+    source_units = np.lib.stride_tricks.sliding_window_view(source, unit_size) if source.size >= unit_size else source[:0].reshape(0, unit_size)
+    if unit_map.size > 0 and unit_map.min() < 0:
+        output = np.zeros((unit_map.size, unit_size), dtype=np.uint8)
+        valid_units = unit_map >= 0
+        output[valid_units] = source_units[unit_map[valid_units]]
+    else:
+        output = source_units[unit_map]
+    return output.tobytes()
+
+
+class HeatUnswizzler:
+    """
+    Fast path for unswizzling. Returns None for not supported swizzling types
+    (e.g. PS2, WII U) and for data that doesn't fit the swizzle parameters,
+    so ReverseBox function can be used instead.
+    """
+
+    def __init__(self, map_cache: Optional[HeatCache] = None):
+        self.map_cache: HeatCache = map_cache if map_cache is not None else HeatCache("unswizzle_map_cache", DEFAULT_UNSWIZZLE_MAP_CACHE_SIZE_MB * 1024 * 1024)
+
+    def _get_copy_steps(self, swizzling_id: str, data_size: int, img_width: int, img_height: int, bpp: int, image_format: ImageFormats) -> Optional[list]:
+        plan_functions: dict[str, Callable[[], list]] = {
+            "psp": lambda: _plan_psp(data_size, img_width, img_height, bpp),
+            "morton": lambda: _plan_morton(data_size, img_width, img_height, bpp, 1, 1),
+            "morton_4x4": lambda: _plan_morton(data_size, img_width, img_height, bpp, 4, 4),
+            "morton_8x8": lambda: _plan_morton(data_size, img_width, img_height, bpp, 8, 8),
+            "dreamcast_psvita": lambda: _plan_psvita_dreamcast(data_size, img_width, img_height, bpp, 1, 1),
+            "dreamcast_psvita_4x4": lambda: _plan_psvita_dreamcast(data_size, img_width, img_height, bpp, 4, 4),
+            "dreamcast_psvita_8x8": lambda: _plan_psvita_dreamcast(data_size, img_width, img_height, bpp, 8, 8),
+            "ps4": lambda: _plan_ps4(data_size, img_width, img_height, get_block_data_size(image_format)),
+            "ps4_padding": lambda: _plan_ps4(data_size, img_width, img_height, get_block_data_size(image_format)),
+            "ps5": lambda: _plan_ps5(data_size, img_width, img_height, get_block_data_size(image_format)),
+            "nintendo_switch_4_4": lambda: _plan_switch(data_size, img_width, img_height, 4, 4),
+            "nintendo_switch_4_8": lambda: _plan_switch(data_size, img_width, img_height, 4, 8),
+            "nintendo_switch_1_16": lambda: _plan_switch(data_size, img_width, img_height, 1, 16),
+            "nintendo_switch_2_16": lambda: _plan_switch(data_size, img_width, img_height, 2, 16),
+            "nintendo_switch_4_16": lambda: _plan_switch(data_size, img_width, img_height, 4, 16),
+            "gamecube_wii": lambda: _plan_gamecube(data_size, img_width, img_height, bpp),
+            "x360_1_1": lambda: _plan_x360(data_size, img_width, img_height, 1, 1),
+            "x360_1_2": lambda: _plan_x360(data_size, img_width, img_height, 1, 2),
+            "x360_1_4": lambda: _plan_x360(data_size, img_width, img_height, 1, 4),
+            "x360_4_8": lambda: _plan_x360(data_size, img_width, img_height, 4, 8),
+            "x360_4_16": lambda: _plan_x360(data_size, img_width, img_height, 4, 16),
+            "bc": lambda: _plan_bc(img_width, img_height, 8, 8, bpp),
+            "3ds": lambda: _plan_3ds(img_width, img_height, bpp),
+        }
+        plan_function = plan_functions.get(swizzling_id)
+        return plan_function() if plan_function else None
+
+    def unswizzle(self, swizzling_id: str, image_data: bytes, img_width: int, img_height: int, bpp: int, image_format: ImageFormats) -> Optional[bytes]:
+        block_data_size: int = get_block_data_size(image_format) if swizzling_id in ("ps4", "ps4_padding", "ps5") else 0
+        map_key: tuple = (swizzling_id, img_width, img_height, bpp, block_data_size, len(image_data))
+        unswizzle_map = self.map_cache.get(map_key)
+        if unswizzle_map is None:
+            try:
+                copy_steps: Optional[list] = self._get_copy_steps(swizzling_id, len(image_data), img_width, img_height, bpp, image_format)
+                unswizzle_map = build_unswizzle_map(copy_steps, len(image_data)) if copy_steps is not None else None
+            except Exception as error:
+                logger.info(f"Couldn't build unswizzle map for swizzling_id={swizzling_id}. Error: {error}")
+                unswizzle_map = None
+            # "False" is cached too, so not supported parameters are not checked again
+            self.map_cache.put(map_key, unswizzle_map if unswizzle_map is not None else False)
+
+        if not unswizzle_map:
+            return None
+        return apply_unswizzle_map(image_data, *unswizzle_map)
@@ -9,12 +9,8 @@ import os
 import sys
 from typing import Final
 
-import center_tk_window
 from reversebox.common.logger import get_logger
 
-from src.GUI.gui_main import ImageHeatGUI
-from src.GUI.gui_root import ImageHeatRoot
-
 logger = get_logger("main")
 
 if getattr(sys, "frozen", False):
@@ -33,11 +29,23 @@ VERSION_NUM: Final[str] = "v0.45.0"
 def main():
     """
     Main function of this program.
-    It will run ImageHeat in GUI mode.
+    It will run ImageHeat in GUI mode
+    or in command-line mode if command is given (e.g. "python -m src.main decode --help").
     """
 
     logger.info("Starting main...")
 
+    if len(sys.argv) > 1:
+        # GUI modules (tkinter etc.) are not imported in command-line mode
+        from src.CLI.cli_main import run_cli
+
+        sys.exit(run_cli(sys.argv[1:], MAIN_DIRECTORY))
+
+    import center_tk_window
+
+    from src.GUI.gui_main import ImageHeatGUI
+    from src.GUI.gui_root import ImageHeatRoot
+
     root: ImageHeatRoot = ImageHeatRoot(className="ImageHeat")
     ImageHeatGUI(root, VERSION_NUM + (" " + NIGHTLY_STR if len(NIGHTLY_STR) > 0 else ""), MAIN_DIRECTORY)  # start GUI
     root.lift()
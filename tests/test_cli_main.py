@@ -0,0 +1,345 @@
+"""
+Copyright © 2026  Bartłomiej Duda
+License: GPL-3.0 License
+"""
+
+import dataclasses
+import json
+import multiprocessing
+import os
+import random
+import time
+
+import pytest
+from PIL import Image
+
+from src.CLI import cli_batch as cli_batch_module
+from src.CLI.cli_batch import convert_manifest_row, run_batch
+from src.CLI.cli_main import (
+    get_argument_parser,
+    get_argv_from_specs,
+    get_specs_from_args,
+    run_cli,
+)
+from src.Image import heatimage, heatscratch
+from src.Image.heatcache import HeatCache
+from src.Image.heatexport import get_export_image
+from src.Image.heatimage import HeatImage
+from src.Image.heatmemory import (
+    MEMORY_CACHES,
+    MEMORY_INDEX,
+    HeatMemoryBudget,
+    get_decode_memory_estimate,
+)
+from src.Image.heatpalette import HeatPalette
+from src.Image.heatprofile import PROFILE_DIRECTORY_NAME
+from src.Image.heatspec import DecodeSpec, ViewSpec
+from src.Image.heattiming import STAGE_CACHE, STAGE_DECODE, STAGE_READ, RenderTimings
+from src.Image.heattrace import HeatTracer
+
+# fmt: off
+
+
+def _write_test_file(file_path, data_size: int) -> None:
+    random.seed(data_size)
+    file_path.write_bytes(bytes(random.getrandbits(8) for _ in range(data_size)))
+
+
+def test_get_specs_from_args(tmp_path):
+    input_file_path = tmp_path / "in.bin"
+    _write_test_file(input_file_path, 4096)
+    args = get_argument_parser().parse_args(["decode", "--format", "RGBA8888", "--swizzle", "ps4", "--width", "16", "--height", "8",
+                                             "--offset", "0x100", "--endianess", "big", str(input_file_path), "out.png"])
+    decode_spec, view_spec = get_specs_from_args(args, args.input_file_path)
+
+    assert decode_spec.img_start_offset == 0x100
+    assert decode_spec.img_end_offset == 4096  # swizzled data is read to the end of file
+    assert decode_spec.swizzling_type == "PS4 (Morton)"
+    assert decode_spec.endianess_type == "Big Endian"
+    assert decode_spec.palette_loadfrom_value == 1
+
+    # specs are immutable and hashable (used as cache keys)
+    with pytest.raises(AttributeError):
+        decode_spec.img_width = 32
+    assert hash(decode_spec) == hash(get_specs_from_args(args, args.input_file_path)[0])
+
+
+def test_run_cli_decode(tmp_path):
+    input_file_path = tmp_path / "in.bin"
+    output_file_path = tmp_path / "out.png"
+    _write_test_file(input_file_path, 4096)
+    argv: list = ["decode", "--format", "RGB565", "--width", "32", "--height", "16", "--offset", "64", str(input_file_path), str(output_file_path)]
+
+    assert run_cli(argv) == 0
+    args = get_argument_parser().parse_args(argv)
+    heat_image = HeatImage(get_specs_from_args(args, args.input_file_path)[0])
+    heat_image.image_reload()
+    with Image.open(output_file_path) as output_image:
+        assert output_image.size == (32, 16)
+        assert output_image.tobytes() == heat_image.decoded_image_data[:32 * 16 * 4]
+    heat_image.image_close()
+
+
+def test_run_cli_missing_file(tmp_path):
+    assert run_cli(["decode", "--width", "4", "--height", "4", str(tmp_path / "missing.bin"), str(tmp_path / "out.png")]) == 1
+
+
+@pytest.mark.parametrize("output_file_name", ["out.tif", "out.TGA"])
+def test_run_cli_output_extension(tmp_path, capsys, output_file_name: str):
+    _write_test_file(tmp_path / "in.bin", 4096)
+    argv: list = ["decode", "--width", "4", "--height", "4", str(tmp_path / "in.bin")]
+    assert run_cli(argv + [str(tmp_path / output_file_name)]) == 0  # Pillow format name differs from extension (TIFF)
+    with Image.open(tmp_path / output_file_name) as output_image:
+        assert output_image.size == (4, 4)
+
+    # unknown extension is rejected before decode
+    with pytest.raises(SystemExit) as exit_info:
+        run_cli(argv + [str(tmp_path / "out.xyz")])
+    assert exit_info.value.code == 2
+    assert "not supported output file extension \".xyz\"" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("number_of_workers", [1, 2])
+def test_run_batch(tmp_path, number_of_workers: int):
+    _write_test_file(tmp_path / "in.bin", 4096)
+    (tmp_path / "manifest.csv").write_text("file,output,format,width,height,offset,vertical_flip\n"
+                                           "in.bin,first.png,RGB565,16,16,0,\n"
+                                           "in.bin,second.bmp,RGBA8888,8,8,0x200,true\n"
+                                           "in.bin,,RGB888,4,4,0x10,\n"
+                                           "in.bin,bad.png,NOT_A_FORMAT,4,4,0,\n"
+                                           "in.bin,bad.xyz,RGB565,4,4,0,\n"
+                                           "missing.bin,missing.png,RGB565,4,4,0,\n"
+                                           "in.bin,,RGB565,4,4,0x10,\n"
+                                           "in.bin,,RGB565,4,4,0x10,\n")
+
+    assert run_batch(str(tmp_path / "manifest.csv"), str(tmp_path / "out"), number_of_workers) == 1  # failed rows don't stop the batch
+    # default output names of duplicate rows are the same, so the second one fails
+    expected_output_file_names: list = ["first.png", "in_00000010_RGB565.png", "in_00000010_RGB888.png", "second.bmp"]
+    assert sorted(output_path.name for output_path in (tmp_path / "out").iterdir()) == expected_output_file_names
+    with Image.open(tmp_path / "out" / "second.bmp") as output_image:
+        assert output_image.size == (8, 8)
+
+
+def _crash_on_second_row(row_number: int, decode_args) -> tuple:
+    if row_number == 2:
+        os._exit(1)
+    return convert_manifest_row(row_number, decode_args)
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork", reason="crashing worker is patched in parent process")
+def test_run_batch_worker_crash(tmp_path, monkeypatch, capsys):
+    _write_test_file(tmp_path / "in.bin", 4096)
+    (tmp_path / "manifest.csv").write_text("file,output,format,width,height\n"
+                                           "in.bin,first.png,RGB565,16,16\n"
+                                           "in.bin,second.png,RGB565,16,16\n"
+                                           "in.bin,third.png,RGB565,16,16\n")
+    monkeypatch.setattr(cli_batch_module, "convert_manifest_row", _crash_on_second_row)
+    assert run_batch(str(tmp_path / "manifest.csv"), str(tmp_path / "out"), 2) == 1
+    assert "/3 textures" in capsys.readouterr().out  # summary is printed anyway
+
+
+@pytest.mark.parametrize("trace_file_name", ["trace.json", "trace.jsonl"])
+def test_trace_file(tmp_path, trace_file_name: str):
+    input_file_path = tmp_path / "in.bin"
+    _write_test_file(input_file_path, 4096)
+    args = get_argument_parser().parse_args(["decode", "--format", "RGBA8888", "--width", "16", "--height", "16", str(input_file_path), "out.png"])
+    decode_spec = get_specs_from_args(args, args.input_file_path)[0]
+
+    render_timings = RenderTimings()
+    render_timings.spans = []  # spans are recorded only when tracing env var is set
+    render_timings.add_stage(STAGE_READ, time.perf_counter(), 4096, 1024)
+    render_timings.add_stage(STAGE_DECODE, time.perf_counter(), 1024, 1024)
+    tracer = HeatTracer(str(tmp_path / trace_file_name))
+    assert tracer.write_job("decode", render_timings, decode_spec)
+    assert tracer.write_job("decode", render_timings, decode_spec)
+    assert tracer.close()
+
+    with open(tmp_path / trace_file_name, "rt", encoding="utf-8") as trace_file:
+        if trace_file_name.endswith(".jsonl"):
+            trace_jobs = [json.loads(trace_line) for trace_line in trace_file]
+            assert len(trace_jobs) == 2
+            assert trace_jobs[0]["decode_params"]["pixel_format"] == "RGBA8888"
+            assert [stage["name"] for stage in trace_jobs[1]["stages"]] == [STAGE_READ, STAGE_DECODE]
+            assert trace_jobs[1]["stages"][0]["input_size"] == 4096
+        else:
+            trace_events = [trace_event for trace_event in json.load(trace_file) if trace_event["ph"] == "X"]
+            assert [trace_event["name"] for trace_event in trace_events] == ["decode #1", STAGE_READ, STAGE_DECODE, "decode #2", STAGE_READ, STAGE_DECODE]
+            assert trace_events[0]["args"]["img_width"] == 16
+            assert trace_events[1]["args"]["output_size"] == 1024
+
+
+def test_get_argv_from_specs(tmp_path):
+    input_file_path = tmp_path / "in.bin"
+    _write_test_file(input_file_path, 4096)
+    args = get_argument_parser().parse_args(["decode", "--format", "PAL8", "--swizzle", "ps2_type1", "--width", "16", "--height", "8",
+                                             "--offset", "0x100", "--endianess", "byte_swap_x360", "--palette-format", "RGB565",
+                                             "--palette-offset", "0x20", "--palette-endianess", "big", "--ps2-palette-swizzle",
+                                             "--horizontal-flip", "--rotate", "rotate_180", str(input_file_path), "out.png"])
+    decode_spec, view_spec = get_specs_from_args(args, args.input_file_path)
+
+    # parameters saved with profile can be replayed in command-line mode
+    replay_args = get_argument_parser().parse_args(get_argv_from_specs(decode_spec, view_spec, "replay.png"))
+    assert get_specs_from_args(replay_args, replay_args.input_file_path) == (decode_spec, view_spec)
+    assert replay_args.output_file_path == "replay.png"
+
+
+def test_run_cli_profile(tmp_path):
+    input_file_path = tmp_path / "in.bin"
+    output_file_path = tmp_path / "out.png"
+    _write_test_file(input_file_path, 4096)
+    argv: list = ["decode", "--profile", "--format", "RGB565", "--width", "32", "--height", "16", str(input_file_path), str(output_file_path)]
+
+    assert run_cli(argv, str(tmp_path)) == 0
+    assert output_file_path.exists()
+    profile_file_names: list = sorted(profile_file_path.name for profile_file_path in (tmp_path / PROFILE_DIRECTORY_NAME).iterdir())
+    assert len(profile_file_names) == 3
+    assert profile_file_names[0].endswith(".prof")
+    assert profile_file_names[1].endswith("_memory.txt")
+    with open(tmp_path / PROFILE_DIRECTORY_NAME / profile_file_names[2], "rt", encoding="utf-8") as params_file:
+        profile_params: dict = json.load(params_file)
+    assert profile_params["decode_spec"]["pixel_format"] == "RGB565"
+    assert profile_params["replay_command"].startswith("python -m src.main decode --profile")
+
+
+def test_memory_budget(tmp_path):
+    input_file_path = tmp_path / "in.bin"
+    _write_test_file(input_file_path, 16384)
+    decode_specs: list = [DecodeSpec(img_file_path=str(input_file_path), total_file_size=16384, pixel_format="RGBA8888", endianess_type="Little Endian",
+                                     swizzling_type="None", compression_type="None", img_start_offset=start_offset, img_end_offset=start_offset + 4096,
+                                     img_width=32, img_height=32) for start_offset in (0, 4096, 8192, 12288)]
+    decode_cache = HeatCache("decode_cache", 1024 * 1024)
+    memory_budget = HeatMemoryBudget(1024 * 1024)
+    heat_image = HeatImage(decode_specs[0], decode_cache, memory_budget=memory_budget)
+    memory_budget.register("caches", lambda: {MEMORY_CACHES: decode_cache.current_size_bytes}, decode_cache.clear)
+    memory_budget.register("image", heat_image.get_memory_sizes, heat_image.release_intermediates)
+    for decode_spec in decode_specs[:3]:
+        heat_image.decode_spec = decode_spec
+        heat_image.image_reload()
+    assert len(decode_cache) == 3
+    assert memory_budget.get_live_sizes()[MEMORY_CACHES] == 3 * 4096
+
+    # index data of previous decode is not counted after cache hit
+    heat_image.index_image_data = bytes(4096)
+    heat_image.decode_spec = decode_specs[1]
+    heat_image.image_reload()
+    assert STAGE_CACHE in heat_image.render_timings.stages
+    assert memory_budget.get_live_sizes()[MEMORY_INDEX] == 0
+
+    # next decode fits only when cached images are released
+    memory_budget.max_size_bytes = get_decode_memory_estimate(decode_specs[3]) + memory_budget.get_total_size() - 1
+    heat_image.decode_spec = decode_specs[3]
+    heat_image.image_reload()
+    assert not heat_image.is_preview_error
+    assert len(decode_cache) == 1
+
+    # decode that can't fit at all is done out of core, or refused when image can't be decoded in stripes
+    memory_budget.max_size_bytes = 8192
+    heat_image.decode_spec = decode_specs[0]
+    heat_image.image_reload()
+    assert not heat_image.is_preview_error
+    assert heat_image.scratch_file is not None
+    heat_image.decode_spec = dataclasses.replace(decode_specs[0], endianess_type="Byte Swap (X360)")
+    heat_image.image_reload()
+    assert heat_image.is_preview_error
+    assert heat_image.scratch_file is None
+    assert "memory budget" in heat_image.memory_error_message
+    heat_image.image_close()
+
+
+def test_decode_cache_file_close(tmp_path):
+    input_file_path = tmp_path / "in.bin"
+    _write_test_file(input_file_path, 4096)
+    decode_spec = DecodeSpec(img_file_path=str(input_file_path), total_file_size=4096, pixel_format="RGBA8888", endianess_type="Little Endian",
+                             swizzling_type="None", compression_type="None", img_start_offset=0, img_end_offset=4096, img_width=32, img_height=32)
+    decode_cache = HeatCache("decode_cache", 1024 * 1024)
+    heat_image = HeatImage(decode_spec, decode_cache)
+    heat_image.image_reload()
+    heat_image.image_reload(is_cache_used=True)
+    assert heat_image.render_timings.stages.keys() == {STAGE_READ, STAGE_CACHE}
+    assert decode_cache.values()[0][0] is None  # views of the file are not kept in cache
+    assert decode_cache.current_size_bytes == 4096
+
+    # closed file is unmapped right away and its entries are removed
+    file_mmap = heat_image.file_source._mmap
+    heat_image.image_close()
+    assert len(decode_cache) == 0
+    assert decode_cache.current_size_bytes == 0
+    with pytest.raises(ValueError):
+        file_mmap.size()
+
+
+def test_palette_cache(tmp_path):
+    input_file_path = tmp_path / "in.bin"
+    _write_test_file(input_file_path, 4096)
+    heat_palette = HeatPalette(DecodeSpec(img_file_path=str(input_file_path), palette_loadfrom_value=1, palette_offset=0, palette_format="RGBA8888"))
+    heat_palette.palette_reload()
+    first_palette_data: tuple = (heat_palette.decoded_palette_data, heat_palette.encoded_palette_data)
+    heat_palette.decode_spec = dataclasses.replace(heat_palette.decode_spec, palette_offset=1024)
+    heat_palette.palette_reload()
+    assert heat_palette.encoded_palette_data == input_file_path.read_bytes()[1024: 3072]
+
+    # cache hit restores both decoded and encoded palette
+    heat_palette.decode_spec = dataclasses.replace(heat_palette.decode_spec, palette_offset=0)
+    heat_palette.palette_reload()
+    assert heat_palette.decoded_palettes_cache.hits == 1
+    assert (heat_palette.decoded_palette_data, heat_palette.encoded_palette_data) == first_palette_data
+    heat_palette.palette_close()
+
+
+def test_palette_only_change_fallback(tmp_path):
+    input_file_path = tmp_path / "in.bin"
+    _write_test_file(input_file_path, 8192)
+    decode_spec = DecodeSpec(img_file_path=str(input_file_path), total_file_size=8192, pixel_format="PAL8", endianess_type="Little Endian",
+                             swizzling_type="XBOX / PS3 (linear)", compression_type="None", img_start_offset=0, img_end_offset=4096,
+                             img_width=64, img_height=64, palette_format="RGBA8888", palette_loadfrom_value=1, palette_offset=4096,
+                             palette_endianess="Little Endian", palette_scale_value=1, palette_ps2_swizzle_flag=False)
+    heat_image = HeatImage(decode_spec, HeatCache("decode_cache", 1024 * 1024))  # no stage caches, so every stage is run again
+    heat_image.image_reload()
+
+    # GRAY4 palette has no lookup table, so kept index data is decoded again from file data (not unswizzled twice)
+    heat_image.decode_spec = dataclasses.replace(decode_spec, palette_format="GRAY4", palette_offset=6000)
+    heat_image.image_reload()
+    fresh_heat_image = HeatImage(heat_image.decode_spec)
+    fresh_heat_image.image_reload()
+    assert bytes(heat_image.decoded_image_data) == bytes(fresh_heat_image.decoded_image_data)
+    heat_image.image_close()
+    fresh_heat_image.image_close()
+
+
+def test_run_cli_memory_budget(tmp_path):
+    input_file_path = tmp_path / "in.bin"
+    _write_test_file(input_file_path, 4096)
+    argv: list = ["decode", "--format", "RGBA8888", "--width", "1024", "--height", "1024", str(input_file_path), str(tmp_path / "out.png")]
+    assert run_cli(argv + ["--memory-budget", "1", "--endianess", "byte_swap_x360"]) == 1
+    assert run_cli(argv + ["--memory-budget", "64", "--endianess", "byte_swap_x360"]) == 0
+    assert run_cli(argv + ["--memory-budget", "1"]) == 0
+
+
+@pytest.mark.parametrize("pixel_format,endianess_type,img_width", [
+    ("RGBA8888", "Little Endian", 64),
+    ("RGB565", "Big Endian", 61),
+    ("RGB888", "Little Endian", 37),
+    ("GRAY4", "Little Endian", 33),
+])
+def test_decode_out_of_core(tmp_path, monkeypatch, pixel_format: str, endianess_type: str, img_width: int):
+    input_file_path = tmp_path / "in.bin"
+    _write_test_file(input_file_path, 10000)
+    decode_spec = DecodeSpec(img_file_path=str(input_file_path), total_file_size=10000, pixel_format=pixel_format, endianess_type=endianess_type,
+                             swizzling_type="None", compression_type="None", img_start_offset=1, img_end_offset=10000,
+                             img_width=img_width, img_height=img_width + 7, palette_format="RGBA8888")
+    heat_image = HeatImage(decode_spec)
+    heat_image.image_reload()
+    expected_decoded_image_data: bytes = bytes(heat_image.decoded_image_data[:img_width * (img_width + 7) * 4])
+    heat_image.image_close()
+
+    # small stripes, so stripe boundaries are tested too
+    monkeypatch.setattr(heatimage, "OUT_OF_CORE_MIN_IMAGE_SIZE", 0)
+    monkeypatch.setattr(heatscratch, "STRIPE_SIZE", 1000)
+    heat_image = HeatImage(decode_spec)
+    heat_image.image_reload()
+    assert heat_image.scratch_file is not None
+    assert bytes(heat_image.decoded_image_data) == expected_decoded_image_data
+    export_pil_img = get_export_image(heat_image.decoded_image_data, heat_image.img_width, heat_image.img_height, ViewSpec())
+    assert export_pil_img.tobytes() == expected_decoded_image_data
+    heat_image.image_close()
+    assert heat_image.scratch_file is None
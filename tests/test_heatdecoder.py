@@ -0,0 +1,134 @@
+"""
+Copyright © 2026  Bartłomiej Duda
+License: GPL-3.0 License
+"""
+
+import random
+
+import pytest
+from reversebox.image.image_decoder import ImageDecoder
+from reversebox.image.image_formats import ImageFormats
+
+from src.Image.constants import SUPPORTED_PALETTE_FORMATS
+from src.Image.heatdecoder import HeatDecoder
+from src.Image.heatimage import UNCOMPRESSED_IMAGE_FORMATS
+from src.Image.heatpixelstream import HeatPixelStream
+
+# fmt: off
+
+# Fast path decoders must return exactly the same data as ReverseBox
+
+
+def _get_test_data(data_size: int) -> bytes:
+    random.seed(data_size)
+    return bytes(random.getrandbits(8) for _ in range(data_size))
+
+
+# formats not supported by fast path, ReverseBox decoder is used instead
+FALLBACK_IMAGE_FORMATS: dict[ImageFormats, str] = {
+    ImageFormats.RGBM8888: "RGBM pixels are scaled by multiplier, there is no bit-field lookup table for them",
+    ImageFormats.RGB121_BYTE: "ReverseBox fails for most pixel values (output channel out of byte range)",
+}
+
+
+@pytest.mark.parametrize("image_format", UNCOMPRESSED_IMAGE_FORMATS, ids=lambda image_format: image_format.value)
+@pytest.mark.parametrize("image_endianess", ["little", "big"])
+@pytest.mark.parametrize("img_width, img_height, data_size", [
+    (16, 16, 1536),  # data for every pixel
+    (16, 16, 100),  # not enough data
+    (5, 3, 1000),  # too much data
+    (7, 7, 25),  # odd number of pixels
+])
+def test_decode_image_parity(image_format: ImageFormats, image_endianess: str, img_width: int, img_height: int, data_size: int):
+    image_data: bytes = _get_test_data(data_size)
+    decoded_data = HeatDecoder().decode_image(image_data, img_width, img_height, image_format, image_endianess)
+    if image_format in FALLBACK_IMAGE_FORMATS:
+        assert decoded_data is None
+        pytest.skip(FALLBACK_IMAGE_FORMATS[image_format])
+
+    try:
+        expected_data = bytes(ImageDecoder().decode_image(image_data, img_width, img_height, image_format, image_endianess))
+    except Exception:
+        expected_data = None
+    assert decoded_data == expected_data  # fast path returns None only where ReverseBox fails too (e.g. not enough 4 bpp data)
+
+
+@pytest.mark.parametrize("image_format", [ImageFormats.RGB565, ImageFormats.RGBA8888, ImageFormats.RGB48, ImageFormats.GRAY4])
+def test_decode_image_fast_path_used(image_format: ImageFormats):
+    assert HeatDecoder().decode_image(_get_test_data(1536), 16, 16, image_format, "little") is not None
+
+
+def test_lut_cache():
+    # lookup tables are kept in size-limited caches, so they can be counted and released by memory budget
+    HeatDecoder.lut_cache.clear()
+    HeatDecoder.palette_lut_cache.clear()
+    assert HeatDecoder().decode_indexed_image(_get_test_data(1024), _get_test_data(2048), 16, 16, ImageFormats.PAL8, ImageFormats.RGB565) is not None
+    assert HeatDecoder().decode_image(_get_test_data(1536), 16, 16, ImageFormats.RGB565, "little") is not None
+    assert HeatDecoder.lut_cache.get_size_bytes() == 65536 * 5
+    assert len(HeatDecoder.palette_lut_cache) == 1
+    assert HeatDecoder.palette_lut_cache.get_size_bytes() == 1024 * 5 + 2048  # every 16-bit entry of the palette data
+
+
+# palette formats not supported by fast path, ReverseBox decoder is used instead
+FALLBACK_PALETTE_FORMATS: dict[ImageFormats, str] = {
+    ImageFormats.GRAY4: "GRAY4 palette entries are not whole bytes, there is no lookup table for them",
+}
+
+
+@pytest.mark.parametrize("image_format", [ImageFormats.PAL4, ImageFormats.PAL8, ImageFormats.PAL8_TZAR,
+                                          ImageFormats.PAL16, ImageFormats.PAL32, ImageFormats.PAL_I8A8], ids=lambda image_format: image_format.value)
+@pytest.mark.parametrize("palette_format", SUPPORTED_PALETTE_FORMATS, ids=lambda palette_format: palette_format.value)
+@pytest.mark.parametrize("image_endianess, palette_endianess, scale_value", [("little", "little", 1), ("big", "big", 1), ("little", "big", 2)])
+@pytest.mark.parametrize("img_width, img_height, data_size", [
+    (16, 16, 1024),  # data for every pixel
+    (16, 16, 100),  # not enough data
+    (7, 7, 25),  # odd number of pixels
+])
+def test_decode_indexed_image_parity(image_format: ImageFormats, palette_format: ImageFormats, image_endianess: str, palette_endianess: str,
+                                     scale_value: int, img_width: int, img_height: int, data_size: int):
+    image_data: bytes = _get_test_data(data_size)
+    palette_data: bytes = _get_test_data(2048)
+    decoded_data = HeatDecoder().decode_indexed_image(image_data, palette_data, img_width, img_height, image_format, palette_format,
+                                                      image_endianess, palette_endianess, scale_value)
+    if palette_format in FALLBACK_PALETTE_FORMATS:
+        assert decoded_data is None
+        pytest.skip(FALLBACK_PALETTE_FORMATS[palette_format])
+
+    try:
+        expected_data = bytes(ImageDecoder().decode_indexed_image(image_data, palette_data, img_width, img_height, image_format, palette_format,
+                                                                  image_endianess, palette_endianess, scale_value))
+    except Exception:
+        expected_data = None
+    assert decoded_data == expected_data  # fast path returns None only where ReverseBox fails too (e.g. palette entry out of range)
+
+
+@pytest.mark.parametrize("image_format", [ImageFormats.PAL4, ImageFormats.PAL8, ImageFormats.PAL8_TZAR, ImageFormats.PAL16, ImageFormats.PAL32,
+                                          ImageFormats.PAL_I8A8])
+def test_decode_indexed_image_fast_path_used(image_format: ImageFormats):
+    assert HeatDecoder().decode_indexed_image(_get_test_data(1024), _get_test_data(2048), 16, 16, image_format, ImageFormats.RGBA8888) is not None
+
+
+@pytest.mark.parametrize("image_format", [ImageFormats.RGB565, ImageFormats.RGB888, ImageFormats.RGBA8888, ImageFormats.RGB48],
+                         ids=lambda image_format: image_format.value)
+@pytest.mark.parametrize("image_endianess", ["little", "big"])
+def test_pixel_stream_parity(image_format: ImageFormats, image_endianess: str):
+    # one stream serves a sequence of width/height and offset changes
+    file_data: memoryview = memoryview(_get_test_data(4096))
+    pixel_stream = HeatPixelStream()
+    for start_offset, end_offset, img_width, img_height in [(0, 4096, 16, 16), (0, 4096, 32, 8), (96, 2000, 10, 10), (97, 2000, 10, 10),
+                                                            (0, 1000, 20, 20), (1000, 3000, 20, 20), (4000, 5000, 8, 8), (5000, 6000, 4, 4)]:
+        expected_data = bytes(ImageDecoder().decode_image(bytes(file_data[start_offset: end_offset]), img_width, img_height, image_format, image_endianess))
+        decoded_data = pixel_stream.decode_image(file_data, (), start_offset, end_offset, img_width, img_height, image_format, image_endianess)
+        assert decoded_data == expected_data
+
+
+def test_pixel_stream_failed_decode():
+    # RGB121_BYTE is decoded only for values below 16, so range with bigger values can't be added to the stream
+    random.seed(256)
+    file_data: memoryview = memoryview(bytes(random.getrandbits(4) for _ in range(192)) + b"\xFF" * 64)
+    pixel_stream = HeatPixelStream()
+    for start_offset, end_offset, is_decoded in [(64, 128, True), (32, 256, False), (64, 128, True), (32, 160, True)]:
+        decoded_data = pixel_stream.decode_image(file_data, (), start_offset, end_offset, 8, 8, ImageFormats.RGB121_BYTE, "little")
+        assert (decoded_data is not None) == is_decoded
+        if is_decoded:
+            assert decoded_data == HeatDecoder().decode_image(file_data[start_offset: end_offset], 8, 8, ImageFormats.RGB121_BYTE, "little")
@@ -0,0 +1,139 @@
+"""
+Copyright © 2026  Bartłomiej Duda
+License: GPL-3.0 License
+"""
+
+import random
+from typing import Callable, Optional
+
+import pytest
+from reversebox.image.common import get_block_data_size
+from reversebox.image.image_formats import ImageFormats
+from reversebox.image.swizzling.swizzle_3ds import unswizzle_3ds
+from reversebox.image.swizzling.swizzle_bc import unswizzle_bc
+from reversebox.image.swizzling.swizzle_gamecube import unswizzle_gamecube
+from reversebox.image.swizzling.swizzle_morton import unswizzle_morton
+from reversebox.image.swizzling.swizzle_morton_ps4 import unswizzle_ps4
+from reversebox.image.swizzling.swizzle_morton_ps5 import unswizzle_ps5
+from reversebox.image.swizzling.swizzle_ps2 import unswizzle_ps2
+from reversebox.image.swizzling.swizzle_psp import unswizzle_psp
+from reversebox.image.swizzling.swizzle_psvita_dreamcast import (
+    unswizzle_psvita_dreamcast,
+)
+from reversebox.image.swizzling.swizzle_switch import unswizzle_switch
+from reversebox.image.swizzling.swizzle_x360 import unswizzle_x360
+
+from src.Image.heatimage import HeatImage
+from src.Image.heatspec import DecodeSpec
+from src.Image.heatunswizzle import HeatUnswizzler
+
+# fmt: off
+
+# Vectorized unswizzling must return exactly the same data as ReverseBox
+
+REVERSEBOX_UNSWIZZLE_FUNCTIONS: dict[str, Callable] = {
+    "psp": lambda data, width, height, bpp, image_format: unswizzle_psp(data, width, height, bpp),
+    "morton": lambda data, width, height, bpp, image_format: unswizzle_morton(data, width, height, bpp, block_width=1, block_height=1),
+    "morton_4x4": lambda data, width, height, bpp, image_format: unswizzle_morton(data, width, height, bpp, block_width=4, block_height=4),
+    "morton_8x8": lambda data, width, height, bpp, image_format: unswizzle_morton(data, width, height, bpp, block_width=8, block_height=8),
+    "dreamcast_psvita": lambda data, width, height, bpp, image_format: unswizzle_psvita_dreamcast(data, width, height, bpp, block_width=1, block_height=1),
+    "dreamcast_psvita_4x4": lambda data, width, height, bpp, image_format: unswizzle_psvita_dreamcast(data, width, height, bpp, block_width=4, block_height=4),
+    "dreamcast_psvita_8x8": lambda data, width, height, bpp, image_format: unswizzle_psvita_dreamcast(data, width, height, bpp, block_width=8, block_height=8),
+    "ps4": lambda data, width, height, bpp, image_format: unswizzle_ps4(data, width, height, block_width=4, block_height=4, block_data_size=get_block_data_size(image_format)),
+    "ps4_padding": lambda data, width, height, bpp, image_format: unswizzle_ps4(data, width, height, block_width=4, block_height=4, block_data_size=get_block_data_size(image_format)),
+    "ps5": lambda data, width, height, bpp, image_format: unswizzle_ps5(data, width, height, block_width=4, block_height=4, block_data_size=get_block_data_size(image_format)),
+    "nintendo_switch_4_4": lambda data, width, height, bpp, image_format: unswizzle_switch(data, width, height, bytes_per_block=4, block_height=4),
+    "nintendo_switch_4_8": lambda data, width, height, bpp, image_format: unswizzle_switch(data, width, height, bytes_per_block=4, block_height=8),
+    "nintendo_switch_1_16": lambda data, width, height, bpp, image_format: unswizzle_switch(data, width, height, bytes_per_block=1, block_height=16),
+    "nintendo_switch_2_16": lambda data, width, height, bpp, image_format: unswizzle_switch(data, width, height, bytes_per_block=2, block_height=16),
+    "nintendo_switch_4_16": lambda data, width, height, bpp, image_format: unswizzle_switch(data, width, height, bytes_per_block=4, block_height=16),
+    "gamecube_wii": lambda data, width, height, bpp, image_format: unswizzle_gamecube(data, width, height, bpp),
+    "x360_1_1": lambda data, width, height, bpp, image_format: unswizzle_x360(data, width, height, block_pixel_size=1, texel_byte_pitch=1),
+    "x360_1_2": lambda data, width, height, bpp, image_format: unswizzle_x360(data, width, height, block_pixel_size=1, texel_byte_pitch=2),
+    "x360_1_4": lambda data, width, height, bpp, image_format: unswizzle_x360(data, width, height, block_pixel_size=1, texel_byte_pitch=4),
+    "x360_4_8": lambda data, width, height, bpp, image_format: unswizzle_x360(data, width, height, block_pixel_size=4, texel_byte_pitch=8),
+    "x360_4_16": lambda data, width, height, bpp, image_format: unswizzle_x360(data, width, height, block_pixel_size=4, texel_byte_pitch=16),
+    "bc": lambda data, width, height, bpp, image_format: unswizzle_bc(data, width, height, 8, 8, bpp),
+    "3ds": lambda data, width, height, bpp, image_format: unswizzle_3ds(data, width, height, bpp),
+}
+
+# image format is used only for block data size (PS4, PS5)
+IMAGE_FORMATS_PER_BPP: dict[int, ImageFormats] = {
+    4: ImageFormats.BC1_DXT1,
+    8: ImageFormats.BC3_DXT5,
+    16: ImageFormats.RGB565,
+    32: ImageFormats.RGBA8888,
+}
+
+
+def _get_test_data(data_size: int) -> bytes:
+    random.seed(data_size)
+    return bytes(random.getrandbits(8) for _ in range(data_size))
+
+
+def _get_reversebox_data(swizzling_id: str, image_data: bytes, img_width: int, img_height: int, bpp: int) -> Optional[bytes]:
+    try:
+        return bytes(REVERSEBOX_UNSWIZZLE_FUNCTIONS[swizzling_id](image_data, img_width, img_height, bpp, IMAGE_FORMATS_PER_BPP[bpp]))
+    except Exception:
+        return None
+
+
+@pytest.mark.parametrize("swizzling_id", REVERSEBOX_UNSWIZZLE_FUNCTIONS.keys())
+@pytest.mark.parametrize("bpp", IMAGE_FORMATS_PER_BPP.keys())
+@pytest.mark.parametrize("img_width, img_height", [
+    (16, 16),
+    (64, 32),
+    (32, 64),
+    (48, 40),  # not power of two
+    (100, 60),  # not aligned to blocks
+    (30, 18),
+])
+@pytest.mark.parametrize("data_size_type", ["exact", "padded", "big"])
+def test_unswizzle_parity(swizzling_id: str, bpp: int, img_width: int, img_height: int, data_size_type: str):
+    data_size: int = img_width * img_height * bpp // 8
+    if data_size_type == "padded":
+        data_size += 100
+    elif data_size_type == "big":
+        data_size = img_width * img_height * 16  # enough for every swizzle type (e.g. aligned dimensions, 4x4 blocks)
+    image_data: bytes = _get_test_data(data_size)
+    expected_data: Optional[bytes] = _get_reversebox_data(swizzling_id, image_data, img_width, img_height, bpp)
+
+    unswizzled_data: Optional[bytes] = HeatUnswizzler().unswizzle(swizzling_id, image_data, img_width, img_height, bpp, IMAGE_FORMATS_PER_BPP[bpp])
+    if expected_data is None:
+        assert unswizzled_data is None  # ReverseBox fails, so fast path must not return any data
+    elif unswizzled_data is not None:
+        assert unswizzled_data == expected_data
+
+
+@pytest.mark.parametrize("swizzling_id", REVERSEBOX_UNSWIZZLE_FUNCTIONS.keys())
+@pytest.mark.parametrize("bpp", IMAGE_FORMATS_PER_BPP.keys())
+def test_unswizzle_fast_path_used(swizzling_id: str, bpp: int):
+    # aligned dimensions with enough data are always done by the fast path
+    image_data: bytes = _get_test_data(64 * 64 * 16)
+    unswizzled_data: Optional[bytes] = HeatUnswizzler().unswizzle(swizzling_id, image_data, 64, 64, bpp, IMAGE_FORMATS_PER_BPP[bpp])
+    assert unswizzled_data is not None
+    assert unswizzled_data == _get_reversebox_data(swizzling_id, image_data, 64, 64, bpp)
+
+
+@pytest.mark.parametrize("swizzling_id, img_width, img_height, bpp, data_size", [
+    ("ps2_type1", 32, 32, 8, 1024),  # not supported swizzling type
+    ("nintendo_switch_4_16", 16, 16, 8, 256),  # not enough data for swizzle parameters
+])
+def test_unswizzle_fallback(swizzling_id: str, img_width: int, img_height: int, bpp: int, data_size: int):
+    image_data: bytes = _get_test_data(data_size)
+    unswizzler: HeatUnswizzler = HeatUnswizzler()
+    image_format: ImageFormats = IMAGE_FORMATS_PER_BPP[bpp]
+    assert unswizzler.unswizzle(swizzling_id, image_data, img_width, img_height, bpp, image_format) is None
+    assert unswizzler.map_cache.values() == [False]  # not supported parameters are cached too
+    assert unswizzler.unswizzle(swizzling_id, image_data, img_width, img_height, bpp, image_format) is None
+    assert unswizzler.map_cache.hits == 1
+
+    # HeatImage falls back to ReverseBox function
+    if swizzling_id == "ps2_type1":
+        expected_data: bytes = bytes(unswizzle_ps2(image_data, img_width, img_height, bpp, swizzle_type=1))
+    else:
+        expected_data = _get_reversebox_data(swizzling_id, image_data, img_width, img_height, bpp)
+    heat_image: HeatImage = HeatImage(DecodeSpec(img_width=img_width, img_height=img_height), unswizzler=unswizzler)
+    heat_image.encoded_image_data = image_data
+    heat_image._image_unswizzle(swizzling_id, image_format, bpp)
+    assert bytes(heat_image.encoded_image_data) == expected_data